@@ -0,0 +1,309 @@
+#! /usr/bin/env python3
+# src/asgi.py
+#
+# ASGI entry point of the API. The /api/async/ routes and the change feed
+# streams (/api/<slug>/changes) are served natively on the server's event
+# loop: a request waiting on the database or an idle SSE subscriber holds no
+# thread, so neither is capped by worker threads times processes. Every other
+# request is handed to the Flask app in main.py, each on a thread of a pool of
+# ASGI_WSGI_THREADS (asgiref's WsgiToAsgi alone would run them all on one
+# thread per process).
+#
+# Run with an ASGI server, e.g.
+#     uvicorn asgi:application --host 0.0.0.0 --port 1082
+# or `python3 asgi.py`, which starts uvicorn with HTTP_HOST/HTTP_PORT.
+
+import os
+import re
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from werkzeug.exceptions import HTTPException
+from main import app, allowed_origins, ADMISSION_ROUTE_CLASSES
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.change_feed import ChangeFeed
+from utils.crud import CrudEngine, CrudError
+from utils.jobs import JobRunner
+from utils.logger import logger
+from utils.model_registry import ModelRegistry
+from utils.partitions import PartitionManager
+
+# (method, path pattern, endpoint); same endpoints, and so the same admission
+# route classes, as the async views in main.py
+ASYNC_ROUTES = [
+    ('POST', re.compile(r'^/api/async/resolve/?$'), 'async_resolve_references'),
+    ('GET', re.compile(r'^/api/async/(?P<object_slug>[^/]+)/search/?$'), 'async_search_objects'),
+    ('GET', re.compile(r'^/api/async/(?P<object_slug>[^/]+)/(?P<object_id>[^/]+)/?$'), 'async_read_object'),
+    ('GET', re.compile(r'^/api/async/(?P<object_slug>[^/]+)/?$'), 'async_list_objects'),
+]
+
+# upper bound of a resolve request body
+MAX_BODY_BYTES = int(os.environ.get("ASYNC_MAX_BODY_BYTES", str(1024 * 1024)))
+# threads running Flask requests in each process, like a threaded WSGI server's
+WSGI_THREADS = int(os.environ.get("ASGI_WSGI_THREADS", "32"))
+
+wsgi_executor = ThreadPoolExecutor(max_workers=WSGI_THREADS, thread_name_prefix="wsgi")
+
+
+class PooledWsgiToAsgiInstance(WsgiToAsgiInstance):
+    """
+    WsgiToAsgiInstance that runs the WSGI app on wsgi_executor. asgiref's own
+    run_wsgi_app is thread sensitive, which puts every request of the process
+    on one shared thread.
+    """
+
+    # asgiref's run_wsgi_app without its sync_to_async wrapper
+    _run_wsgi_app = WsgiToAsgiInstance.__dict__['run_wsgi_app'].func
+
+    async def run_wsgi_app(self, body):
+        await sync_to_async(self._run_wsgi_app, thread_sensitive=False, executor=wsgi_executor)(body)
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """
+    WsgiToAsgi on the thread pool, see PooledWsgiToAsgiInstance.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await PooledWsgiToAsgiInstance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+
+flask_application = PooledWsgiToAsgi(app)
+
+
+def match_route(method: str, path: str) -> Tuple[Optional[str], Dict[str, str]]:
+    """
+    Find the async endpoint of a request.
+
+    Returns:
+        Tuple: (endpoint or None, path arguments); None also when only the
+        method differs, so Flask answers OPTIONS preflights and 405s
+    """
+    for route_method, pattern, endpoint in ASYNC_ROUTES:
+        match = pattern.match(path)
+        if match and route_method == method:
+            return endpoint, match.groupdict()
+    return None, {}
+
+
+def match_changes(method: str, path: str) -> Optional[str]:
+    """
+    The object slug of a change feed request, as Flask would route it (so
+    e.g. /api/stats/changes stays with Flask), or None.
+    """
+    if method != 'GET':
+        return None
+    try:
+        endpoint, arguments = app.url_map.bind('localhost').match(path, method)
+    except HTTPException:
+        return None
+    return arguments['object_slug'] if endpoint == 'stream_object_changes' else None
+
+
+async def read_body(receive) -> bytes:
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY_BYTES:
+            raise CrudError("Request body too large", 413)
+        if not message.get('more_body'):
+            break
+    return body
+
+
+async def send_json(send, status: int, body: Any, headers: List[Tuple[bytes, bytes]]):
+    payload = json.dumps(body, default=str).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode('ascii')),
+            *headers
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+def cors_headers(request_headers: Dict[str, str]) -> List[Tuple[bytes, bytes]]:
+    """
+    The CORS headers flask_cors would add for /api/* in main.py.
+    """
+    origin = request_headers.get('origin')
+    if not origin or not allowed_origins:
+        return []
+    if '*' in allowed_origins:
+        return [(b'access-control-allow-origin', b'*')]
+    if origin in allowed_origins:
+        return [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+    return []
+
+
+async def handle(endpoint: str, arguments: Dict[str, str], query: Dict[str, str], receive) -> Tuple[int, Any]:
+    """
+    Run an async endpoint on AsyncDatabaseManager's loop and await it on ours.
+    """
+    from database.async_db import AsyncDatabaseManager
+    from utils.async_crud import AsyncCrudEngine
+
+    run = AsyncDatabaseManager.run_async
+    if endpoint == 'async_list_objects':
+        return 200, await run(AsyncCrudEngine.list(arguments['object_slug'], query))
+    if endpoint == 'async_search_objects':
+        return 200, await run(AsyncCrudEngine.search(arguments['object_slug'], query))
+    if endpoint == 'async_read_object':
+        record = await run(AsyncCrudEngine.read(arguments['object_slug'], arguments['object_id']))
+        if record is None:
+            return 404, {"error": "Record not found"}
+        return 200, record
+
+    body = await read_body(receive)
+    try:
+        body = json.loads(body) if body else {}
+    except ValueError:
+        body = {}
+    references = body.get('references') if isinstance(body, dict) else None
+    if not isinstance(references, list):
+        return 400, {"error": "references must be a list"}
+    logger.info(f"Received async resolve request for {len(references)} references")
+    return 200, {"results": await run(AsyncCrudEngine.resolve(references))}
+
+
+async def stream_changes(object_slug: str, headers: Dict[str, str], query: Dict[str, str],
+                         extra_headers: List[Tuple[bytes, bytes]], receive, send):
+    """
+    Change feed SSE stream (stream_object_changes in main.py) on the event
+    loop, until the stream ends or the client disconnects.
+    """
+    try:
+        CrudEngine.get_class(object_slug, 'list')
+    except CrudError as ce:
+        logger.warning(f"Change feed {object_slug} rejected: {ce.message}")
+        await send_json(send, ce.status_code, {"error": ce.message}, extra_headers)
+        return
+    slug = object_slug.lower()
+    last_event_id = headers.get('last-event-id') or query.get('last_event_id')
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            await send_json(send, 400, {"error": "Invalid Last-Event-ID"}, extra_headers)
+            return
+
+    logger.info(f"Change feed subscriber for {slug} (last event {last_event_id})")
+
+    async def pump():
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+                *extra_headers
+            ]
+        })
+        async for chunk in ChangeFeed.stream_async(slug, last_event_id):
+            await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    tasks = [asyncio.ensure_future(pump()), asyncio.ensure_future(disconnected())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        # cancelling the stream unsubscribes it
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def parse_query(scope) -> Dict[str, str]:
+    """
+    First value of each query parameter, like request.args.to_dict().
+    """
+    query = {}
+    for name, value in parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True):
+        query.setdefault(name, value)
+    return query
+
+
+async def application(scope, receive, send):
+    """
+    ASGI application: native async routes, Flask for everything else.
+    """
+    if scope['type'] != 'http':
+        if scope['type'] == 'lifespan':
+            # nothing to set up beyond what importing main did
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        return
+
+    endpoint, arguments = match_route(scope['method'], scope['path'])
+    changes_slug = match_changes(scope['method'], scope['path']) if endpoint is None else None
+    if endpoint is None and changes_slug is None:
+        await flask_application(scope, receive, send)
+        return
+
+    # same per-process threads the Flask app starts on its first request
+    JobRunner.ensure_workers()
+    PartitionManager.ensure_maintenance()
+    ModelRegistry.ensure_watcher()
+
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+    extra_headers = cors_headers(headers)
+    if changes_slug is not None:
+        # long-lived, so not subject to admission control
+        await stream_changes(changes_slug, headers, parse_query(scope), extra_headers, receive, send)
+        return
+    client = (scope.get('client') or ('', 0))[0]
+    if AdmissionController.RATE_LIMIT_CLIENT_HEADER:
+        client = headers.get(AdmissionController.RATE_LIMIT_CLIENT_HEADER.lower(), client)
+
+    route_class = ADMISSION_ROUTE_CLASSES.get(endpoint)
+    try:
+        gate = await AdmissionController.admit_async(route_class, client)
+    except AdmissionRejected as ar:
+        logger.warning(f"Shed {scope['method']} {scope['path']} ({route_class}): {ar.message}")
+        await send_json(send, ar.status_code, {"error": ar.message},
+                        extra_headers + [(b'retry-after', str(ar.retry_after).encode('ascii'))])
+        return
+
+    query = parse_query(scope)
+    try:
+        logger.info(f"Received {endpoint} request for {scope['path']}")
+        status, body = await handle(endpoint, arguments, query, receive)
+    except CrudError as ce:
+        logger.warning(f"{endpoint} {scope['path']} rejected: {ce.message}")
+        status, body = ce.status_code, {"error": ce.message}
+    except Exception as e:
+        logger.error(f"Error in {endpoint} {scope['path']}: {str(e)}", exc_info=True)
+        status, body = 500, {"error": "Internal server error"}
+    finally:
+        gate.release()
+    await send_json(send, status, body, extra_headers)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    HTTP_HOST = os.environ.get('HTTP_HOST', '0.0.0.0')
+    HTTP_PORT = int(os.environ.get('HTTP_PORT', 1082))
+
+    logger.info(f"Starting ASGI application on {HTTP_HOST}:{HTTP_PORT}")
+    uvicorn.run(application, host=HTTP_HOST, port=HTTP_PORT)
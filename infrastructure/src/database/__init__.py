@@ -2,9 +2,10 @@
 Database package initialization.
 
 This package provides the DatabaseManager class that encapsulates
-the PostgreSQL connection, session management, and database initialization.
+the PostgreSQL (or embedded SQLite) connection, session management, and database initialization.
 """
 
 from .db import DatabaseManager
+from .routing import DatabaseCluster, RoutingSession, SqliteCluster
 
-__all__ = ['DatabaseManager']
+__all__ = ['DatabaseManager', 'DatabaseCluster', 'RoutingSession', 'SqliteCluster']
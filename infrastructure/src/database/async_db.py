@@ -0,0 +1,202 @@
+# src/database/async_db.py
+import os
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from database.db import DatabaseManager
+from database.routing import RoutingSession
+
+# Initialize a logger for this module.
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabaseManager:
+    """
+    Asyncio counterpart of DatabaseManager, built on SQLAlchemy's asyncio
+    extension and an async Postgres driver (asyncpg by default), or
+    aiosqlite for SQLite databases.
+
+    Every engine of DatabaseManager.clusters (each database's primary and
+    replicas) gets an async twin, and sessions route like RoutingSession: by
+    the class's `_database`, to a healthy replica when opened with
+    read_only=True (or to the reader pool of a SQLite database), otherwise to
+    the primary.
+
+    The async engines are bound to one event loop, so this class owns a
+    dedicated loop running in a background thread. Coroutines that touch the
+    database are submitted to that loop, from asgi.py's native routes and the
+    async Flask views with `await AsyncDatabaseManager.run_async(coro)` or from
+    synchronous code with `AsyncDatabaseManager.run(coro)`. The sync
+    DatabaseManager path is unaffected; both share the same registry of
+    DataObject classes.
+
+    This module is imported on demand so deployments that never use the async
+    path do not need the asyncio extension or the async driver installed.
+    """
+
+    # async drivers used in the connection URLs
+    ASYNC_DB_DRIVER = os.environ.get("ASYNC_DB_DRIVER", "asyncpg")
+    ASYNC_SQLITE_DRIVER = os.environ.get("ASYNC_SQLITE_DRIVER", "aiosqlite")
+
+    # connection pool sizing of each async Postgres engine
+    ASYNC_POOL_SIZE = int(os.environ.get("ASYNC_DB_POOL_SIZE", "20"))
+    ASYNC_MAX_OVERFLOW = int(os.environ.get("ASYNC_DB_MAX_OVERFLOW", "10"))
+
+    _loop = None
+    _thread = None
+    _pid = None
+    # sync engine of DatabaseManager.clusters -> its async twin
+    _engines = {}
+    _session_factory = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _create_engine(cls, engine, cluster):
+        """
+        Create the async twin of a cluster engine. Runs on the manager's event loop.
+        """
+        from sqlalchemy import event
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        if engine.dialect.name == 'sqlite':
+            url = engine.url.set(drivername=f"sqlite+{cls.ASYNC_SQLITE_DRIVER}")
+            logger.info(f"Async database URL constructed: {url.render_as_string()}")
+            async_engine = create_async_engine(url)
+
+            # the async path only reads; same pragmas as the sync reader pool
+            @event.listens_for(async_engine.sync_engine, "connect")
+            def on_connect(dbapi_connection, connection_record):
+                cluster.apply_pragmas(dbapi_connection, read_only=True)
+
+            return async_engine
+
+        url = engine.url.set(drivername=f"postgresql+{cls.ASYNC_DB_DRIVER}")
+        logger.info(f"Async database URL constructed: {url.render_as_string(hide_password=True)}")
+        return create_async_engine(
+            url,
+            pool_size=cls.ASYNC_POOL_SIZE,
+            max_overflow=cls.ASYNC_MAX_OVERFLOW,
+            pool_pre_ping=True
+        )
+
+    @classmethod
+    def async_engine(cls, engine):
+        """
+        Get the async twin of an engine of DatabaseManager.clusters.
+        """
+        return cls._engines[engine]
+
+    @classmethod
+    def start(cls):
+        """
+        Start the event loop thread and create the async engines on it.
+        Safe to call repeatedly; restarts the loop in forked children.
+        """
+        if cls._thread is not None and cls._pid == os.getpid() and cls._thread.is_alive():
+            return
+
+        with cls._lock:
+            if cls._thread is not None and cls._pid == os.getpid() and cls._thread.is_alive():
+                return
+
+            from sqlalchemy.ext.asyncio import AsyncSession
+            from sqlalchemy.orm import sessionmaker
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="async-db-loop", daemon=True)
+            thread.start()
+
+            async def create():
+                engines = {}
+                for cluster in DatabaseManager.clusters.values():
+                    for engine in [cluster.primary] + cluster.replicas:
+                        engines[engine] = cls._create_engine(engine, cluster)
+                return engines
+
+            cls._engines = asyncio.run_coroutine_threadsafe(create(), loop).result()
+            cls._session_factory = sessionmaker(
+                class_=AsyncSession, sync_session_class=AsyncRoutingSession, autoflush=False, expire_on_commit=False
+            )
+            cls._loop = loop
+            cls._thread = thread
+            cls._pid = os.getpid()
+            logger.info(f"Async database engines created successfully ({len(cls._engines)}).")
+
+    @classmethod
+    @asynccontextmanager
+    async def session(cls, read_only: bool = False):
+        """
+        Async context manager yielding a new AsyncSession. Must run on the
+        manager's loop (i.e. inside a coroutine passed to run/run_async).
+        Use one session per concurrent task; sessions are not shareable.
+        With read_only=True, reads may be served by a replica.
+        """
+        session = cls._session_factory()
+        if read_only:
+            session.sync_session.info['prefer_replica'] = True
+        try:
+            yield session
+        finally:
+            await session.close()
+
+    @classmethod
+    def submit(cls, coro):
+        """
+        Schedule a coroutine on the manager's loop and return a concurrent Future.
+        """
+        cls.start()
+        return asyncio.run_coroutine_threadsafe(coro, cls._loop)
+
+    @classmethod
+    def run(cls, coro):
+        """
+        Run a coroutine on the manager's loop and block until it completes.
+        """
+        return cls.submit(coro).result()
+
+    @classmethod
+    async def run_async(cls, coro):
+        """
+        Await a coroutine on the manager's loop from any other event loop.
+        """
+        return await asyncio.wrap_future(cls.submit(coro))
+
+    @classmethod
+    def dispose(cls):
+        """
+        Dispose the async engine and stop the loop.
+        """
+        if cls._loop is None or cls._pid != os.getpid():
+            return
+        for engine in cls._engines.values():
+            cls.run(engine.dispose())
+        cls._loop.call_soon_threadsafe(cls._loop.stop)
+        cls._thread.join(timeout=5)
+        cls._thread = None
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        """
+        Neither the loop thread nor the pooled connections survive a fork.
+        """
+        cls._lock = threading.Lock()
+        cls._loop = None
+        cls._thread = None
+        cls._engines = {}
+        cls._session_factory = None
+
+
+class AsyncRoutingSession(RoutingSession):
+    """
+    The sync session inside AsyncDatabaseManager's AsyncSessions: routes like
+    RoutingSession, to the async twin of the chosen engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        return AsyncDatabaseManager.async_engine(engine).sync_engine
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=AsyncDatabaseManager._after_fork_in_child)
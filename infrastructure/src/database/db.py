@@ -1,9 +1,9 @@
 # src/database/db.py
 import os
 import logging
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
+from .routing import DatabaseCluster, RoutingSession, SqliteCluster
 
 # Initialize a logger for this module.
 logger = logging.getLogger(__name__)
@@ -16,17 +16,108 @@ class DatabaseManager:
     DB_PORT = os.environ.get("DB_PORT", "5432")
     DB_NAME = os.environ.get("DB_NAME", "ai_agent")
     
+    # Backend: postgresql, or sqlite for single-node and edge deployments
+    # (one database file, no server).
+    DB_BACKEND = os.environ.get("DB_BACKEND", "postgresql")
+    DB_SQLITE_PATH = os.environ.get(
+        "DB_SQLITE_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "app.db")
+    )
+    # Size of the read-only connection pool next to the single SQLite writer.
+    DB_SQLITE_READERS = int(os.environ.get("DB_SQLITE_READERS", "4"))
+    DB_SQLITE_BUSY_TIMEOUT = float(os.environ.get("DB_SQLITE_BUSY_TIMEOUT", "5"))
+    # Tuning pragmas applied to every SQLite connection.
+    DB_SQLITE_PRAGMAS = {
+        'synchronous': os.environ.get("DB_SQLITE_SYNCHRONOUS", "NORMAL"),
+        # negative: KiB
+        'cache_size': int(os.environ.get("DB_SQLITE_CACHE_SIZE", "-65536")),
+        'mmap_size': int(os.environ.get("DB_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON'
+    }
+
     # Build the connection URL.
-    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    logger.info(f"Database URL constructed: postgresql://{DB_USER}:********@{DB_HOST}:{DB_PORT}/{DB_NAME}")
-    
-    # Static members for the engine, session factory, and Base.
-    engine = create_engine(DATABASE_URL)
-    logger.info("Database engine created successfully.")
-    
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    db_session = scoped_session(SessionLocal)
+    if DB_BACKEND == 'sqlite':
+        DATABASE_URL = f"sqlite:///{DB_SQLITE_PATH}"
+        logger.info(f"Database URL constructed: {DATABASE_URL}")
+    else:
+        DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+        logger.info(f"Database URL constructed: postgresql://{DB_USER}:********@{DB_HOST}:{DB_PORT}/{DB_NAME}")
+
+    # Read replicas of the primary: comma-separated host[:port] or full URLs.
+    DB_REPLICAS = os.environ.get("DB_REPLICAS", "")
+    # Replicas lagging more than this many seconds are taken out of rotation.
+    DB_REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", "5"))
+    DB_REPLICA_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL", "5"))
+    # Additional named databases for DataObject types with a `_database`
+    # attribute, e.g. DB_DATABASES=audit with DB_AUDIT_URL and DB_AUDIT_REPLICAS.
+    DB_DATABASES = os.environ.get("DB_DATABASES", "")
+
+    @classmethod
+    def _replica_urls(cls, replicas):
+        urls = []
+        for replica in (r.strip() for r in replicas.split(",")):
+            if not replica:
+                continue
+            if "://" in replica:
+                urls.append(replica)
+            else:
+                host, _, port = replica.partition(":")
+                urls.append(f"postgresql://{cls.DB_USER}:{cls.DB_PASSWORD}@{host}:{port or cls.DB_PORT}/{cls.DB_NAME}")
+        return urls
+
+    @classmethod
+    def _build_cluster(cls, name, url, replicas):
+        if url.startswith("sqlite"):
+            # sqlite:///relative/path or sqlite:////absolute/path
+            return SqliteCluster(
+                name, url.split(":///", 1)[1], cls.DB_SQLITE_READERS, cls.DB_SQLITE_PRAGMAS, cls.DB_SQLITE_BUSY_TIMEOUT
+            )
+        return DatabaseCluster(
+            name, url, cls._replica_urls(replicas), cls.DB_REPLICA_MAX_LAG, cls.DB_REPLICA_CHECK_INTERVAL
+        )
+
+    @classmethod
+    def _build_clusters(cls):
+        clusters = {'default': cls._build_cluster('default', cls.DATABASE_URL, cls.DB_REPLICAS)}
+        for name in (n.strip() for n in cls.DB_DATABASES.split(",")):
+            if not name:
+                continue
+            prefix = f"DB_{name.upper()}"
+            clusters[name] = cls._build_cluster(
+                name, os.environ[f"{prefix}_URL"], os.environ.get(f"{prefix}_REPLICAS", "")
+            )
+        for name, cluster in clusters.items():
+            logger.info(f"Database {name}: primary plus {len(cluster.replicas)} replica(s)")
+        return clusters
+
+    # Static members for the engines, session factory, and Base.
+    clusters = None
+    engine = None
+    SessionLocal = None
+    db_session = None
     Base = declarative_base()
+
+    @classmethod
+    def configure(cls):
+        """
+        Create the database clusters and the routing session factory.
+        """
+        cls.clusters = cls._build_clusters()
+        cls.engine = cls.clusters['default'].primary
+        RoutingSession.clusters = cls.clusters
+        logger.info("Database engine created successfully.")
+
+        cls.SessionLocal = sessionmaker(class_=RoutingSession, autoflush=False)
+        cls.db_session = scoped_session(cls.SessionLocal)
+
+    @classmethod
+    def get_engine(cls, data_object_class=None):
+        """
+        Get the primary engine of the database a DataObject class lives on.
+        """
+        name = getattr(data_object_class, '_database', None) or 'default'
+        return cls.clusters[name].primary
     
     @classmethod
     def init_db(cls):
@@ -37,19 +128,42 @@ class DatabaseManager:
         try:
             # Import all modules that define models to ensure they are registered with the Base.
             import models  # Ensure models/__init__.py imports your model classes (e.g., Trigger)
+            from models.data_object import DataObject
             cls.Base.metadata.create_all(bind=cls.engine)
+            # every database keeps the change log of the types it holds
+            from models.change_event import ChangeEvent
+            for name, cluster in cls.clusters.items():
+                if name != 'default':
+                    ChangeEvent.__table__.create(cluster.primary, checkfirst=True)
+            # data objects are declared on their own Base; create them per class
+            for data_object_class in DataObject._registered_classes:
+                data_object_class.create_table(cls.get_engine(data_object_class))
             logger.info("Database tables created successfully.")
         except Exception as e:
             logger.error("Error initializing the database: %s", e)
             raise
     
     @classmethod
-    def get_session(cls):
+    def get_session(cls, read_only=False):
         """
         Returns a new session instance.
+        With read_only=True, reads may be served by a replica until the
+        session writes; after that it sticks to the primary.
         """
         logger.debug("Creating new database session.")
-        return cls.db_session()
+        session = cls.db_session()
+        if read_only and not session.info.get('wrote'):
+            session.info['prefer_replica'] = True
+        return session
+
+    @classmethod
+    def stats(cls):
+        """
+        Get the primary/replica state of every database.
+        """
+        return {name: cluster.stats() for name, cluster in cls.clusters.items()}
+
+DatabaseManager.configure()
 
 # Example usage:
 # from database.db import DatabaseManager
@@ -0,0 +1,287 @@
+# src/database/routing.py
+import os
+import time
+import logging
+import itertools
+import threading
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+
+# Initialize a logger for this module.
+logger = logging.getLogger(__name__)
+
+# Replication lag of a standby in seconds; 0 when it has replayed everything it received.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class DatabaseCluster:
+    """
+    One logical database: a primary engine plus zero or more read replicas.
+
+    Replicas are health checked in a background thread; a replica that fails
+    the check or lags more than max_lag seconds is taken out of rotation until
+    it recovers, and reads fall back to the primary when none are healthy.
+    """
+
+    # readers see every commit at once, so any read may go to them
+    readers_current = False
+
+    def __init__(self, name, primary_url, replica_urls=(), max_lag=5.0, check_interval=5.0, engine_options=None):
+        self.name = name
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        engine_options = engine_options or {}
+
+        self.primary, self.replicas = self._create_engines(primary_url, replica_urls, engine_options)
+
+        # replica engine -> {'healthy': bool, 'lag': float, 'error': str, 'checked_at': float}
+        self.replica_status = {
+            replica: {'healthy': True, 'lag': None, 'error': None, 'checked_at': None}
+            for replica in self.replicas
+        }
+        self._healthy = list(self.replicas)
+        self._round_robin = itertools.count()
+        self._checker = None
+        self._checker_pid = None
+        self._lock = threading.Lock()
+
+    def _create_engines(self, primary_url, replica_urls, engine_options):
+        primary = create_engine(primary_url, **engine_options)
+        replicas = [create_engine(url, pool_pre_ping=True, **engine_options) for url in replica_urls]
+        return primary, replicas
+
+    def reader(self):
+        """
+        Pick a healthy replica (round robin), or the primary if there is none.
+        """
+        if not self.replicas:
+            return self.primary
+        self._ensure_checker()
+        healthy = self._healthy
+        if not healthy:
+            return self.primary
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    def check_replicas(self):
+        """
+        Measure lag of every replica and update the healthy set.
+        """
+        healthy = []
+        for replica in self.replicas:
+            status = self.replica_status[replica]
+            try:
+                with replica.connect() as connection:
+                    lag = float(connection.execute(REPLICA_LAG_SQL).scalar() or 0)
+                status.update(lag=lag, error=None, healthy=lag <= self.max_lag)
+            except Exception as e:
+                status.update(lag=None, error=str(e), healthy=False)
+            status['checked_at'] = time.time()
+
+            if status['healthy']:
+                healthy.append(replica)
+            else:
+                logger.warning(
+                    f"Replica {replica.url.host}:{replica.url.port} of {self.name} out of rotation "
+                    f"(lag={status['lag']}, error={status['error']})"
+                )
+        self._healthy = healthy
+
+    def _ensure_checker(self):
+        """
+        Start this process's health check thread.
+        """
+        if self._checker is not None and self._checker_pid == os.getpid():
+            return
+
+        def run():
+            while True:
+                try:
+                    self.check_replicas()
+                except Exception as e:
+                    logger.error(f"Replica health check for {self.name} failed: {str(e)}")
+                time.sleep(self.check_interval)
+
+        with self._lock:
+            if self._checker is not None and self._checker_pid == os.getpid():
+                return
+            self._checker_pid = os.getpid()
+            self._checker = threading.Thread(target=run, name=f"replica-check-{self.name}", daemon=True)
+            self._checker.start()
+
+    def stats(self):
+        return {
+            'primary': f"{self.primary.url.host}:{self.primary.url.port}/{self.primary.url.database}",
+            'replicas': [
+                {
+                    'replica': f"{replica.url.host}:{replica.url.port}",
+                    **self.replica_status[replica],
+                    'in_rotation': replica in self._healthy
+                }
+                for replica in self.replicas
+            ]
+        }
+
+
+class SqliteCluster(DatabaseCluster):
+    """
+    A SQLite database file used as a cluster: one writer connection as the
+    primary and a pool of read-only connections as its single "replica".
+
+    The file runs in WAL mode, so readers never block the writer and see
+    every committed write at once; there is no lag to check, and sessions
+    read on the readers until they write (see RoutingSession). Readers run
+    each statement on its own (no BEGIN), so a read never sees a snapshot
+    older than the statement, like Postgres reads in autocommit. Writer
+    transactions start with BEGIN IMMEDIATE so concurrent writers queue on
+    the busy timeout instead of failing when a read upgrades to a write.
+    """
+
+    readers_current = True
+
+    def __init__(self, name, path, readers=4, pragmas=None, busy_timeout=5.0):
+        self.path = path
+        self.readers = readers
+        self.pragmas = dict(pragmas or {})
+        self.busy_timeout = busy_timeout
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        url = f"sqlite:///{path}"
+        super().__init__(name, url, [url] if readers > 0 else [], max_lag=0.0, check_interval=0.0)
+
+    def _create_engines(self, primary_url, replica_urls, engine_options):
+        connect_args = {'check_same_thread': False, 'timeout': self.busy_timeout}
+        primary = create_engine(
+            primary_url, poolclass=QueuePool, pool_size=1, max_overflow=0, connect_args=connect_args
+        )
+        self._configure_engine(primary, read_only=False)
+        replicas = []
+        for url in replica_urls:
+            reader = create_engine(
+                url, poolclass=QueuePool, pool_size=self.readers, max_overflow=0, connect_args=connect_args
+            )
+            self._configure_engine(reader, read_only=True)
+            replicas.append(reader)
+
+        # switch the file to WAL before any reader opens it; drop the
+        # connection so forked workers do not inherit it
+        with primary.connect():
+            pass
+        primary.dispose()
+        return primary, replicas
+
+    def _configure_engine(self, engine, read_only):
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            # transactions are begun explicitly below
+            dbapi_connection.isolation_level = None
+            self.apply_pragmas(dbapi_connection, read_only)
+
+        if read_only:
+            # no transaction: each statement reads the latest commit
+            return
+
+        @event.listens_for(engine, "begin")
+        def on_begin(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    def apply_pragmas(self, dbapi_connection, read_only=False):
+        """
+        Apply the journal mode and tuning pragmas to a new DBAPI connection.
+        """
+        cursor = dbapi_connection.cursor()
+        try:
+            if not read_only:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+            for pragma, value in self.pragmas.items():
+                cursor.execute(f"PRAGMA {pragma}={value}")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+    def check_replicas(self):
+        # readers share the file: always current
+        for reader in self.replicas:
+            self.replica_status[reader].update(healthy=True, lag=0.0, error=None, checked_at=time.time())
+
+    def _ensure_checker(self):
+        return
+
+    def stats(self):
+        return {
+            'primary': f"sqlite:{self.path} (single writer)",
+            'replicas': [
+                {'replica': f"sqlite:{self.path} (readers)", 'pool_size': self.readers, 'in_rotation': True}
+                for _ in self.replicas
+            ]
+        }
+
+
+class RoutingSession(Session):
+    """
+    Session that routes each statement to a DatabaseCluster.
+
+    The cluster comes from the mapped class's `_database` attribute (default
+    cluster otherwise). Writes, flushes and everything after the first write
+    in the session go to the primary (read-your-writes). Reads go to a replica
+    only when the session was opened for reading, i.e. info['prefer_replica']
+    is set (DatabaseManager.get_session(read_only=True)), or when the
+    cluster's readers are always current (SQLite): there every read before
+    the first write goes to a reader, so the single writer's lock is only
+    taken once the session flushes.
+
+    Sessions of read-only requests (info['read_only_request']) read on
+    Postgres connections in autocommit, read-only mode: no BEGIN/COMMIT
+    round trips, and a stray write fails instead of holding locks.
+    """
+
+    # DatabaseCluster instances by name, set up by DatabaseManager
+    clusters = {}
+    # engine -> the same engine (and pool) with read-only execution options
+    _read_only_engines = {}
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        cluster_name = None
+        if mapper is not None:
+            mapped_class = getattr(mapper, 'class_', None)
+            cluster_name = getattr(mapped_class, '_database', None)
+        cluster = self.clusters.get(cluster_name or 'default') or self.clusters['default']
+
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info['wrote'] = True
+            return cluster.primary
+        if self.info.get('wrote') or not (self.info.get('prefer_replica') or cluster.readers_current):
+            engine = cluster.primary
+        else:
+            engine = cluster.reader()
+        if self.info.get('read_only_request') and not self.info.get('wrote'):
+            return self.read_only_engine(engine)
+        return engine
+
+    @classmethod
+    def read_only_engine(cls, engine):
+        """
+        Get a variant of an engine whose connections run in autocommit,
+        read-only mode (Postgres; other databases are returned unchanged).
+        """
+        if engine.dialect.name != 'postgresql':
+            return engine
+        read_only = cls._read_only_engines.get(engine)
+        if read_only is None:
+            # shares the pool; the options are reset when a connection is returned
+            read_only = engine.execution_options(isolation_level="AUTOCOMMIT", postgresql_readonly=True)
+            cls._read_only_engines[engine] = read_only
+        return read_only
+
+    def close(self):
+        # stickiness lasts for one unit of work
+        self.info.pop('wrote', None)
+        self.info.pop('prefer_replica', None)
+        super().close()
@@ -3,8 +3,21 @@
 
 import os
 import logging
-from flask import Flask, jsonify
+from flask import Flask, Response, g, jsonify, request, send_file
 from utils.data_object import DataObjectManager
+from utils.crud import CrudEngine, CrudError
+from utils.row_cache import RowCache
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.change_feed import ChangeFeed
+from utils.facets import FacetEngine
+from utils.jobs import JobRunner
+from utils.data_transfer import DataTransfer
+from utils.partitions import PartitionManager
+from utils.query_guard import QueryGuard
+from utils.regex_safety import RegexSafety
+from utils.model_registry import ModelRegistry
+from utils.request_scope import RequestScope
+from database.db import DatabaseManager
 from utils.logger import logger
 from werkzeug.exceptions import HTTPException
 from flask_cors import CORS
@@ -16,11 +29,104 @@ print(f"Root logger level: {logging.getLogger().getEffectiveLevel()}")
 
 app = Flask(__name__)
 
+# descriptions and the master document are served from the registry snapshot
+ModelRegistry.current()
+
 # Get CORS allowed origins from environment variable
 allowed_origins = os.environ.get('CORS_ALLOWED_ORIGINS').split(',')
 if allowed_origins:
     CORS(app, resources={r"/api/*": {"origins": allowed_origins}})
 
+# Admission control: route class of each endpoint. Endpoints not listed
+# (home, stats) are never shed so they stay observable under overload.
+ADMISSION_ROUTE_CLASSES = {
+    'get_object_description': 'metadata',
+    'get_master_document': 'metadata',
+    'list_objects': 'read',
+    'search_objects': 'read',
+    'get_object_facets': 'read',
+    'read_object': 'read',
+    'async_list_objects': 'read',
+    'async_search_objects': 'read',
+    'async_read_object': 'read',
+    'async_resolve_references': 'read',
+    'create_object': 'write',
+    'update_object': 'write',
+    'delete_object': 'write',
+    'import_objects': 'write',
+    'export_objects': 'write',
+    'reindex_objects': 'write',
+    'cancel_job': 'write',
+    'get_job': 'read',
+    'get_job_result': 'read'
+}
+
+
+@app.before_request
+def admit_request():
+    """
+    Apply per-client rate limits and per-route-class concurrency limits.
+    Shed requests get an immediate 503 (or 429) with Retry-After.
+    """
+    route_class = ADMISSION_ROUTE_CLASSES.get(request.endpoint)
+    if route_class is None:
+        return None
+
+    if AdmissionController.RATE_LIMIT_CLIENT_HEADER:
+        client = request.headers.get(AdmissionController.RATE_LIMIT_CLIENT_HEADER, request.remote_addr)
+    else:
+        client = request.remote_addr
+
+    try:
+        g.admission_gate = AdmissionController.admit(route_class, client)
+    except AdmissionRejected as ar:
+        logger.warning(f"Shed {request.method} {request.path} ({route_class}): {ar.message}")
+        response = jsonify({"error": ar.message})
+        response.status_code = ar.status_code
+        response.headers['Retry-After'] = str(ar.retry_after)
+        return response
+    return None
+
+
+@app.before_request
+def start_background_threads():
+    """
+    Start this worker process's job, partition maintenance and (with
+    MODEL_RELOAD) model watcher threads on its first request.
+    """
+    JobRunner.ensure_workers()
+    PartitionManager.ensure_maintenance()
+    ModelRegistry.ensure_watcher()
+
+
+@app.before_request
+def begin_request_scope():
+    """
+    Count the request's database use; its session is only opened on first use.
+    """
+    RequestScope.begin(request.endpoint, request.method)
+
+
+@app.after_request
+def end_request_scope(response):
+    """
+    Commit and release the request's session before the response is sent.
+    """
+    return RequestScope.end(response)
+
+
+@app.teardown_request
+def release_admission(exception=None):
+    gate = g.pop('admission_gate', None)
+    if gate is not None:
+        gate.release()
+
+
+@app.teardown_request
+def teardown_request_scope(exception=None):
+    RequestScope.teardown(exception)
+
+
 @app.route('/')
 def home():
     try:
@@ -81,6 +187,437 @@ def get_master_document(trailing_slash):
         return jsonify({"error": "Internal server error"}), 500
 
 
+@app.route('/api/<string:object_slug>', methods=['POST'])
+def create_object(object_slug):
+    """
+    Create a data object record
+    """
+    try:
+        logger.info(f"Received create request for {object_slug}")
+        record = CrudEngine.create(object_slug, request.get_json(silent=True))
+        return jsonify(record), 201
+    except CrudError as ce:
+        logger.warning(f"Create {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error creating {object_slug}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/<string:object_slug>', methods=['GET'])
+def list_objects(object_slug):
+    """
+    List data object records (keyset pagination, see CrudEngine.build_list_query)
+    """
+    try:
+        logger.info(f"Received list request for {object_slug}")
+        return jsonify(CrudEngine.list(object_slug, request.args.to_dict()))
+    except CrudError as ce:
+        logger.warning(f"List {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error listing {object_slug}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/<string:object_slug>/search', methods=['GET'])
+def search_objects(object_slug):
+    """
+    Text search over data object records
+    """
+    try:
+        logger.info(f"Received search request for {object_slug}")
+        return jsonify(CrudEngine.search(object_slug, request.args.to_dict()))
+    except CrudError as ce:
+        logger.warning(f"Search {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error searching {object_slug}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/<string:object_slug>/facets', methods=['GET'])
+def get_object_facets(object_slug):
+    """
+    Count data object records per value of each enum and searchFields field,
+    with the list filters applied
+    """
+    try:
+        logger.info(f"Received facets request for {object_slug}")
+        return jsonify(FacetEngine.facets(object_slug, request.args.to_dict()))
+    except CrudError as ce:
+        logger.warning(f"Facets {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error counting facets of {object_slug}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/<string:object_slug>/changes', methods=['GET'])
+def stream_object_changes(object_slug):
+    """
+    Server-sent events stream of changes to a data object type.
+    Resumes from the Last-Event-ID header (or last_event_id parameter), with
+    a small window of earlier ids replayed; clients drop ids they already have.
+    Long-lived, so it is not subject to admission control. Holds a thread for
+    its lifetime here; asgi.py serves it on the event loop instead.
+    """
+    try:
+        CrudEngine.get_class(object_slug, 'list')
+        slug = object_slug.lower()
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        if last_event_id is not None:
+            try:
+                last_event_id = int(last_event_id)
+            except ValueError:
+                return jsonify({"error": "Invalid Last-Event-ID"}), 400
+
+        logger.info(f"Change feed subscriber for {slug} (last event {last_event_id})")
+        return Response(
+            ChangeFeed.stream(slug, last_event_id),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except CrudError as ce:
+        logger.warning(f"Change feed {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error opening change feed for {object_slug}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/<string:object_slug>/<string:object_id>', methods=['GET'])
+def read_object(object_slug, object_id):
+    """
+    Read a single data object record
+    """
+    try:
+        logger.info(f"Received read request for {object_slug} {object_id}")
+        record = CrudEngine.read(object_slug, object_id)
+        if record is None:
+            return jsonify({"error": "Record not found"}), 404
+        return jsonify(record)
+    except CrudError as ce:
+        logger.warning(f"Read {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error reading {object_slug} {object_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/<string:object_slug>/<string:object_id>', methods=['PUT'])
+def update_object(object_slug, object_id):
+    """
+    Update a data object record
+    """
+    try:
+        logger.info(f"Received update request for {object_slug} {object_id}")
+        record = CrudEngine.update(object_slug, object_id, request.get_json(silent=True))
+        if record is None:
+            return jsonify({"error": "Record not found"}), 404
+        return jsonify(record)
+    except CrudError as ce:
+        logger.warning(f"Update {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error updating {object_slug} {object_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/<string:object_slug>/<string:object_id>', methods=['DELETE'])
+def delete_object(object_slug, object_id):
+    """
+    Delete a data object record
+    """
+    try:
+        logger.info(f"Received delete request for {object_slug} {object_id}")
+        if not CrudEngine.delete(object_slug, object_id):
+            return jsonify({"error": "Record not found"}), 404
+        return '', 204
+    except CrudError as ce:
+        logger.warning(f"Delete {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error deleting {object_slug} {object_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+# Background jobs. Submissions return 202 with the job's status document;
+# clients poll /api/jobs/<job_id> for progress.
+@app.route('/api/<string:object_slug>/import', methods=['POST'])
+def import_objects(object_slug):
+    """
+    Queue an import of the request body (CSV with a header row, or NDJSON)
+    """
+    try:
+        job = DataTransfer.submit_import(
+            object_slug, request.stream,
+            request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'ndjson'),
+            request.args.get('on_error', 'skip')
+        )
+        logger.info(f"Queued import job {job['id']} for {object_slug}")
+        return jsonify(job), 202
+    except CrudError as ce:
+        logger.warning(f"Import {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error queueing import of {object_slug}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/<string:object_slug>/export', methods=['POST'])
+def export_objects(object_slug):
+    """
+    Queue a full export of a data object type (format=csv or ndjson)
+    """
+    try:
+        job = DataTransfer.submit_export(object_slug, request.args.get('format', 'ndjson'))
+        logger.info(f"Queued export job {job['id']} for {object_slug}")
+        return jsonify(job), 202
+    except CrudError as ce:
+        logger.warning(f"Export {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error queueing export of {object_slug}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/<string:object_slug>/reindex', methods=['POST'])
+def reindex_objects(object_slug):
+    """
+    Queue an index build/rebuild of a data object type's table
+    """
+    try:
+        job = DataTransfer.submit_reindex(object_slug)
+        logger.info(f"Queued reindex job {job['id']} for {object_slug}")
+        return jsonify(job), 202
+    except CrudError as ce:
+        logger.warning(f"Reindex {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error queueing reindex of {object_slug}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/jobs/<string:job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get the status and progress of a background job
+    """
+    try:
+        job = JobRunner.get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"Error reading job {job_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/jobs/<string:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """
+    Cancel a queued job, or ask a running job to stop
+    """
+    try:
+        job = JobRunner.cancel(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        logger.info(f"Cancel requested for job {job_id} ({job['status']})")
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"Error cancelling job {job_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/jobs/<string:job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """
+    Download the file produced by a finished export job
+    """
+    try:
+        job = JobRunner.get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        path = DataTransfer.result_path(job)
+        if path is None:
+            return jsonify({"error": f"Job {job_id} has no result file ({job['status']})"}), 409
+        return send_file(path, as_attachment=True, download_name=f"{job['slug']}-{job_id}.{job['result']['format']}")
+    except Exception as e:
+        logger.error(f"Error sending result of job {job_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+# Asyncio data-access path. Database work is submitted to
+# AsyncDatabaseManager's event loop, so one request can fan out into
+# concurrent queries (see /api/async/resolve). Under a WSGI server Flask runs
+# each of these coroutines to completion on the request's worker thread, so
+# every in-flight request still holds a thread; asgi.py serves the same routes
+# natively on an ASGI server without holding one. The async modules are
+# imported on first use.
+@app.route('/api/async/<string:object_slug>', methods=['GET'])
+async def async_list_objects(object_slug):
+    """
+    List data object records through the asyncio data layer
+    """
+    from database.async_db import AsyncDatabaseManager
+    from utils.async_crud import AsyncCrudEngine
+    try:
+        logger.info(f"Received async list request for {object_slug}")
+        page = await AsyncDatabaseManager.run_async(AsyncCrudEngine.list(object_slug, request.args.to_dict()))
+        return jsonify(page)
+    except CrudError as ce:
+        logger.warning(f"Async list {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error listing {object_slug} (async): {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/async/<string:object_slug>/search', methods=['GET'])
+async def async_search_objects(object_slug):
+    """
+    Text search through the asyncio data layer
+    """
+    from database.async_db import AsyncDatabaseManager
+    from utils.async_crud import AsyncCrudEngine
+    try:
+        logger.info(f"Received async search request for {object_slug}")
+        page = await AsyncDatabaseManager.run_async(AsyncCrudEngine.search(object_slug, request.args.to_dict()))
+        return jsonify(page)
+    except CrudError as ce:
+        logger.warning(f"Async search {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error searching {object_slug} (async): {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/async/<string:object_slug>/<string:object_id>', methods=['GET'])
+async def async_read_object(object_slug, object_id):
+    """
+    Read a single data object record through the asyncio data layer
+    """
+    from database.async_db import AsyncDatabaseManager
+    from utils.async_crud import AsyncCrudEngine
+    try:
+        logger.info(f"Received async read request for {object_slug} {object_id}")
+        record = await AsyncDatabaseManager.run_async(AsyncCrudEngine.read(object_slug, object_id))
+        if record is None:
+            return jsonify({"error": "Record not found"}), 404
+        return jsonify(record)
+    except CrudError as ce:
+        logger.warning(f"Async read {object_slug} rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error reading {object_slug} {object_id} (async): {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/async/resolve', methods=['POST'])
+async def async_resolve_references():
+    """
+    Resolve several records of any types in parallel.
+    Body: {"references": [{"slug": "user", "id": "..."}, ...]}
+    """
+    from database.async_db import AsyncDatabaseManager
+    from utils.async_crud import AsyncCrudEngine
+    try:
+        body = request.get_json(silent=True) or {}
+        references = body.get('references')
+        if not isinstance(references, list):
+            return jsonify({"error": "references must be a list"}), 400
+        logger.info(f"Received async resolve request for {len(references)} references")
+        results = await AsyncDatabaseManager.run_async(AsyncCrudEngine.resolve(references))
+        return jsonify({"results": results})
+    except CrudError as ce:
+        logger.warning(f"Async resolve rejected: {ce.message}")
+        return jsonify({"error": ce.message}), ce.status_code
+    except Exception as e:
+        logger.error(f"Error resolving references (async): {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/stats/cache', strict_slashes=False)
+def get_cache_stats():
+    """
+    Get hit/miss/eviction counters of the row and facet caches in this worker process
+    """
+    return jsonify({"pid": os.getpid(), "caches": RowCache.all_stats(), "facets": FacetEngine.stats()})
+
+
+@app.route('/api/stats/admission', strict_slashes=False)
+def get_admission_stats():
+    """
+    Get admission control and rate limit counters for this worker process
+    """
+    return jsonify({"pid": os.getpid(), **AdmissionController.stats()})
+
+
+@app.route('/api/stats/changes', strict_slashes=False)
+def get_change_feed_stats():
+    """
+    Get change feed subscriber and delivery counters for this worker process
+    """
+    return jsonify({"pid": os.getpid(), **ChangeFeed.stats()})
+
+
+@app.route('/api/stats/jobs', strict_slashes=False)
+def get_job_stats():
+    """
+    Get job counts by status and this worker process's job counters
+    """
+    return jsonify({"pid": os.getpid(), **JobRunner.stats()})
+
+
+@app.route('/api/stats/partitions', strict_slashes=False)
+def get_partition_stats():
+    """
+    Get the attached partitions of every partitioned data object table
+    """
+    return jsonify({"pid": os.getpid(), "partitions": PartitionManager.stats()})
+
+
+@app.route('/api/stats/queries', strict_slashes=False)
+def get_query_stats():
+    """
+    Get the list/search query shapes over their cost budget and the guard counters
+    """
+    return jsonify({"pid": os.getpid(), **QueryGuard.stats()})
+
+
+@app.route('/api/stats/regex', strict_slashes=False)
+def get_regex_stats():
+    """
+    Get the backtracking assessment of every validation pattern and the regex timeouts
+    """
+    return jsonify({"pid": os.getpid(), **RegexSafety.stats()})
+
+
+@app.route('/api/stats/registry', strict_slashes=False)
+def get_registry_stats():
+    """
+    Get the model registry version and the timings of recent model reloads
+    """
+    return jsonify({"pid": os.getpid(), **ModelRegistry.stats()})
+
+
+@app.route('/api/stats/requests', strict_slashes=False)
+def get_request_stats():
+    """
+    Get the queries, query time and connection checkouts of each route
+    """
+    return jsonify({"pid": os.getpid(), "routes": RequestScope.stats()})
+
+
+@app.route('/api/stats/database', strict_slashes=False)
+def get_database_stats():
+    """
+    Get primary/replica routing and replica health for this worker process
+    """
+    return jsonify({"pid": os.getpid(), "databases": DatabaseManager.stats()})
+
+
 # Global error handlers
 @app.errorhandler(404)
 def not_found_error(error):
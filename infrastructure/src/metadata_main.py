@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+# src/metadata_main.py
+#
+# Metadata-only API server. Serves /api/master and /api/object/<slug> from a
+# description snapshot built by tools/build_description_snapshot.py, without
+# importing SQLAlchemy, the models or the database engine. Start one or more
+# of these behind the same address as main.py to scale metadata traffic out.
+
+import os
+from flask import Flask, Response, jsonify, request
+from utils.description_snapshot import DescriptionSnapshot
+from utils.logger import logger
+from werkzeug.exceptions import HTTPException
+from flask_cors import CORS
+
+SNAPSHOT_PATH = os.environ.get(
+    "DESCRIPTION_SNAPSHOT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "descriptions.snapshot")
+)
+
+snapshot = DescriptionSnapshot(SNAPSHOT_PATH)
+logger.info(f"Loaded description snapshot {snapshot.version} from {SNAPSHOT_PATH} "
+            f"({len(snapshot.header['objects'])} object types, built {snapshot.header['built_at']})")
+
+app = Flask(__name__)
+
+# Get CORS allowed origins from environment variable
+allowed_origins = os.environ.get('CORS_ALLOWED_ORIGINS').split(',')
+if allowed_origins:
+    CORS(app, resources={r"/api/*": {"origins": allowed_origins}})
+
+
+def snapshot_response(body: bytes):
+    """
+    Return pre-encoded JSON with an ETag derived from the snapshot version.
+    """
+    etag = f'"{snapshot.version}"'
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={'ETag': etag})
+    return Response(body, mimetype='application/json', headers={'ETag': etag})
+
+
+@app.route('/api/object/<string:object_slug>/', defaults={'trailing_slash': True}, strict_slashes=False)
+@app.route('/api/object/<string:object_slug>', defaults={'trailing_slash': False}, strict_slashes=False)
+def get_object_description(object_slug, trailing_slash):
+    """
+    Get the description of a data object from the snapshot
+    """
+    try:
+        if not object_slug.isalnum() and not all(c in object_slug + '_-' for c in object_slug):
+            logger.warning(f"Invalid object slug received: {object_slug}")
+            return jsonify({"error": "Invalid object slug"}), 400
+
+        description = snapshot.get_object_description(object_slug)
+        if description is None:
+            logger.warning(f"Object type not found: {object_slug}")
+            return jsonify({"error": "Object type not found"}), 404
+        return snapshot_response(description)
+    except Exception as e:
+        logger.error(f"Unexpected error in get_object_description: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/master/', defaults={'trailing_slash': True}, strict_slashes=False)
+@app.route('/api/master', defaults={'trailing_slash': False}, strict_slashes=False)
+def get_master_document(trailing_slash):
+    """
+    Get the master document from the snapshot
+    """
+    try:
+        return snapshot_response(snapshot.get_master_document())
+    except Exception as e:
+        logger.error(f"Error serving master document: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.errorhandler(404)
+def not_found_error(error):
+    return jsonify({"error": "Resource not found"}), 404
+
+@app.errorhandler(Exception)
+def handle_exception(e):
+    if isinstance(e, HTTPException):
+        return jsonify({"error": str(e)}), e.code
+    logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+    return jsonify({"error": "Internal server error"}), 500
+
+
+if __name__ == '__main__':
+    HTTP_HOST = os.environ.get('HTTP_HOST', '0.0.0.0')
+    HTTP_PORT = os.environ.get('HTTP_PORT', 1082)
+
+    logger.info(f"Starting metadata-only Flask application on {HTTP_HOST}:{HTTP_PORT}")
+    app.run(host=HTTP_HOST, port=HTTP_PORT)
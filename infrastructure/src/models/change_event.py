@@ -0,0 +1,41 @@
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON, Index
+from database.db import DatabaseManager
+
+
+class ChangeEvent(DatabaseManager.Base):
+    """
+    Change log of writes to data objects, read by the change feed to let
+    subscribers resume from a Last-Event-ID. Not a DataObject, so it is not
+    registered or exposed through the API.
+    """
+    __tablename__ = 'data_object_changes'
+
+    id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    slug = Column(String(50), nullable=False)
+    object_id = Column(String(50), nullable=False)
+    op = Column(String(10), nullable=False)
+    version = Column(String(32), nullable=True)
+    fields = Column(JSON, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_data_object_changes_slug_id', 'slug', 'id'),
+        Index('ix_data_object_changes_created_at', 'created_at'),
+    )
+
+    def to_event(self):
+        """
+        Compact event sent to subscribers.
+        """
+        return {
+            'event_id': self.id,
+            'slug': self.slug,
+            'id': self.object_id,
+            'op': self.op,
+            'version': self.version,
+            'fields': self.fields
+        }
+
+    def __repr__(self):
+        return f"<ChangeEvent(id={self.id}, slug={self.slug}, object_id={self.object_id}, op={self.op})>"
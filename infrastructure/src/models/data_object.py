@@ -1,10 +1,27 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index, text
 from sqlalchemy.ext.declarative import declarative_base
+from werkzeug.security import check_password_hash, generate_password_hash
 from utils.logger import logger
+from utils.id_generator import IdGenerator
+from utils.serializer import RowSerializer
+from utils.partitions import PartitionManager
+from utils.regex_safety import RegexSafety
 
 Base = declarative_base()
 
+
+def generate_default_id(context):
+    """
+    Column default for DataObject.id, used when rows are inserted without an id
+    (e.g. Core inserts). Picks the generator of the class that owns the table.
+    """
+    table = context.current_column.table
+    for registered_class in DataObject._registered_classes:
+        if registered_class.__table__ is table:
+            return registered_class.generate_id()
+    return IdGenerator.get(DataObject._id_generator).generate()
+
 class DataObject(Base):
     """
     Base class for all data objects in the system.
@@ -18,6 +35,11 @@ class DataObject(Base):
     # static variable to store all registered classes
     _registered_classes = []
 
+    # Registry snapshot (classes by slug, descriptions, master document)
+    # published by utils.model_registry.ModelRegistry; replaced as a whole on
+    # reload, so a request keeps the snapshot it started with.
+    _registry = None
+
     # Common field definitions
     _common_field_attributes = {
         'id': {
@@ -42,13 +64,34 @@ class DataObject(Base):
         }
     }
 
+    # Name of the IdGenerator used for new primary keys; override per class.
+    # Time-ordered generators (uuid7, ulid, snowflake) keep inserts at the
+    # right-hand edge of the primary key index.
+    _id_generator = 'uuid7'
+
+    # Name of the database (see DatabaseManager.DB_DATABASES) holding this
+    # type's table; None keeps it on the default database.
+    _database = None
+
+    # Read-through row cache settings ({'ttl', 'max_entries', 'max_bytes'});
+    # None disables caching for the class. See utils.row_cache.RowCache.
+    _row_cache = None
+
+    # Range partitioning of the table on created_at (Postgres only), e.g.
+    # {'interval': 'month', 'premake': 3, 'retention': 12}; None keeps a
+    # single table. See utils.partitions.PartitionManager.
+    _partitioning = None
+
     # Common identifier field
-    id = Column(String(50), primary_key=True)
+    id = Column(String(50), primary_key=True, default=generate_default_id)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = Column(String(50), nullable=False, default='System')
     updated_by = Column(String(50), nullable=False, default='System')
 
+    # werkzeug hash method of password-format fields (see hash_passwords)
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256'
+
     _field_type_map = {
         'varchar': 'text'
     }
@@ -58,8 +101,20 @@ class DataObject(Base):
         Initialize a new DataObject instance
         """
         super(DataObject, self).__init__(**kwargs)
-        self.created_at = datetime.utcnow()
-        self.updated_at = self.created_at
+        if self.id is None:
+            self.id = self.generate_id()
+        # keep timestamps given by the caller (e.g. copies of existing records)
+        if self.created_at is None:
+            self.created_at = datetime.utcnow()
+        if self.updated_at is None:
+            self.updated_at = self.created_at
+
+    @classmethod
+    def generate_id(cls):
+        """
+        Generate a new primary key using the class's configured ID generator
+        """
+        return IdGenerator.get(cls._id_generator).generate()
 
     # static method to regiser a class with the DataObject class
     @classmethod
@@ -69,25 +124,68 @@ class DataObject(Base):
         """
         # log that the class is being registered
         logger.info(f"Registering class {cls.__name__} with DataObject")
+        cls.prepare_class()
         if cls not in DataObject._registered_classes:
             DataObject._registered_classes.append(cls)
 
+    @classmethod
+    def prepare_class(cls):
+        """
+        Validate a class's settings and add the indexes every type has,
+        without registering it (also used when reloading models).
+        """
+        # fail early on a misspelled generator name
+        IdGenerator.get(cls._id_generator)
+        PartitionManager.validate(cls)
+        RegexSafety.check_class(cls)
+
+        # index backing the default list order and keyset pagination
+        index_name = f"ix_{cls.__tablename__}_created_at_id"
+        if not any(index.name == index_name for index in cls.__table__.indexes):
+            Index(index_name, cls.__table__.c.created_at, cls.__table__.c.id)
+
     @classmethod
     def get_object(cls, classname):
         """
         Get an object from the registered classes regardless of the case of the classname
         """
+        registered_class = cls.get_class(classname)
+        if registered_class is not None:
+            # instantiate an object of the class
+            return registered_class()
+        return None
+    
+    @classmethod
+    def get_class(cls, classname):
+        """
+        Get a registered class regardless of the case of the classname
+        """
+        registry = DataObject._registry
+        if registry is not None:
+            return registry.classes.get(classname.lower())
         for registered_class in DataObject._registered_classes:
             if registered_class.__name__.lower() == classname.lower():
-                # instantiate an object of the class
-                return registered_class()
+                return registered_class
         return None
-    
+
+    @classmethod
+    def is_operation_enabled(cls, operation):
+        """
+        Check if an operation (create, read, update, delete, list) is enabled for the class
+        """
+        operations = getattr(cls, '_field_properties', {}).get('operations')
+        if operations is None:
+            return True
+        return operations.get(operation, {}).get('enabled', False)
+
     @classmethod
     def is_class_registered(cls, classname):
         """
         Check if a class is registered with the DataObject class
         """
+        registry = DataObject._registry
+        if registry is not None:
+            return classname.lower() in registry.classes
         for cls in DataObject._registered_classes:
             # log the class name
             logger.info(f"Checking if {cls.__name__} is registered")
@@ -99,15 +197,10 @@ class DataObject(Base):
     def to_dict(self):
         """
         Convert instance to dictionary.
-        Override in child classes to add specific fields.
+        Uses the serializer compiled for the class from its columns;
+        password fields are excluded.
         """
-        return {
-            'id': self.id,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'created_by': self.created_by,
-            'updated_by': self.updated_by
-        }
+        return RowSerializer.for_class(self.__class__).serialize(self)
 
     def field_is_password(self, field):
         """
@@ -115,6 +208,27 @@ class DataObject(Base):
         """
         return hasattr(field, 'field_format') and field.field_format == 'password'
     
+    @classmethod
+    def hash_passwords(cls, values):
+        """
+        Replace the plain values of password-format fields with salted hashes,
+        so passwords are never stored as received. pbkdf2 hashes fit the
+        128-character password columns. Returns a new dictionary.
+        """
+        hashed = dict(values)
+        for column in cls.__table__.columns:
+            value = hashed.get(column.name)
+            if value is not None and getattr(column, 'field_format', None) == 'password':
+                hashed[column.name] = generate_password_hash(str(value), method=cls.PASSWORD_HASH_METHOD)
+        return hashed
+
+    def check_password(self, field_name, password):
+        """
+        Check a plain password against the stored hash of a password field.
+        """
+        stored = getattr(self, field_name, None)
+        return stored is not None and check_password_hash(stored, password)
+
     def field_is_enum(self, field):
         """
         Check if the field is an enum.
@@ -299,7 +413,34 @@ class DataObject(Base):
         """
         Create the table in the database
         """
-        Base.metadata.create_all(engine, tables=[cls.__table__])
+        if cls._partitioning and engine.dialect.name == 'postgresql':
+            PartitionManager.create_table(cls, engine)
+        else:
+            if cls._partitioning:
+                logger.warning(f"Partitioning of {cls.__name__} needs Postgres; creating a single table")
+            Base.metadata.create_all(engine, tables=[cls.__table__])
+        cls.create_search_indexes(engine)
+
+    @classmethod
+    def create_search_indexes(cls, engine):
+        """
+        Create trigram GIN indexes on the searchTextFields so substring search
+        (ILIKE '%...%') can use an index. Postgres only.
+        """
+        if engine.dialect.name != 'postgresql':
+            return
+
+        text_fields = getattr(cls, '_field_properties', {}).get('searchTextFields', [])
+        if not text_fields:
+            return
+
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for field_name in text_fields:
+                connection.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS "ix_{cls.__tablename__}_{field_name}_trgm" '
+                    f'ON "{cls.__tablename__}" USING gin ("{field_name}" gin_trgm_ops)'
+                ))
 
     def __repr__(self):
         """
@@ -0,0 +1,71 @@
+from datetime import datetime
+from sqlalchemy import Column, Boolean, Integer, String, Text, DateTime, JSON, Index
+from database.db import DatabaseManager
+from utils.id_generator import IdGenerator
+
+
+def generate_job_id():
+    return IdGenerator.get('uuid7').generate()
+
+
+class Job(DatabaseManager.Base):
+    """
+    A background job (import, export, reindex) run by utils.jobs.JobRunner.
+    Not a DataObject, so it is not registered or exposed through the CRUD API.
+
+    Status moves from queued to running to succeeded, failed or cancelled.
+    Running jobs heartbeat from a side thread of their worker and with every
+    progress update; a job whose worker died is requeued once its heartbeat
+    goes stale. worker and attempts identify the run holding the claim.
+    """
+    __tablename__ = 'jobs'
+
+    STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+    FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+    id = Column(String(50), primary_key=True, default=generate_job_id)
+    job_type = Column(String(50), nullable=False)
+    slug = Column(String(50), nullable=True)
+    status = Column(String(20), nullable=False, default='queued')
+    params = Column(JSON, nullable=True)
+    progress = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker = Column(String(100), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_jobs_status_created_at', 'status', 'created_at'),
+    )
+
+    @staticmethod
+    def row_to_dict(row):
+        """
+        Status document of a job row (Core row or instance).
+        """
+        def timestamp(value):
+            return value.isoformat() if value is not None else None
+
+        return {
+            'id': row.id,
+            'type': row.job_type,
+            'slug': row.slug,
+            'status': row.status,
+            'params': row.params,
+            'progress': row.progress,
+            'result': row.result,
+            'error': row.error,
+            'cancel_requested': row.cancel_requested,
+            'attempts': row.attempts,
+            'created_at': timestamp(row.created_at),
+            'started_at': timestamp(row.started_at),
+            'finished_at': timestamp(row.finished_at)
+        }
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, job_type={self.job_type}, slug={self.slug}, status={self.status})>"
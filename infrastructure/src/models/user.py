@@ -44,6 +44,13 @@ class User(DataObject):
     }
     status.field_default = 'pending'
 
+    # the admin edit view re-reads the same users repeatedly
+    _row_cache = {
+        'ttl': 60,
+        'max_entries': 5000,
+        'max_bytes': 8 * 1024 * 1024
+    }
+
     _field_properties = {
         'groups': [
             {
@@ -70,19 +77,6 @@ class User(DataObject):
         """
         super(User, self).__init__(**kwargs)
 
-    def to_dict(self):
-        """
-        Convert User instance to dictionary
-        """
-        base_dict = super().to_dict()
-        user_dict = {
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'email': self.email,
-            'status': self.status
-        }
-        return {**base_dict, **user_dict}
-
     def update(self, **kwargs):
         """
         Update user attributes
@@ -100,4 +94,5 @@ class User(DataObject):
         """
         Create the users table in the database
         """
-        Base.metadata.create_all(engine, tables=[cls.__table__]) 
\ No newline at end of file
+        Base.metadata.create_all(engine, tables=[cls.__table__])
+        cls.create_search_indexes(engine) 
\ No newline at end of file
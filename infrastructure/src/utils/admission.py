@@ -0,0 +1,317 @@
+# src/utils/admission.py
+
+import os
+import math
+import asyncio
+import time
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is shed. Carries the HTTP status and the number of
+    seconds the client should wait before retrying.
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """
+    A queued request: a thread waiting on the gate's condition, or a
+    coroutine awaiting `future` on `loop`.
+    """
+
+    __slots__ = ('granted', 'loop', 'future')
+
+    def __init__(self, loop=None, future=None):
+        self.granted = False
+        self.loop = loop
+        self.future = future
+
+
+class AdmissionGate:
+    """
+    Concurrency limit for one route class with a bounded wait queue.
+
+    Up to `limit` requests run at once. Up to `queue_size` more may wait, each
+    for at most `timeout` seconds; anything beyond that is rejected at once so
+    clients fail fast instead of timing out behind a saturated worker/DB pool.
+
+    Threads (acquire) and coroutines (acquire_async) share one FIFO queue; a
+    released slot is handed to the oldest waiter, and a waiting coroutine
+    holds no thread.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._waiters: "deque[_Waiter]" = deque()
+        self.active = 0
+
+        self.admitted = 0
+        self.queued = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.max_wait = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _enter(self, waiter_factory) -> Optional[_Waiter]:
+        """
+        Take a free slot (None) or queue a new waiter; caller holds the condition.
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return None
+        if len(self._waiters) >= self.queue_size:
+            self.shed_queue_full += 1
+            raise AdmissionRejected(f"{self.name} capacity exceeded", 503, self.retry_after())
+        waiter = waiter_factory()
+        self._waiters.append(waiter)
+        self.queued += 1
+        return waiter
+
+    def _admitted_after(self, start: float):
+        self.admitted += 1
+        self.max_wait = max(self.max_wait, time.monotonic() - start)
+
+    def _timed_out(self, waiter: _Waiter):
+        self._waiters.remove(waiter)
+        self.shed_timeout += 1
+        raise AdmissionRejected(f"{self.name} queue wait exceeded", 503, self.retry_after())
+
+    def acquire(self):
+        """
+        Admit the calling request or raise AdmissionRejected.
+        """
+        with self._condition:
+            waiter = self._enter(_Waiter)
+            if waiter is None:
+                return
+            start = time.monotonic()
+            deadline = start + self.timeout
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timed_out(waiter)
+                self._condition.wait(remaining)
+            self._admitted_after(start)
+
+    async def acquire_async(self):
+        """
+        acquire() for a coroutine: waits on the event loop, not in a thread.
+        """
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            waiter = self._enter(lambda: _Waiter(loop, loop.create_future()))
+            if waiter is None:
+                return
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter.future, self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._condition:
+                if not waiter.granted:
+                    if isinstance(e, asyncio.CancelledError):
+                        self._waiters.remove(waiter)
+                        raise
+                    self._timed_out(waiter)
+            # the slot was handed over as the wait ended
+            if isinstance(e, asyncio.CancelledError):
+                self.release()
+                raise
+        with self._condition:
+            self._admitted_after(start)
+
+    def release(self):
+        """
+        Release the slot held by a finished request, handing it to the oldest
+        waiter, if any.
+        """
+        with self._condition:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                if waiter.future is None:
+                    self._condition.notify_all()
+                    return
+                try:
+                    waiter.loop.call_soon_threadsafe(self._grant, waiter.future)
+                    return
+                except RuntimeError:
+                    # its event loop is closed; try the next waiter
+                    continue
+            self.active -= 1
+
+    @staticmethod
+    def _grant(future):
+        if not future.done():
+            future.set_result(None)
+
+    def retry_after(self) -> int:
+        """
+        Seconds a shed client should back off: roughly one queue wait.
+        """
+        return max(1, math.ceil(self.timeout))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'queue_size': self.queue_size,
+                'timeout': self.timeout,
+                'active': self.active,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'shed_queue_full': self.shed_queue_full,
+                'shed_timeout': self.shed_timeout,
+                'max_wait': round(self.max_wait, 4)
+            }
+
+
+class RateLimiter:
+    """
+    Per-client token bucket. `rate` tokens per second refill a bucket of
+    `burst` tokens; each request takes one. Client buckets are kept in an
+    LRU map bounded by `max_clients`.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        # client -> (tokens, last refill time)
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def check(self, client: str):
+        """
+        Take a token for the client or raise AdmissionRejected (429).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[client] = (tokens, now)
+                self.limited += 1
+                retry_after = max(1, math.ceil((1 - tokens) / self.rate))
+                raise AdmissionRejected("Rate limit exceeded", 429, retry_after)
+            self._buckets[client] = (tokens - 1, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'clients': len(self._buckets),
+                'limited': self.limited
+            }
+
+
+class AdmissionController:
+    """
+    Admission control for the Flask API.
+
+    Routes are grouped into classes, each with its own AdmissionGate:
+      - metadata: object descriptions and the master document
+      - read: record reads, list and search
+      - write: create, update and delete
+
+    Environment variables (per class, CLASS is METADATA, READ or WRITE):
+      - ADMISSION_<CLASS>_LIMIT: concurrent requests
+      - ADMISSION_<CLASS>_QUEUE: requests allowed to wait for a slot
+      - ADMISSION_<CLASS>_TIMEOUT: seconds a request may wait before a 503
+      - RATE_LIMIT_PER_SEC / RATE_LIMIT_BURST: optional per-client token
+        bucket (disabled when RATE_LIMIT_PER_SEC is 0)
+      - RATE_LIMIT_CLIENT_HEADER: header identifying the client (e.g.
+        X-Forwarded-For behind a proxy); the remote address by default
+    """
+
+    DEFAULTS = {
+        'metadata': {'limit': 32, 'queue': 64, 'timeout': 0.5},
+        'read': {'limit': 16, 'queue': 32, 'timeout': 1.0},
+        'write': {'limit': 8, 'queue': 16, 'timeout': 2.0}
+    }
+
+    RATE_LIMIT_PER_SEC = float(os.environ.get("RATE_LIMIT_PER_SEC", "0"))
+    RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", "20"))
+    RATE_LIMIT_CLIENT_HEADER = os.environ.get("RATE_LIMIT_CLIENT_HEADER")
+
+    gates: Dict[str, AdmissionGate] = {}
+    rate_limiter: Optional[RateLimiter] = None
+
+    @classmethod
+    def configure(cls):
+        """
+        Build the gates and rate limiter from the environment.
+        """
+        cls.gates = {}
+        for name, defaults in cls.DEFAULTS.items():
+            prefix = f"ADMISSION_{name.upper()}"
+            cls.gates[name] = AdmissionGate(
+                name,
+                limit=int(os.environ.get(f"{prefix}_LIMIT", defaults['limit'])),
+                queue_size=int(os.environ.get(f"{prefix}_QUEUE", defaults['queue'])),
+                timeout=float(os.environ.get(f"{prefix}_TIMEOUT", defaults['timeout']))
+            )
+        cls.rate_limiter = None
+        if cls.RATE_LIMIT_PER_SEC > 0:
+            cls.rate_limiter = RateLimiter(cls.RATE_LIMIT_PER_SEC, cls.RATE_LIMIT_BURST)
+
+    @classmethod
+    def admit(cls, route_class: str, client: Optional[str]) -> AdmissionGate:
+        """
+        Apply the client's rate limit and acquire a slot in the route class.
+
+        Returns:
+            AdmissionGate: The gate to release when the request finishes
+        """
+        if cls.rate_limiter is not None and client:
+            cls.rate_limiter.check(client)
+        gate = cls.gates[route_class]
+        gate.acquire()
+        return gate
+
+    @classmethod
+    async def admit_async(cls, route_class: str, client: Optional[str]) -> AdmissionGate:
+        """
+        admit() for requests served on an event loop (asgi.py): a queued
+        request waits on the loop, under the same queue limit and timeout.
+        """
+        if cls.rate_limiter is not None and client:
+            cls.rate_limiter.check(client)
+        gate = cls.gates[route_class]
+        await gate.acquire_async()
+        return gate
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Get the counters of every gate and of the rate limiter.
+        """
+        return {
+            'gates': {name: gate.stats() for name, gate in cls.gates.items()},
+            'rate_limit': cls.rate_limiter.stats() if cls.rate_limiter is not None else None
+        }
+
+
+AdmissionController.configure()
@@ -0,0 +1,108 @@
+# src/utils/async_crud.py
+
+import asyncio
+from typing import Any, Dict, List, Optional
+from database.async_db import AsyncDatabaseManager
+from utils.crud import CrudEngine, CrudError
+from utils.query_guard import QueryGuard
+from utils.row_cache import RowCache
+
+
+class AsyncCrudEngine:
+    """
+    Asyncio variants of the CrudEngine read, list and search operations.
+
+    Queries are built by CrudEngine so both paths return identical results,
+    and sessions route to the type's database and its replicas the same way.
+    Every coroutine opens its own AsyncSession, so several reads can run
+    concurrently on separate pooled connections. All coroutines here must run
+    on AsyncDatabaseManager's loop (submit them with run_async/run).
+    """
+
+    @staticmethod
+    async def read(object_slug: str, object_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a single record. Shares the row cache with the sync path.
+
+        Args:
+            object_slug (str): The slug identifier for the data object type
+            object_id (str): The primary key of the record
+
+        Returns:
+            Optional[Dict[str, Any]]: The record or None if it does not exist
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'read')
+
+        cache = RowCache.for_class(data_object_class)
+        if cache is not None:
+            record, generation = cache.lookup(object_id)
+            if record is not None:
+                return record
+
+        # cached rows are loaded from the primary, as in CrudEngine.read
+        async with AsyncDatabaseManager.session(read_only=cache is None) as session:
+            instance = await session.get(data_object_class, object_id)
+            record = instance.to_dict() if instance is not None else None
+
+        if cache is not None and record is not None:
+            cache.store(object_id, record, generation)
+        return record
+
+    @staticmethod
+    async def list(object_slug: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        List records of a data object type, one keyset page at a time.
+        Parameters are the same as CrudEngine.list.
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'list')
+        statement, page_size, sort_columns = CrudEngine.build_list_query(data_object_class, params)
+        # EXPLAIN on a cache miss is a blocking round trip
+        statement, scan_limited = await asyncio.to_thread(QueryGuard.check, data_object_class, statement, params)
+
+        async with AsyncDatabaseManager.session(read_only=True) as session:
+            result = await session.execute(statement, bind_arguments={'mapper': data_object_class.__mapper__})
+            return CrudEngine.build_page(data_object_class, result.all(), page_size, sort_columns, scan_limited)
+
+    @staticmethod
+    async def search(object_slug: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Text search with the same parameters as CrudEngine.search.
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'list')
+        statement, page_size, sort_columns = CrudEngine.build_list_query(
+            data_object_class, params, require_text=True
+        )
+        # EXPLAIN on a cache miss is a blocking round trip
+        statement, scan_limited = await asyncio.to_thread(QueryGuard.check, data_object_class, statement, params)
+
+        async with AsyncDatabaseManager.session(read_only=True) as session:
+            result = await session.execute(statement, bind_arguments={'mapper': data_object_class.__mapper__})
+            return CrudEngine.build_page(data_object_class, result.all(), page_size, sort_columns, scan_limited)
+
+    @staticmethod
+    async def resolve(references: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Resolve several (slug, id) references concurrently, e.g. every
+        referenced record needed to render a page.
+
+        Args:
+            references (List[Dict[str, str]]): Items with 'slug' and 'id' keys
+
+        Returns:
+            List[Dict[str, Any]]: One result per reference, in order, with the
+            record or an error message
+        """
+        async def resolve_one(reference):
+            try:
+                record = await AsyncCrudEngine.read(reference['slug'], reference['id'])
+                if record is None:
+                    return {**reference, 'error': 'Record not found'}
+                return {**reference, 'record': record}
+            except CrudError as ce:
+                return {**reference, 'error': ce.message}
+
+        for reference in references:
+            if not isinstance(reference, dict) or 'slug' not in reference or 'id' not in reference:
+                raise CrudError("Each reference needs a slug and an id")
+
+        return list(await asyncio.gather(*[resolve_one(reference) for reference in references]))
@@ -0,0 +1,396 @@
+# src/utils/change_feed.py
+
+import os
+import json
+import queue
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from sqlalchemy import delete, event, inspect, insert, select
+from database.db import DatabaseManager
+from models.change_event import ChangeEvent
+from utils.logger import logger
+from utils.pg_notify import PgNotifier
+
+
+class Subscription:
+    """
+    One SSE client of the change feed. Events are buffered in a bounded queue;
+    a subscriber that falls further behind than the buffer is closed and must
+    reconnect with its Last-Event-ID to catch up from the change log.
+    """
+
+    def __init__(self, slug: str, buffer_size: int):
+        self.slug = slug
+        self.queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def offer(self, change: Dict[str, Any]):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(change)
+        except queue.Full:
+            self.overflowed = True
+            ChangeFeed.overflows += 1
+            # wake the stream so it can close the connection
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(None)
+
+
+class AsyncSubscription(Subscription):
+    """
+    A subscriber served on an event loop (see asgi.py): events are handed to
+    the loop, so waiting for them holds no thread.
+    """
+
+    def __init__(self, slug: str, buffer_size: int, loop: asyncio.AbstractEventLoop):
+        self.slug = slug
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def offer(self, change: Dict[str, Any]):
+        # called from request and notifier threads
+        try:
+            self.loop.call_soon_threadsafe(self._offer, change)
+        except RuntimeError:
+            # the loop is closed; the stream is gone
+            pass
+
+    def _offer(self, change: Dict[str, Any]):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(change)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            ChangeFeed.overflows += 1
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class ChangeFeed:
+    """
+    Real-time change events per data object type.
+
+    Every ORM write to a DataObject through DatabaseManager sessions appends a
+    compact event (id, op, version, changed fields) to the data_object_changes
+    table in the same transaction and announces it with pg_notify, so all
+    worker processes fan it out to their SSE subscribers after commit. The
+    change log lets reconnecting clients resume from their Last-Event-ID.
+
+    Each database keeps its own change log: events of a type on a named
+    database (`_database`) are written on that database's connection of the
+    flush, so they commit or roll back with the write. Event ids are
+    therefore ordered per type, not across databases.
+    """
+
+    CHANNEL = os.environ.get("CHANGE_FEED_CHANNEL", "data_object_changes")
+    BUFFER_SIZE = int(os.environ.get("CHANGE_FEED_BUFFER_SIZE", "256"))
+    HEARTBEAT_SECONDS = float(os.environ.get("CHANGE_FEED_HEARTBEAT", "15"))
+    RETENTION_HOURS = float(os.environ.get("CHANGE_FEED_RETENTION_HOURS", "24"))
+    REPLAY_LIMIT = int(os.environ.get("CHANGE_FEED_REPLAY_LIMIT", "1000"))
+    # event ids below a Last-Event-ID replayed again on reconnect (see stream)
+    REPLAY_WINDOW = int(os.environ.get("CHANGE_FEED_REPLAY_WINDOW", "100"))
+
+    # slug -> subscriptions in this process
+    _subscriptions: Dict[str, List[Subscription]] = {}
+    _lock = threading.Lock()
+    _pruner = None
+    _pruner_pid = None
+
+    delivered = 0
+    overflows = 0
+
+    @classmethod
+    def install(cls, session_factory):
+        """
+        Hook a session factory so DataObject writes are recorded and published.
+        """
+        from models.data_object import DataObject
+
+        if event.contains(session_factory, 'before_flush', cls._before_flush):
+            return
+
+        cls._data_object_class = DataObject
+        event.listen(session_factory, 'before_flush', cls._before_flush)
+        event.listen(session_factory, 'after_flush', cls._after_flush)
+        event.listen(session_factory, 'after_commit', cls._after_commit)
+        event.listen(session_factory, 'after_rollback', cls._after_rollback)
+
+    @classmethod
+    def _before_flush(cls, session, flush_context, instances):
+        # attribute history is only complete before the flush
+        changes = session.info.setdefault('change_feed_pending', [])
+        for instance in session.new:
+            if isinstance(instance, cls._data_object_class):
+                changes.append((instance, 'create', None))
+        for instance in session.dirty:
+            if isinstance(instance, cls._data_object_class) and session.is_modified(instance):
+                state = inspect(instance)
+                fields = [
+                    attr.key for attr in state.attrs
+                    if attr.key != 'updated_at' and attr.history.has_changes()
+                ]
+                changes.append((instance, 'update', fields))
+        for instance in session.deleted:
+            if isinstance(instance, cls._data_object_class):
+                changes.append((instance, 'delete', None))
+
+    @classmethod
+    def _after_flush(cls, session, flush_context):
+        pending = session.info.pop('change_feed_pending', [])
+        if not pending:
+            return
+
+        # database name -> (a mapper routed to it, event rows)
+        by_database = {}
+        for instance, op, fields in pending:
+            updated_at = getattr(instance, 'updated_at', None)
+            database = getattr(instance.__class__, '_database', None) or 'default'
+            _, rows = by_database.setdefault(database, (instance.__mapper__, []))
+            rows.append({
+                'slug': instance.__class__.__name__.lower(),
+                'object_id': instance.id,
+                'op': op,
+                'version': updated_at.isoformat() if updated_at is not None else None,
+                'fields': fields,
+                'created_at': datetime.utcnow()
+            })
+
+        recorded = session.info.setdefault('change_feed_events', [])
+        for mapper, rows in by_database.values():
+            # the flush's transaction on the type's database
+            connection = session.connection(bind_arguments={'mapper': mapper})
+            for row in rows:
+                event_id = connection.execute(insert(ChangeEvent.__table__).values(**row)).inserted_primary_key[0]
+                change = {
+                    'event_id': event_id,
+                    'slug': row['slug'],
+                    'id': row['object_id'],
+                    'op': row['op'],
+                    'version': row['version'],
+                    'fields': row['fields']
+                }
+                recorded.append(change)
+                PgNotifier.notify(connection, cls.CHANNEL, change)
+
+    @classmethod
+    def _after_commit(cls, session):
+        for change in session.info.pop('change_feed_events', []):
+            cls.publish_local(change)
+
+    @classmethod
+    def _after_rollback(cls, session):
+        session.info.pop('change_feed_pending', None)
+        session.info.pop('change_feed_events', None)
+
+    @classmethod
+    def _on_notification(cls, message: Dict[str, Any]):
+        # events from this process were delivered locally after commit
+        if message.get('pid') == os.getpid():
+            return
+        cls.publish_local({key: value for key, value in message.items() if key != 'pid'})
+
+    @classmethod
+    def publish_local(cls, change: Dict[str, Any]):
+        """
+        Hand an event to this process's subscribers of its type.
+        """
+        with cls._lock:
+            subscriptions = list(cls._subscriptions.get(change['slug'], []))
+        for subscription in subscriptions:
+            subscription.offer(change)
+            cls.delivered += 1
+
+    @classmethod
+    def subscribe(cls, slug: str, subscription: Optional[Subscription] = None) -> Subscription:
+        """
+        Register a new subscriber (by default a Subscription) for a type.
+        """
+        PgNotifier.subscribe(cls.CHANNEL, cls._on_notification)
+        cls._ensure_pruner()
+        if subscription is None:
+            subscription = Subscription(slug, cls.BUFFER_SIZE)
+        with cls._lock:
+            cls._subscriptions.setdefault(slug, []).append(subscription)
+        return subscription
+
+    @classmethod
+    def unsubscribe(cls, subscription: Subscription):
+        with cls._lock:
+            subscriptions = cls._subscriptions.get(subscription.slug, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+
+    @classmethod
+    def replay(cls, slug: str, last_event_id: int) -> List[Dict[str, Any]]:
+        """
+        Read logged events of a type after last_event_id, oldest first, from
+        the change log of the type's database.
+        """
+        table = ChangeEvent.__table__
+        statement = (
+            select(table)
+            .where(table.c.slug == slug, table.c.id > last_event_id)
+            .order_by(table.c.id)
+            .limit(cls.REPLAY_LIMIT)
+        )
+        engine = DatabaseManager.get_engine(cls._data_object_class.get_class(slug))
+        with engine.connect() as connection:
+            return [ChangeEvent(**row._mapping).to_event() for row in connection.execute(statement)]
+
+    @staticmethod
+    def format_event(change: Dict[str, Any]) -> str:
+        """
+        Format an event as a server-sent event.
+        """
+        data = {key: value for key, value in change.items() if key not in ('event_id', 'slug')}
+        return f"id: {change['event_id']}\nevent: {change['op']}\ndata: {json.dumps(data)}\n\n"
+
+    @classmethod
+    def stream(cls, slug: str, last_event_id: Optional[int]) -> Iterator[str]:
+        """
+        Generate the SSE stream for one subscriber: replay from last_event_id,
+        then live events, with periodic heartbeats.
+
+        Event ids are assigned at insert, not at commit, so an event with a
+        lower id can commit after the client received last_event_id. Replay
+        therefore starts REPLAY_WINDOW ids below last_event_id. Events in that
+        window may reach the client twice; clients drop ids they already have.
+        Within one stream every id is sent at most once.
+        """
+        subscription = cls.subscribe(slug)
+        try:
+            yield "retry: 3000\n\n"
+            # ids sent during replay; live events for them are duplicates. Live
+            # events are otherwise passed through even with lower ids, since
+            # concurrent transactions can commit out of id order.
+            replayed = set()
+            if last_event_id is not None:
+                # subscribed first, so nothing committed after the replay is missed
+                last_replayed = max(0, last_event_id - cls.REPLAY_WINDOW)
+                while True:
+                    backlog = cls.replay(slug, last_replayed)
+                    for change in backlog:
+                        last_replayed = change['event_id']
+                        replayed.add(last_replayed)
+                        yield cls.format_event(change)
+                    if len(backlog) < cls.REPLAY_LIMIT:
+                        break
+
+            while True:
+                try:
+                    change = subscription.queue.get(timeout=cls.HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                if change is None:
+                    logger.warning(f"Closing slow change feed subscriber for {slug} after buffer overflow")
+                    return
+                if change['event_id'] in replayed:
+                    replayed.discard(change['event_id'])
+                    continue
+                yield cls.format_event(change)
+        finally:
+            cls.unsubscribe(subscription)
+
+    @classmethod
+    async def stream_async(cls, slug: str, last_event_id: Optional[int]) -> AsyncIterator[str]:
+        """
+        stream() for an event loop: the change log is read on a worker thread
+        and live events are awaited, so an idle subscriber holds no thread.
+        """
+        subscription = cls.subscribe(
+            slug, AsyncSubscription(slug, cls.BUFFER_SIZE, asyncio.get_running_loop())
+        )
+        try:
+            yield "retry: 3000\n\n"
+            replayed = set()
+            if last_event_id is not None:
+                last_replayed = max(0, last_event_id - cls.REPLAY_WINDOW)
+                while True:
+                    backlog = await asyncio.to_thread(cls.replay, slug, last_replayed)
+                    for change in backlog:
+                        last_replayed = change['event_id']
+                        replayed.add(last_replayed)
+                        yield cls.format_event(change)
+                    if len(backlog) < cls.REPLAY_LIMIT:
+                        break
+
+            while True:
+                try:
+                    change = await asyncio.wait_for(subscription.queue.get(), cls.HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if change is None:
+                    logger.warning(f"Closing slow change feed subscriber for {slug} after buffer overflow")
+                    return
+                if change['event_id'] in replayed:
+                    replayed.discard(change['event_id'])
+                    continue
+                yield cls.format_event(change)
+        finally:
+            cls.unsubscribe(subscription)
+
+    @classmethod
+    def prune(cls):
+        """
+        Delete logged events older than the retention window, in every database.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=cls.RETENTION_HOURS)
+        for name, cluster in DatabaseManager.clusters.items():
+            with cluster.primary.begin() as connection:
+                result = connection.execute(delete(ChangeEvent.__table__).where(ChangeEvent.created_at < cutoff))
+            if result.rowcount:
+                logger.info(f"Pruned {result.rowcount} change events of {name} older than {cutoff.isoformat()}")
+
+    @classmethod
+    def _ensure_pruner(cls):
+        """
+        Start the background pruning thread of this process.
+        """
+        if cls._pruner is not None and cls._pruner_pid == os.getpid() and cls._pruner.is_alive():
+            return
+
+        def run():
+            while True:
+                try:
+                    cls.prune()
+                except Exception as e:
+                    logger.error(f"Error pruning change events: {str(e)}")
+                time.sleep(600)
+
+        with cls._lock:
+            if cls._pruner is not None and cls._pruner_pid == os.getpid() and cls._pruner.is_alive():
+                return
+            cls._pruner_pid = os.getpid()
+            cls._pruner = threading.Thread(target=run, name="change-feed-pruner", daemon=True)
+            cls._pruner.start()
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._lock:
+            subscribers = {slug: len(subscriptions) for slug, subscriptions in cls._subscriptions.items()}
+        return {
+            'subscribers': subscribers,
+            'delivered': cls.delivered,
+            'overflows': cls.overflows
+        }
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        cls._lock = threading.Lock()
+        cls._subscriptions = {}
+        cls._pruner = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=ChangeFeed._after_fork_in_child)
@@ -0,0 +1,434 @@
+# src/utils/crud.py
+
+import os
+import json
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import DateTime, Enum, or_, select, tuple_
+from database.db import DatabaseManager
+from models.data_object import DataObject
+from utils.logger import logger
+from utils.row_cache import RowCache
+from utils.change_feed import ChangeFeed
+from utils.query_guard import QueryGuard
+from utils.request_scope import RequestScope
+from utils.serializer import RowSerializer
+from utils.validation import RecordValidator
+
+# Invalidate cached rows and publish change events on every ORM write made
+# through DatabaseManager sessions
+RowCache.install(DatabaseManager.SessionLocal)
+ChangeFeed.install(DatabaseManager.SessionLocal)
+
+
+class CrudError(Exception):
+    """
+    Error raised by CrudEngine operations, carrying the HTTP status to return.
+    """
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class CrudEngine:
+    """
+    Create, read, update and delete operations for registered data objects.
+    Records are exchanged as dictionaries produced by DataObject.to_dict.
+    """
+
+    # fields managed by DataObject itself and never written from request data
+    READ_ONLY_FIELDS = ('created_at', 'updated_at')
+
+    # list paging limits
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = int(os.environ.get("LIST_MAX_PAGE_SIZE", "200"))
+
+    # query parameters of list/search that are not field filters
+    RESERVED_LIST_PARAMS = ('page_size', 'cursor', 'sort', 'q', 'created_after', 'created_before')
+
+    # default list order, newest first; matches the (created_at, id) index
+    DEFAULT_SORT = '-created_at'
+
+    @staticmethod
+    def get_class(object_slug: str, operation: str):
+        """
+        Resolve a registered DataObject class and check the operation is enabled.
+
+        Args:
+            object_slug (str): The slug identifier for the data object type
+            operation (str): The operation name (create, read, update, delete, list)
+
+        Returns:
+            The DataObject subclass for the slug
+        """
+        data_object_class = DataObject.get_class(object_slug)
+        if data_object_class is None:
+            raise CrudError("Object type not found", 404)
+        if not data_object_class.is_operation_enabled(operation):
+            raise CrudError(f"Operation {operation} is not enabled for {object_slug}", 405)
+        return data_object_class
+
+    @staticmethod
+    def _writable_values(data_object_class, data: Dict[str, Any], allow_id: bool) -> Dict[str, Any]:
+        """
+        Filter request data down to writable columns, rejecting unknown fields,
+        and validate it with RecordValidator (only the fields given when
+        updating). Password fields are hashed after validation.
+        """
+        if not isinstance(data, dict):
+            raise CrudError("Request body must be a JSON object")
+
+        columns = data_object_class.__table__.columns
+        values = {}
+        for key, value in data.items():
+            if key not in columns:
+                raise CrudError(f"Unknown field: {key}")
+            if key in CrudEngine.READ_ONLY_FIELDS or (key == 'id' and not allow_id):
+                continue
+            values[key] = value
+
+        values, errors = RecordValidator.for_class(data_object_class).validate(values, partial=not allow_id)
+        if errors:
+            raise CrudError("; ".join(errors))
+        return data_object_class.hash_passwords(values)
+
+    @staticmethod
+    def read(object_slug: str, object_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a single record, through the type's row cache when it has one.
+
+        Args:
+            object_slug (str): The slug identifier for the data object type
+            object_id (str): The primary key of the record
+
+        Returns:
+            Optional[Dict[str, Any]]: The record or None if it does not exist
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'read')
+
+        cache = RowCache.for_class(data_object_class)
+
+        def load():
+            # cached rows are loaded from the primary so replica lag cannot
+            # put stale data in the cache after an invalidation
+            session = RequestScope.session(read_only=cache is None)
+            try:
+                instance = session.get(data_object_class, object_id)
+                return instance.to_dict() if instance is not None else None
+            finally:
+                RequestScope.release(session)
+
+        if cache is None:
+            return load()
+        return cache.get_or_load(object_id, load)
+
+    @staticmethod
+    def create(object_slug: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create a record from request data.
+
+        Args:
+            object_slug (str): The slug identifier for the data object type
+            data (Dict[str, Any]): Field values for the new record
+
+        Returns:
+            Dict[str, Any]: The created record
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'create')
+        values = CrudEngine._writable_values(data_object_class, data, allow_id=True)
+
+        session = RequestScope.session()
+        try:
+            instance = data_object_class(**values)
+            session.add(instance)
+            session.flush()
+            record = instance.to_dict()
+            session.commit()
+            logger.info(f"Created {object_slug} {record['id']}")
+            return record
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            RequestScope.release(session)
+
+    @staticmethod
+    def update(object_slug: str, object_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update a record with request data.
+
+        Args:
+            object_slug (str): The slug identifier for the data object type
+            object_id (str): The primary key of the record
+            data (Dict[str, Any]): Field values to change
+
+        Returns:
+            Optional[Dict[str, Any]]: The updated record or None if it does not exist
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'update')
+        values = CrudEngine._writable_values(data_object_class, data, allow_id=False)
+
+        session = RequestScope.session()
+        try:
+            instance = session.get(data_object_class, object_id)
+            if instance is None:
+                return None
+            instance.update(**values)
+            session.flush()
+            record = instance.to_dict()
+            session.commit()
+            logger.info(f"Updated {object_slug} {object_id}")
+            return record
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            RequestScope.release(session)
+
+    @staticmethod
+    def delete(object_slug: str, object_id: str) -> bool:
+        """
+        Delete a record.
+
+        Args:
+            object_slug (str): The slug identifier for the data object type
+            object_id (str): The primary key of the record
+
+        Returns:
+            bool: False if the record does not exist
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'delete')
+
+        session = RequestScope.session()
+        try:
+            instance = session.get(data_object_class, object_id)
+            if instance is None:
+                return False
+            session.delete(instance)
+            session.commit()
+            logger.info(f"Deleted {object_slug} {object_id}")
+            return True
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            RequestScope.release(session)
+
+    @staticmethod
+    def encode_cursor(values: List[Any]) -> str:
+        """
+        Encode the sort key of the last row of a page as an opaque cursor.
+        """
+        raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str, columns) -> List[Any]:
+        """
+        Decode a cursor produced by encode_cursor back into column values.
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+            if not isinstance(values, list) or len(values) != len(columns):
+                raise ValueError("cursor length mismatch")
+            return [
+                datetime.fromisoformat(value) if isinstance(column.type, DateTime) and value is not None else value
+                for column, value in zip(columns, values)
+            ]
+        except (ValueError, TypeError):
+            raise CrudError("Invalid cursor")
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    @staticmethod
+    def apply_filters(data_object_class, statement, params: Dict[str, str], require_text: bool = False):
+        """
+        Add the field filters and text search of a list/search request to a statement.
+
+        Args:
+            data_object_class: The DataObject subclass being queried
+            statement: The select to filter
+            params (Dict[str, str]): Request query parameters
+            require_text (bool): Reject the request when q is missing (search)
+
+        Returns:
+            The filtered statement
+        """
+        table = data_object_class.__table__
+        field_properties = getattr(data_object_class, '_field_properties', {})
+        search_fields = field_properties.get('searchFields', [])
+        text_fields = field_properties.get('searchTextFields', [])
+
+        # field filters
+        for key, value in params.items():
+            if key in CrudEngine.RESERVED_LIST_PARAMS or value == '':
+                continue
+            if key not in search_fields or key not in table.columns:
+                raise CrudError(f"Cannot filter by {key}")
+            column = table.columns[key]
+            if isinstance(column.type, Enum):
+                if value not in column.type.enums:
+                    raise CrudError(f"Invalid value for {key}: {value}")
+                statement = statement.where(column == value)
+            else:
+                statement = statement.where(
+                    column.ilike(f"%{CrudEngine._escape_like(value)}%", escape='\\')
+                )
+
+        # created_at range; lets Postgres prune partitions of partitioned tables
+        for key in ('created_after', 'created_before'):
+            if not params.get(key):
+                continue
+            try:
+                bound = datetime.fromisoformat(params[key])
+            except ValueError:
+                raise CrudError(f"{key} must be an ISO 8601 timestamp")
+            created_at = table.columns['created_at']
+            statement = statement.where(created_at >= bound if key == 'created_after' else created_at < bound)
+
+        # free text search
+        text_query = params.get('q', '').strip()
+        if require_text and not text_query:
+            raise CrudError("Search requires a q parameter")
+        if text_query:
+            if '*TEXT*' not in search_fields or not text_fields:
+                raise CrudError("Text search is not enabled for this object type")
+            pattern = f"%{CrudEngine._escape_like(text_query)}%"
+            statement = statement.where(or_(*[
+                table.columns[name].ilike(pattern, escape='\\') for name in text_fields
+            ]))
+        return statement
+
+    @staticmethod
+    def build_list_query(data_object_class, params: Dict[str, str], require_text: bool = False) -> Tuple[Any, int, list]:
+        """
+        Build the keyset-paginated select for list and search requests. It is
+        a Core select of the serialized columns (RowSerializer.columns): list
+        pages are read-only, so rows skip ORM instances, the identity map and
+        the password column.
+
+        Supported parameters: page_size, cursor, sort (column or -column), q
+        (text search over searchTextFields), created_after/created_before
+        (ISO timestamps) and one filter per declared searchFields column.
+        Enum filters match exactly, other filters match substrings
+        case-insensitively.
+
+        Args:
+            data_object_class: The DataObject subclass to query
+            params (Dict[str, str]): Request query parameters
+            require_text (bool): Reject the request when q is missing (search)
+
+        Returns:
+            Tuple: (select statement fetching page_size + 1 rows, page_size, sort columns)
+        """
+        table = data_object_class.__table__
+
+        try:
+            page_size = int(params.get('page_size', CrudEngine.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise CrudError("page_size must be an integer")
+        if page_size < 1 or page_size > CrudEngine.MAX_PAGE_SIZE:
+            raise CrudError(f"page_size must be between 1 and {CrudEngine.MAX_PAGE_SIZE}")
+
+        # sort column, always tie-broken on id so the keyset is unique
+        sort = params.get('sort') or CrudEngine.DEFAULT_SORT
+        descending = sort.startswith('-')
+        sort_name = sort.lstrip('-')
+        if sort_name not in table.columns or getattr(table.columns[sort_name], 'field_format', None) == 'password':
+            raise CrudError(f"Cannot sort by {sort_name}")
+        if table.columns[sort_name].nullable:
+            raise CrudError(f"Cannot sort by nullable field {sort_name}")
+        sort_columns = [table.columns[sort_name]] if sort_name != 'id' else []
+        sort_columns.append(table.columns['id'])
+
+        statement = select(*RowSerializer.for_class(data_object_class).columns)
+        statement = CrudEngine.apply_filters(data_object_class, statement, params, require_text)
+
+        # keyset pagination
+        cursor = params.get('cursor')
+        if cursor:
+            values = CrudEngine.decode_cursor(cursor, sort_columns)
+            key = tuple_(*sort_columns)
+            statement = statement.where(key < tuple_(*values) if descending else key > tuple_(*values))
+            # the row comparison alone is opaque to partition pruning and
+            # index range planning; repeat its bound on the leading column
+            if len(sort_columns) > 1:
+                leading = sort_columns[0]
+                statement = statement.where(leading <= values[0] if descending else leading >= values[0])
+
+        order = [column.desc() if descending else column.asc() for column in sort_columns]
+        statement = statement.order_by(*order).limit(page_size + 1)
+        return statement, page_size, sort_columns
+
+    @staticmethod
+    def build_page(data_object_class, rows: list, page_size: int, sort_columns: list,
+                   scan_limited: bool = False) -> Dict[str, Any]:
+        """
+        Turn the page_size + 1 rows fetched by a list query into a response page.
+        scan_limited marks pages of a query QueryGuard restricted to the newest rows.
+        """
+        serialize_record = RowSerializer.for_class(data_object_class).serialize_record
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]._mapping
+            next_cursor = CrudEngine.encode_cursor([last[column] for column in sort_columns])
+        page = {
+            'data': [serialize_record(row) for row in rows],
+            'page_size': page_size,
+            'next_cursor': next_cursor
+        }
+        if scan_limited:
+            page['scan_limited'] = True
+        return page
+
+    @staticmethod
+    def list(object_slug: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        List records of a data object type, one keyset page at a time.
+
+        Args:
+            object_slug (str): The slug identifier for the data object type
+            params (Dict[str, str]): Request query parameters (see build_list_query)
+
+        Returns:
+            Dict[str, Any]: The page with data, page_size and next_cursor
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'list')
+        statement, page_size, sort_columns = CrudEngine.build_list_query(data_object_class, params)
+        statement, scan_limited = QueryGuard.check(data_object_class, statement, params)
+
+        session = RequestScope.session(read_only=True)
+        try:
+            # a Core select has no entity to route by; name the mapper
+            rows = session.execute(statement, bind_arguments={'mapper': data_object_class.__mapper__}).all()
+            return CrudEngine.build_page(data_object_class, rows, page_size, sort_columns, scan_limited)
+        finally:
+            RequestScope.release(session)
+
+    @staticmethod
+    def search(object_slug: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Text search over the type's searchTextFields, with the same filters and
+        paging as list.
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'list')
+        statement, page_size, sort_columns = CrudEngine.build_list_query(
+            data_object_class, params, require_text=True
+        )
+        statement, scan_limited = QueryGuard.check(data_object_class, statement, params)
+
+        session = RequestScope.session(read_only=True)
+        try:
+            # a Core select has no entity to route by; name the mapper
+            rows = session.execute(statement, bind_arguments={'mapper': data_object_class.__mapper__}).all()
+            return CrudEngine.build_page(data_object_class, rows, page_size, sort_columns, scan_limited)
+        finally:
+            RequestScope.release(session)
@@ -45,21 +45,20 @@ class DataObjectManager:
         return operations
 
     @staticmethod
-    def get_object_description(object_slug: str) -> Optional[Dict[str, Any]]:
+    def build_object_description(data_object_class) -> Dict[str, Any]:
         """
-        Generate a complete description of a data object including its operations and metadata.
-        
+        Generate a complete description of a data object class including its operations and metadata.
+
         Args:
-            object_slug (str): The slug identifier for the data object type
-            
+            data_object_class: The DataObject subclass to describe
+
         Returns:
-            Optional[Dict[str, Any]]: Complete object description or None if object not found
+            Dict[str, Any]: Complete object description
         """
-        if not DataObject.is_class_registered(object_slug):
-            return None
+        object_slug = data_object_class.__name__.lower()
 
         # Get base object description
-        data_object = DataObject.get_object(object_slug).describe_object()
+        data_object = data_object_class().describe_object()
         
         # Build and update operations
         if 'operations' in data_object:
@@ -86,10 +85,13 @@ class DataObjectManager:
         }
 
     @staticmethod
-    def get_master_document() -> Dict[str, Any]:
+    def build_master_document(data_object_classes) -> Dict[str, Any]:
         """
-        Generate a master document containing information about all registered data objects.
-        
+        Generate a master document containing information about the given data object classes.
+
+        Args:
+            data_object_classes: The registered DataObject subclasses
+
         Returns:
             Dict[str, Any]: Master document with all data object descriptions
         """
@@ -97,7 +99,7 @@ class DataObjectManager:
         
         data_objects: List[Dict[str, Any]] = []
         
-        for data_object_class in DataObject._registered_classes:
+        for data_object_class in data_object_classes:
             if data_object_class.__name__ == "DataObject":
                 continue
                 
@@ -127,4 +129,38 @@ class DataObjectManager:
                 "created_by": "System",
                 "updated_by": "System"
             }
-        } 
\ No newline at end of file
+        }
+
+    @staticmethod
+    def get_object_description(object_slug: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the description of a data object type, from the published registry
+        snapshot when there is one. Returned documents are shared; do not modify.
+        
+        Args:
+            object_slug (str): The slug identifier for the data object type
+            
+        Returns:
+            Optional[Dict[str, Any]]: Complete object description or None if object not found
+        """
+        registry = DataObject._registry
+        if registry is not None:
+            return registry.descriptions.get(object_slug.lower())
+
+        if not DataObject.is_class_registered(object_slug):
+            return None
+        return DataObjectManager.build_object_description(DataObject.get_class(object_slug))
+
+    @staticmethod
+    def get_master_document() -> Dict[str, Any]:
+        """
+        Get the master document listing all registered data objects, from the
+        published registry snapshot when there is one.
+        
+        Returns:
+            Dict[str, Any]: Master document with all data object descriptions
+        """
+        registry = DataObject._registry
+        if registry is not None:
+            return registry.master
+        return DataObjectManager.build_master_document(DataObject._registered_classes)
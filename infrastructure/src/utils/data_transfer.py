@@ -0,0 +1,414 @@
+# src/utils/data_transfer.py
+
+import io
+import os
+import re
+import csv
+import json
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func, insert, inspect, select, text
+from sqlalchemy.schema import CreateIndex
+from database.db import DatabaseManager
+from utils.crud import CrudEngine, CrudError
+from utils.jobs import JobContext, JobLost, JobRunner
+from utils.logger import logger
+from utils.query_guard import QueryGuard
+from utils.serializer import RowSerializer
+from utils.validation import RecordValidator
+
+
+class DataTransfer:
+    """
+    Job types moving whole tables in and out of a data object type.
+
+      - import: streams an uploaded CSV (header row) or NDJSON file, validates
+        records in batches with RecordValidator and loads each valid batch
+        with COPY (executemany on other dialects) in its own transaction,
+        checkpointing the last committed line so a requeued import resumes
+        after it instead of inserting the committed batches again
+      - export: streams the table in (created_at, id) order from a read
+        replica into a CSV or NDJSON file in the spool directory
+      - reindex: creates missing indexes and rebuilds the existing ones,
+        concurrently on Postgres
+
+    Imports bypass the ORM, so they emit no change feed events; subscribers
+    should reload the type once the job has finished.
+    """
+
+    FORMATS = ('csv', 'ndjson')
+    BATCH_SIZE = int(os.environ.get("JOB_BATCH_SIZE", "1000"))
+    # invalid records reported in an import's result
+    MAX_REPORTED_ERRORS = 100
+    UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+    @staticmethod
+    def _check_format(file_format: str) -> str:
+        file_format = (file_format or 'ndjson').lower()
+        if file_format not in DataTransfer.FORMATS:
+            raise CrudError(f"Unsupported format: {file_format}")
+        return file_format
+
+    @staticmethod
+    def submit_import(object_slug: str, stream: BinaryIO, file_format: str, on_error: str = 'skip') -> Dict[str, Any]:
+        """
+        Spool an uploaded file and queue its import.
+
+        Args:
+            object_slug (str): The slug identifier for the data object type
+            stream (BinaryIO): The request body
+            file_format (str): csv or ndjson
+            on_error (str): skip invalid records and failed batches, or abort the job
+
+        Returns:
+            Dict[str, Any]: The job's status document
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'create')
+        file_format = DataTransfer._check_format(file_format)
+        if on_error not in ('skip', 'abort'):
+            raise CrudError("on_error must be skip or abort")
+
+        job_id = JobRunner.new_job_id()
+        path = JobRunner.spool_path(job_id, f"input.{file_format}")
+        size = 0
+        with open(path, 'wb') as f:
+            while True:
+                chunk = stream.read(DataTransfer.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                size += len(chunk)
+        if size == 0:
+            os.remove(path)
+            raise CrudError("Import file is empty")
+
+        return JobRunner.submit('import', data_object_class.__name__.lower(), {
+            'format': file_format,
+            'on_error': on_error,
+            'input': os.path.basename(path),
+            'bytes': size
+        }, job_id=job_id)
+
+    @staticmethod
+    def submit_export(object_slug: str, file_format: str) -> Dict[str, Any]:
+        """
+        Queue a full export of a type.
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'list')
+        file_format = DataTransfer._check_format(file_format)
+        return JobRunner.submit('export', data_object_class.__name__.lower(), {'format': file_format})
+
+    @staticmethod
+    def submit_reindex(object_slug: str) -> Dict[str, Any]:
+        """
+        Queue an index rebuild of a type's table.
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'update')
+        return JobRunner.submit('reindex', data_object_class.__name__.lower())
+
+    @staticmethod
+    def result_path(job: Dict[str, Any]) -> Optional[str]:
+        """
+        Path of a finished export's file, or None if the job has none.
+        """
+        output = (job.get('result') or {}).get('output')
+        if job['status'] != 'succeeded' or not output:
+            return None
+        path = os.path.join(JobRunner.SPOOL_DIR, output)
+        return path if os.path.exists(path) else None
+
+    @staticmethod
+    def read_records(path: str, file_format: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Stream (line number, record, parse error) from an import file.
+        """
+        with open(path, newline='', encoding='utf-8') as f:
+            if file_format == 'csv':
+                reader = csv.DictReader(f)
+                for record in reader:
+                    if None in record:
+                        yield reader.line_num, None, "more values than header columns"
+                    else:
+                        yield reader.line_num, record, None
+                return
+
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield line_number, None, f"invalid JSON: {str(e)}"
+                    continue
+                if not isinstance(record, dict):
+                    yield line_number, None, "not a JSON object"
+                    continue
+                yield line_number, record, None
+
+    @staticmethod
+    def complete_row(data_object_class, values: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """
+        Fill in the id, timestamps and column defaults a Core insert or COPY
+        would not apply, so every row has every column.
+        """
+        row = {}
+        for column in data_object_class.__table__.columns:
+            name = column.name
+            if values.get(name) is not None:
+                row[name] = values[name]
+            elif name == 'id':
+                row[name] = data_object_class.generate_id()
+            elif name in ('created_at', 'updated_at'):
+                row[name] = now
+            elif column.default is not None and column.default.is_scalar:
+                row[name] = column.default.arg
+            elif column.default is not None and column.default.is_callable:
+                row[name] = column.default.arg(None)
+            else:
+                row[name] = values.get(name)
+        return row
+
+    @staticmethod
+    def _copy_value(value):
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    @staticmethod
+    def copy_rows(connection, table, rows: List[Dict[str, Any]]):
+        """
+        Load rows with COPY FROM STDIN on the connection's transaction (Postgres).
+        """
+        preparer = connection.dialect.identifier_preparer
+        names = [column.name for column in table.columns]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([DataTransfer._copy_value(row[name]) for name in names])
+        statement = (
+            f"COPY {preparer.format_table(table)} ({', '.join(preparer.quote(name) for name in names)}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        )
+
+        cursor = connection.connection.cursor()
+        try:
+            if hasattr(cursor, 'copy_expert'):
+                # psycopg2
+                buffer.seek(0)
+                cursor.copy_expert(statement, buffer)
+            else:
+                # psycopg 3
+                with cursor.copy(statement) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def load_batch(data_object_class, rows: List[Dict[str, Any]], checkpoint=None):
+        """
+        Insert a batch of complete rows in one transaction.
+
+        checkpoint(connection) is called in that transaction before it
+        commits (see JobContext.checkpoint); when it returns False it is
+        called again as checkpoint(None) after the commit.
+        """
+        engine = DatabaseManager.get_engine(data_object_class)
+        table = data_object_class.__table__
+        with engine.begin() as connection:
+            if engine.dialect.name == 'postgresql':
+                DataTransfer.copy_rows(connection, table, rows)
+            else:
+                connection.execute(insert(table), rows)
+            written = checkpoint(connection) if checkpoint is not None else True
+        if not written:
+            checkpoint(None)
+
+    @staticmethod
+    def run_import(context: JobContext) -> Dict[str, Any]:
+        """
+        Job handler of 'import'.
+        """
+        data_object_class = CrudEngine.get_class(context.slug, 'create')
+        validator = RecordValidator.for_class(data_object_class)
+        abort = context.params.get('on_error') == 'abort'
+        path = os.path.join(JobRunner.SPOOL_DIR, context.params['input'])
+
+        # a requeued import resumes after the last committed line
+        resume = context.progress.get('checkpoint') or {}
+        resume_line = resume.get('line', 0)
+        counts = {'processed': 0, 'imported': 0, 'invalid': 0, 'failed': 0, **resume.get('counts', {})}
+        errors = list(resume.get('errors', []))
+        batch = []
+        if resume_line:
+            logger.info(f"Import job {context.job_id} resumes after line {resume_line}")
+
+        def reject(line_number, messages):
+            counts['invalid'] += 1
+            if len(errors) < DataTransfer.MAX_REPORTED_ERRORS:
+                errors.append({'line': line_number, 'errors': messages})
+            if abort:
+                raise ValueError(f"Invalid record on line {line_number}: {'; '.join(messages)}")
+
+        def flush():
+            # batch holds (line number, row); a failed batch is reported at its first line
+            last_line = batch[-1][0]
+            committed = dict(counts, imported=counts['imported'] + len(batch))
+
+            def checkpoint(connection):
+                return context.checkpoint(connection, line=last_line, counts=committed, errors=list(errors))
+
+            try:
+                DataTransfer.load_batch(data_object_class, [row for _, row in batch], checkpoint)
+                counts.update(committed)
+            except JobLost:
+                raise
+            except Exception as e:
+                if abort:
+                    raise
+                counts['failed'] += len(batch)
+                # the driver error only; the statement parameters hold record values
+                message = str(getattr(e, 'orig', None) or e).strip()[:200]
+                logger.warning(f"Import job {context.job_id}: batch of {len(batch)} failed: {message}")
+                if len(errors) < DataTransfer.MAX_REPORTED_ERRORS:
+                    errors.append({'line': batch[0][0], 'errors': [f"batch of {len(batch)} failed: {message}"]})
+                # a failed batch is not retried on resume either
+                context.checkpoint(line=last_line, counts=dict(counts), errors=list(errors))
+            batch.clear()
+            context.update(**counts, errors=len(errors))
+
+        now = datetime.utcnow()
+        for line_number, record, parse_error in DataTransfer.read_records(path, context.params['format']):
+            if line_number <= resume_line:
+                continue
+            counts['processed'] += 1
+            if parse_error:
+                reject(line_number, [parse_error])
+                continue
+            values, messages = validator.validate(record)
+            if messages:
+                reject(line_number, messages)
+                continue
+            # validated as given; stored hashed like writes through the API
+            values = data_object_class.hash_passwords(values)
+            batch.append((line_number, DataTransfer.complete_row(data_object_class, values, now)))
+            if len(batch) >= DataTransfer.BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+
+        context.update(force=True, **counts, errors=len(errors))
+        os.remove(path)
+        logger.info(f"Import job {context.job_id} into {context.slug}: {counts}")
+        return {**counts, 'errors': errors}
+
+    @staticmethod
+    def _csv_value(value):
+        if value is None:
+            return ''
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    @staticmethod
+    def run_export(context: JobContext) -> Dict[str, Any]:
+        """
+        Job handler of 'export'.
+        """
+        data_object_class = CrudEngine.get_class(context.slug, 'list')
+        file_format = context.params.get('format', 'ndjson')
+        table = data_object_class.__table__
+        serializer = RowSerializer.for_class(data_object_class)
+        cluster = DatabaseManager.clusters[getattr(data_object_class, '_database', None) or 'default']
+        engine = cluster.reader()
+
+        path = context.spool_path(f"export.{file_format}")
+        tmp_path = f"{path}.tmp"
+        exported = 0
+        with engine.connect() as connection, open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            total = connection.execute(select(func.count()).select_from(table)).scalar()
+            context.update(force=True, exported=0, total=total)
+
+            # plain rows of the serialized columns; no ORM instances
+            statement = select(*serializer.columns).order_by(table.c.created_at, table.c.id)
+            result = connection.execution_options(stream_results=True).execute(statement)
+
+            writer = None
+            if file_format == 'csv':
+                writer = csv.writer(f)
+                writer.writerow([column.name for column in serializer.columns])
+            for rows in result.partitions(DataTransfer.BATCH_SIZE):
+                for row in rows:
+                    record = serializer.serialize_record(row)
+                    if writer is not None:
+                        writer.writerow([DataTransfer._csv_value(value) for value in record.values()])
+                    else:
+                        f.write(json.dumps(record, default=str))
+                        f.write('\n')
+                exported += len(rows)
+                context.update(exported=exported, total=total)
+        os.replace(tmp_path, path)
+
+        context.update(force=True, exported=exported, total=total)
+        logger.info(f"Export job {context.job_id} of {context.slug}: {exported} rows")
+        return {'rows': exported, 'format': file_format, 'output': os.path.basename(path), 'bytes': os.path.getsize(path)}
+
+    @staticmethod
+    def create_index_concurrently(index, dialect):
+        """
+        CREATE INDEX CONCURRENTLY statement of an index (Postgres): the build
+        does not block writes to the table. Must run in autocommit mode.
+        """
+        statement = str(CreateIndex(index).compile(dialect=dialect))
+        return re.sub(r'^CREATE (UNIQUE )?INDEX ', r'CREATE \1INDEX CONCURRENTLY ', statement)
+
+    @staticmethod
+    def run_reindex(context: JobContext) -> Dict[str, Any]:
+        """
+        Job handler of 'reindex'.
+        """
+        data_object_class = CrudEngine.get_class(context.slug, 'update')
+        engine = DatabaseManager.get_engine(data_object_class)
+        table = data_object_class.__table__
+        preparer = engine.dialect.identifier_preparer
+
+        indexes = []
+        if engine.dialect.name == 'postgresql' and not data_object_class._partitioning:
+            # CREATE INDEX CONCURRENTLY cannot run in a transaction block
+            with engine.connect() as connection:
+                connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+                existing = {index['name'] for index in inspect(connection).get_indexes(table.name, schema=table.schema)}
+                for index in table.indexes:
+                    if index.name not in existing:
+                        connection.exec_driver_sql(DataTransfer.create_index_concurrently(index, engine.dialect))
+                    indexes.append(index.name)
+        else:
+            # partitioned tables cannot build indexes concurrently; SQLite has no concurrent builds
+            for index in table.indexes:
+                index.create(engine, checkfirst=True)
+                indexes.append(index.name)
+        data_object_class.create_search_indexes(engine)
+        context.update(force=True, indexes=len(indexes), rebuilt=False)
+
+        if engine.dialect.name == 'postgresql':
+            with engine.connect() as connection:
+                connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+                # rebuilds without blocking writes (Postgres 12+)
+                connection.execute(text(f"REINDEX TABLE CONCURRENTLY {preparer.format_table(table)}"))
+        else:
+            with engine.begin() as connection:
+                connection.execute(text(f"REINDEX {preparer.format_table(table)}"))
+        context.update(force=True, rebuilt=True)
+        # plans may change with the new indexes
+        QueryGuard.clear()
+        return {'indexes': indexes}
+
+
+JobRunner.register('import', DataTransfer.run_import)
+JobRunner.register('export', DataTransfer.run_export)
+JobRunner.register('reindex', DataTransfer.run_reindex)
@@ -0,0 +1,121 @@
+# src/utils/description_snapshot.py
+
+import os
+import json
+import mmap
+import struct
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Artifact layout:
+#   MAGIC (8 bytes) | header length (8 bytes, little-endian) | header JSON | payload
+# The header maps every object slug (and the master document) to an
+# (offset, length) slice of the payload holding its pre-encoded JSON.
+MAGIC = b"BLGDESC1"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<8sQ")
+
+
+class DescriptionSnapshot:
+    """
+    Read-only view of a description snapshot built by
+    tools/build_description_snapshot.py.
+
+    The file is memory-mapped, so worker processes share its pages and only
+    the small header is parsed at startup. Responses are returned as the
+    pre-encoded JSON bytes. This module must not import SQLAlchemy or the
+    models; it is what lets metadata_main.py start without them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = _PREFIX.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a description snapshot")
+        header_start = _PREFIX.size
+        self.header = json.loads(self._map[header_start:header_start + header_length])
+        if self.header.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version: {self.header.get('format_version')}")
+        self._payload_start = header_start + header_length
+
+    @property
+    def version(self) -> str:
+        """
+        Content hash of the snapshot, usable as an ETag.
+        """
+        return self.header['content_hash']
+
+    def _slice(self, location) -> bytes:
+        offset, length = location
+        start = self._payload_start + offset
+        return self._map[start:start + length]
+
+    def get_object_description(self, object_slug: str) -> Optional[bytes]:
+        """
+        Get the encoded description of a data object type, or None if unknown.
+        """
+        location = self.header['objects'].get(object_slug.lower())
+        if location is None:
+            return None
+        return self._slice(location)
+
+    def get_master_document(self) -> bytes:
+        """
+        Get the encoded master document.
+        """
+        return self._slice(self.header['master'])
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    @staticmethod
+    def encode(document: Dict[str, Any]) -> bytes:
+        """
+        Encode a document the way it is stored in the snapshot.
+        """
+        return json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def write(path: str, master_document: Dict[str, Any], descriptions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Write a snapshot atomically (temp file + rename).
+
+        Args:
+            path (str): Output file path
+            master_document (Dict[str, Any]): The master document
+            descriptions (Dict[str, Dict[str, Any]]): Object descriptions by slug
+
+        Returns:
+            Dict[str, Any]: The header that was written
+        """
+        payload = bytearray()
+        digest = hashlib.sha256()
+
+        def append(document):
+            encoded = DescriptionSnapshot.encode(document)
+            location = [len(payload), len(encoded)]
+            payload.extend(encoded)
+            digest.update(encoded)
+            return location
+
+        header = {
+            'format_version': FORMAT_VERSION,
+            'built_at': datetime.utcnow().isoformat(),
+            'master': append(master_document),
+            'objects': {slug: append(description) for slug, description in sorted(descriptions.items())}
+        }
+        header['content_hash'] = digest.hexdigest()[:16]
+        encoded_header = json.dumps(header, sort_keys=True).encode("utf-8")
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, len(encoded_header)))
+            f.write(encoded_header)
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return header
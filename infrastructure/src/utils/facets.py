@@ -0,0 +1,287 @@
+# src/utils/facets.py
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Enum, String, case, cast, func, literal, select, text, tuple_, union_all
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import ProgrammingError
+from database.db import DatabaseManager
+from utils.crud import CrudEngine, CrudError
+from utils.logger import logger
+from utils.row_cache import RowCache
+from utils.request_scope import RequestScope
+
+
+class FacetEngine:
+    """
+    Value counts for the filterable fields of a data object type.
+
+    The facet fields are the type's Enum columns plus its declared searchFields
+    (the list filters). All of them are counted in a single query, with the
+    request's filters and text search applied: GROUP BY GROUPING SETS on
+    Postgres, a UNION ALL of per-field GROUP BYs elsewhere. Results are cached
+    per filter combination for a short TTL.
+
+    A type with many rows can opt in to a materialized summary for unfiltered
+    requests with a `_facet_summary` class attribute, e.g.
+
+        _facet_summary = {'refresh_interval': 300}
+
+    The summary is a materialized view refreshed in the background once it is
+    older than refresh_interval seconds; stale counts are served meanwhile.
+    """
+
+    CACHE_TTL = float(os.environ.get("FACET_CACHE_TTL", "30"))
+    CACHE_MAX_ENTRIES = int(os.environ.get("FACET_CACHE_MAX_ENTRIES", "1000"))
+
+    # most frequent values returned per non-enum field
+    MAX_VALUES = int(os.environ.get("FACET_MAX_VALUES", "50"))
+
+    # static caches of facet results by slug
+    _caches: Dict[str, RowCache] = {}
+    _lock = threading.Lock()
+    # slugs whose summary refresh is running in this process
+    _refreshing = set()
+
+    @staticmethod
+    def facet_fields(data_object_class) -> List[str]:
+        """
+        Get the names of the columns counted for a type.
+        """
+        table = data_object_class.__table__
+        search_fields = getattr(data_object_class, '_field_properties', {}).get('searchFields', [])
+        fields = []
+        for column in table.columns:
+            if getattr(column, 'field_format', None) == 'password':
+                continue
+            if isinstance(column.type, Enum) or column.name in search_fields:
+                fields.append(column.name)
+        return fields
+
+    @staticmethod
+    def build_query(data_object_class, fields: List[str], params: Dict[str, str], dialect_name: str):
+        """
+        Build the single query returning (facet, value, count) rows for every field.
+
+        Values are returned as strings, the form the list filters accept.
+        """
+        table = data_object_class.__table__
+        columns = [table.columns[name] for name in fields]
+
+        if dialect_name == 'postgresql':
+            grouped = [func.grouping(column) == 0 for column in columns]
+            statement = select(
+                case(*[(is_grouped, literal(name)) for is_grouped, name in zip(grouped, fields)]).label('facet'),
+                case(*[(is_grouped, cast(column, String)) for is_grouped, column in zip(grouped, columns)]).label('value'),
+                func.count().label('count')
+            ).select_from(table)
+            statement = CrudEngine.apply_filters(data_object_class, statement, params)
+            return statement.group_by(func.grouping_sets(*[tuple_(column) for column in columns]))
+
+        selects = []
+        for name, column in zip(fields, columns):
+            statement = select(
+                literal(name).label('facet'),
+                cast(column, String).label('value'),
+                func.count().label('count')
+            ).select_from(table)
+            statement = CrudEngine.apply_filters(data_object_class, statement, params)
+            selects.append(statement.group_by(column))
+        return union_all(*selects) if len(selects) > 1 else selects[0]
+
+    @staticmethod
+    def build_result(data_object_class, fields: List[str], rows) -> Dict[str, Dict[str, int]]:
+        """
+        Group (facet, value, count) rows by field. Enum fields list every
+        allowed value (zero when absent); other fields keep the MAX_VALUES most
+        frequent values. NULL is reported under the "null" key.
+        """
+        table = data_object_class.__table__
+        counts = {name: {} for name in fields}
+        for facet, value, count in rows:
+            if facet in counts:
+                counts[facet]['null' if value is None else value] = int(count)
+
+        result = {}
+        for name in fields:
+            column_type = table.columns[name].type
+            if isinstance(column_type, Enum):
+                values = {value: counts[name].get(value, 0) for value in column_type.enums}
+                if 'null' in counts[name]:
+                    values['null'] = counts[name]['null']
+            else:
+                top = sorted(counts[name].items(), key=lambda item: (-item[1], item[0]))[:FacetEngine.MAX_VALUES]
+                values = dict(top)
+            result[name] = values
+        return result
+
+    @classmethod
+    def _cache_for(cls, slug: str) -> RowCache:
+        # plain TTL/LRU store; facets are not invalidated by writes
+        cache = cls._caches.get(slug)
+        if cache is None:
+            with cls._lock:
+                cache = cls._caches.get(slug)
+                if cache is None:
+                    cache = RowCache(f"{slug}:facets", ttl=cls.CACHE_TTL, max_entries=cls.CACHE_MAX_ENTRIES)
+                    cls._caches[slug] = cache
+        return cache
+
+    @classmethod
+    def facets(cls, object_slug: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Count the records of a type per value of each facet field.
+
+        Args:
+            object_slug (str): The slug identifier for the data object type
+            params (Dict[str, str]): Request query parameters; the list filters
+                and q apply, paging and sort parameters are ignored
+
+        Returns:
+            Dict[str, Any]: {'facets': {field: {value: count}}, 'source': 'live' or 'summary'}
+        """
+        data_object_class = CrudEngine.get_class(object_slug, 'list')
+        fields = cls.facet_fields(data_object_class)
+        if not fields:
+            raise CrudError(f"No facet fields are defined for {object_slug}")
+
+        filters = {
+            key: value for key, value in params.items()
+            if value != '' and key not in ('page_size', 'cursor', 'sort')
+        }
+        slug = data_object_class.__name__.lower()
+        cache = cls._cache_for(slug)
+        key = json.dumps(filters, sort_keys=True)
+
+        def load():
+            engine = DatabaseManager.get_engine(data_object_class)
+            if not filters and getattr(data_object_class, '_facet_summary', None) and engine.dialect.name == 'postgresql':
+                return cls.read_summary(data_object_class, fields)
+
+            statement = cls.build_query(data_object_class, fields, filters, engine.dialect.name)
+            session = RequestScope.session(read_only=True)
+            try:
+                rows = session.execute(statement, bind_arguments={'mapper': data_object_class.__mapper__}).all()
+            finally:
+                RequestScope.release(session)
+            return {'facets': cls.build_result(data_object_class, fields, rows), 'source': 'live'}
+
+        return cache.get_or_load(key, load)
+
+    @staticmethod
+    def summary_name(data_object_class) -> str:
+        return f"{data_object_class.__table__.name}_facet_summary"
+
+    @classmethod
+    def create_summary(cls, data_object_class, engine):
+        """
+        Create and populate the type's materialized facet summary (Postgres only).
+        """
+        fields = cls.facet_fields(data_object_class)
+        statement = cls.build_query(data_object_class, fields, {}, 'postgresql')
+        query = statement.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True})
+        name = cls.summary_name(data_object_class)
+        with engine.begin() as connection:
+            connection.execute(text(
+                f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS "
+                f"SELECT facet, value, count, now() AS refreshed_at FROM ({query}) AS facet_counts"
+            ))
+            # REFRESH ... CONCURRENTLY needs a unique index
+            connection.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{name} ON {name} (facet, value)"))
+        logger.info(f"Created facet summary {name}")
+
+    @classmethod
+    def refresh_summary(cls, data_object_class):
+        """
+        Refresh the type's facet summary without blocking readers. An advisory
+        lock keeps worker processes from refreshing the same summary at once.
+        """
+        name = cls.summary_name(data_object_class)
+        engine = DatabaseManager.get_engine(data_object_class)
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            if not connection.execute(text("SELECT pg_try_advisory_lock(hashtext(:name))"), {'name': name}).scalar():
+                return
+            try:
+                start = datetime.utcnow()
+                connection.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
+                logger.info(f"Refreshed facet summary {name} in {(datetime.utcnow() - start).total_seconds():.2f}s")
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {'name': name})
+
+    @classmethod
+    def _refresh_in_background(cls, data_object_class):
+        slug = data_object_class.__name__.lower()
+        with cls._lock:
+            if slug in cls._refreshing:
+                return
+            cls._refreshing.add(slug)
+
+        def run():
+            try:
+                cls.refresh_summary(data_object_class)
+            except Exception as e:
+                logger.error(f"Error refreshing facet summary for {slug}: {str(e)}")
+            finally:
+                with cls._lock:
+                    cls._refreshing.discard(slug)
+
+        threading.Thread(target=run, name=f"facet-summary-{slug}", daemon=True).start()
+
+    @classmethod
+    def read_summary(cls, data_object_class, fields: List[str]) -> Dict[str, Any]:
+        """
+        Read unfiltered counts from the materialized summary, creating it on
+        first use and scheduling a refresh once it is older than refresh_interval.
+        """
+        name = cls.summary_name(data_object_class)
+        engine = DatabaseManager.get_engine(data_object_class)
+        query = text(f"SELECT facet, value, count, refreshed_at FROM {name}")
+        try:
+            with engine.connect() as connection:
+                rows = connection.execute(query).all()
+        except ProgrammingError:
+            # first use: the view does not exist yet
+            cls.create_summary(data_object_class, engine)
+            with engine.connect() as connection:
+                rows = connection.execute(query).all()
+
+        refreshed_at: Optional[datetime] = rows[0].refreshed_at if rows else None
+        interval = data_object_class._facet_summary.get('refresh_interval', 300)
+        if refreshed_at is None or (datetime.now(refreshed_at.tzinfo) - refreshed_at).total_seconds() > interval:
+            cls._refresh_in_background(data_object_class)
+
+        return {
+            'facets': cls.build_result(data_object_class, fields, [(row.facet, row.value, row.count) for row in rows]),
+            'source': 'summary',
+            'as_of': refreshed_at.isoformat() if refreshed_at is not None else None
+        }
+
+    @classmethod
+    def forget(cls, slug: str):
+        """
+        Drop the cached facet counts of a type replaced by a model reload.
+        """
+        with cls._lock:
+            cls._caches.pop(slug, None)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Get the counters of the facet result caches in this process.
+        """
+        with cls._lock:
+            caches = dict(cls._caches)
+        return {slug: cache.stats() for slug, cache in caches.items()}
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        cls._lock = threading.Lock()
+        cls._refreshing = set()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=FacetEngine._after_fork_in_child)
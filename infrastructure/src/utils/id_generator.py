@@ -0,0 +1,217 @@
+# src/utils/id_generator.py
+
+import os
+import time
+import uuid
+import secrets
+import threading
+from typing import Dict, Optional, Type
+
+# Crockford base32 alphabet used by ULIDs (no I, L, O or U)
+_CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+class IdGenerator:
+    """
+    Base class for primary key generators used by DataObject classes.
+
+    Generators run entirely in-process (no database round trip). Subclasses
+    register themselves under a short name so a DataObject class can pick one
+    with the `_id_generator` class attribute.
+    """
+
+    # Name used to select the generator, e.g. 'uuid7'
+    name: Optional[str] = None
+
+    # static registry of generator classes by name
+    _generator_classes: Dict[str, Type["IdGenerator"]] = {}
+
+    # per-process generator instances by name
+    _instances: Dict[str, "IdGenerator"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.name:
+            IdGenerator._generator_classes[cls.name] = cls
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Reset per-process state. Called in the child after a fork.
+        """
+        pass
+
+    def generate(self) -> str:
+        """
+        Generate a new identifier.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def get(cls, name: str) -> "IdGenerator":
+        """
+        Get the shared generator instance for the given name.
+
+        Args:
+            name (str): The generator name (uuid4, uuid7, ulid or snowflake)
+
+        Returns:
+            IdGenerator: The generator instance for this process
+        """
+        generator = cls._instances.get(name)
+        if generator is not None:
+            return generator
+
+        with cls._instances_lock:
+            generator = cls._instances.get(name)
+            if generator is None:
+                if name not in cls._generator_classes:
+                    raise ValueError(f"Unknown ID generator: {name}")
+                generator = cls._generator_classes[name]()
+                cls._instances[name] = generator
+        return generator
+
+    @classmethod
+    def available(cls):
+        """
+        Get the names of all available generators.
+        """
+        return sorted(cls._generator_classes.keys())
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        """
+        Reinitialise locks and per-process state of every generator after fork.
+        """
+        cls._instances_lock = threading.Lock()
+        for generator in cls._instances.values():
+            generator._lock = threading.Lock()
+            generator.reset()
+
+
+class UUID4Generator(IdGenerator):
+    """
+    Random UUIDs. Kept for comparison; inserts scatter across the index.
+    """
+    name = 'uuid4'
+
+    def generate(self) -> str:
+        return str(uuid.uuid4())
+
+
+class UUID7Generator(IdGenerator):
+    """
+    Time-ordered UUIDv7 (RFC 9562).
+
+    Layout: 48-bit unix milliseconds, version, 12-bit counter (rand_a),
+    variant, 62 random bits. The counter is seeded randomly each millisecond
+    and incremented for IDs generated within the same millisecond, so IDs from
+    one process are strictly increasing.
+    """
+    name = 'uuid7'
+
+    def reset(self):
+        self._last_ms = 0
+        self._counter = 0
+
+    def generate(self) -> str:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                # leave headroom in the counter for IDs in the same millisecond
+                self._counter = secrets.randbits(11)
+            else:
+                self._counter += 1
+                if self._counter > 0xFFF:
+                    # counter exhausted, borrow the next millisecond
+                    self._last_ms += 1
+                    self._counter = secrets.randbits(11)
+            timestamp_ms = self._last_ms
+            counter = self._counter
+
+        value = (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+        value |= 0x7 << 76
+        value |= counter << 64
+        value |= 0b10 << 62
+        value |= secrets.randbits(62)
+        return str(uuid.UUID(int=value))
+
+
+class ULIDGenerator(IdGenerator):
+    """
+    Monotonic ULIDs: 48-bit unix milliseconds followed by 80 random bits,
+    encoded as 26 Crockford base32 characters. Within the same millisecond the
+    random part is incremented so IDs stay sortable.
+    """
+    name = 'ulid'
+
+    def reset(self):
+        self._last_ms = 0
+        self._last_random = 0
+
+    def generate(self) -> str:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._last_random = secrets.randbits(80)
+            else:
+                self._last_random += 1
+                if self._last_random >= 1 << 80:
+                    self._last_ms += 1
+                    self._last_random = secrets.randbits(80)
+            value = (self._last_ms << 80) | self._last_random
+
+        chars = []
+        for _ in range(26):
+            chars.append(_CROCKFORD_ALPHABET[value & 0x1F])
+            value >>= 5
+        return "".join(reversed(chars))
+
+
+class SnowflakeGenerator(IdGenerator):
+    """
+    Snowflake-style 63-bit IDs: 41-bit milliseconds since ID_EPOCH_MS,
+    10-bit node id and a 12-bit per-millisecond sequence.
+
+    The node id is built from ID_NODE_ID (0-31, one per host) and the process
+    id (pid % 32), and is recomputed after a fork so forked workers on the same
+    host do not share a sequence. Each process on a host must end up with a
+    distinct pid % 32; use uuid7 or ulid where that cannot be guaranteed.
+    IDs are zero-padded to 19 digits so string order matches numeric order.
+    """
+    name = 'snowflake'
+
+    # 2024-01-01T00:00:00Z
+    EPOCH_MS = int(os.environ.get("ID_EPOCH_MS", "1704067200000"))
+
+    def reset(self):
+        host_id = int(os.environ.get("ID_NODE_ID", "0")) & 0x1F
+        self.node_id = (host_id << 5) | (os.getpid() & 0x1F)
+        self._last_ms = 0
+        self._sequence = 0
+
+    def generate(self) -> str:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000 - self.EPOCH_MS
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                self._sequence = (self._sequence + 1) & 0xFFF
+                if self._sequence == 0:
+                    # sequence exhausted, wait for the next millisecond
+                    while now_ms <= self._last_ms:
+                        now_ms = time.time_ns() // 1_000_000 - self.EPOCH_MS
+                    self._last_ms = now_ms
+            value = (self._last_ms << 22) | (self.node_id << 12) | self._sequence
+        return f"{value:019d}"
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=IdGenerator._after_fork_in_child)
@@ -0,0 +1,475 @@
+# src/utils/jobs.py
+
+import os
+import time
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import and_, delete, func, insert, select, update
+from database.db import DatabaseManager
+from models.job import Job, generate_job_id
+from utils.logger import logger
+from utils.pg_notify import PgNotifier
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job handler when cancellation was requested.
+    """
+
+
+class JobLost(Exception):
+    """
+    Raised inside a job handler whose claim is gone: the job was requeued
+    (or failed) as stale and may already run elsewhere, so this run must not
+    write anything more.
+    """
+
+
+class JobContext:
+    """
+    Handle passed to a job handler: its parameters, progress reporting,
+    checkpoints and cancellation checks. The claim (worker and attempt)
+    guards every write, so a run whose job was requeued as stale cannot
+    overwrite the new run. JobRunner.run heartbeats from a side thread while
+    the handler runs; progress updates also refresh the heartbeat.
+    """
+
+    def __init__(self, job_id: str, job_type: str, slug: Optional[str], params: Dict[str, Any],
+                 worker: Optional[str] = None, attempt: int = 1, progress: Optional[Dict[str, Any]] = None):
+        self.job_id = job_id
+        self.job_type = job_type
+        self.slug = slug
+        self.params = params or {}
+        self.worker = worker
+        self.attempt = attempt
+        # progress of an earlier attempt, so handlers can resume from its checkpoint
+        self.progress: Dict[str, Any] = dict(progress or {})
+        self.lost = False
+        self._last_update = 0.0
+
+    def claimed(self):
+        """
+        Condition matching the job's row only while this run holds the claim.
+        """
+        table = Job.__table__
+        return and_(
+            table.c.id == self.job_id, table.c.status == 'running',
+            table.c.worker == self.worker, table.c.attempts == self.attempt
+        )
+
+    def _write_progress(self, connection):
+        if self.lost:
+            raise JobLost(f"Job {self.job_id} was requeued; attempt {self.attempt} stops")
+        written = connection.execute(
+            update(Job.__table__).where(self.claimed())
+            .values(progress=dict(self.progress), heartbeat_at=datetime.utcnow())
+        ).rowcount
+        if not written:
+            self.lost = True
+            raise JobLost(f"Job {self.job_id} was requeued; attempt {self.attempt} stops")
+
+    def update(self, force: bool = False, **progress):
+        """
+        Merge progress counters and store them, at most every
+        JobRunner.PROGRESS_INTERVAL seconds unless forced.
+
+        Raises:
+            JobCancelled: If the job was cancelled meanwhile
+            JobLost: If the job was requeued meanwhile
+        """
+        self.progress.update(progress)
+        now = time.monotonic()
+        if not force and now - self._last_update < JobRunner.PROGRESS_INTERVAL:
+            return
+        self._last_update = now
+
+        table = Job.__table__
+        with DatabaseManager.engine.begin() as connection:
+            self._write_progress(connection)
+            cancel_requested = connection.execute(
+                select(table.c.cancel_requested).where(table.c.id == self.job_id)
+            ).scalar()
+        if cancel_requested:
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+    def checkpoint(self, connection=None, **state) -> bool:
+        """
+        Record how far the job got (progress['checkpoint']), so a requeued
+        run can resume instead of starting over.
+
+        Pass the connection of the transaction holding the work. On the jobs
+        database the checkpoint is written in that transaction, so the work
+        and the checkpoint commit together, and a lost claim rolls the work
+        back. On another database only the claim is checked there; call again
+        with connection=None after the commit to write the checkpoint.
+
+        Returns:
+            bool: False if the checkpoint still has to be written after commit
+
+        Raises:
+            JobLost: If the job was requeued meanwhile
+        """
+        self.progress['checkpoint'] = state
+        if connection is not None and connection.engine is DatabaseManager.engine:
+            self._write_progress(connection)
+            return True
+        with DatabaseManager.engine.begin() as jobs_connection:
+            if connection is None:
+                self._write_progress(jobs_connection)
+                return True
+            if self.lost or jobs_connection.execute(select(Job.__table__.c.id).where(self.claimed())).first() is None:
+                self.lost = True
+                raise JobLost(f"Job {self.job_id} was requeued; attempt {self.attempt} stops")
+        return False
+
+    def spool_path(self, suffix: str) -> str:
+        """
+        Path of a file belonging to this job in the spool directory.
+        """
+        return JobRunner.spool_path(self.job_id, suffix)
+
+
+class JobRunner:
+    """
+    Persistent background jobs for work too long to run inside a request.
+
+    Jobs are rows of the jobs table, so any worker process can run them.
+    Each process runs up to JOB_WORKERS worker threads; an idle thread claims
+    the oldest queued job with SELECT ... FOR UPDATE SKIP LOCKED and a
+    conditional status update, so a job runs exactly once even with many
+    processes polling. Submissions wake idle workers through LISTEN/NOTIFY,
+    with polling every JOB_POLL_INTERVAL seconds as a fallback.
+
+    Environment variables:
+      - JOB_WORKERS: worker threads per process (0 disables running jobs)
+      - JOB_POLL_INTERVAL: seconds between polls of an idle worker
+      - JOB_STALE_SECONDS: heartbeat age after which a running job is requeued
+      - JOB_HEARTBEAT_INTERVAL: seconds between heartbeats of a running job
+        (a fifth of JOB_STALE_SECONDS by default)
+      - JOB_MAX_ATTEMPTS: runs of a job before a stale job is failed instead
+      - JOB_SPOOL_DIR: directory for uploaded inputs and export outputs;
+        must be shared between hosts when workers run on several
+      - JOB_RETENTION_HOURS: age after which finished jobs and their files are deleted
+    """
+
+    WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+    POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "2"))
+    STALE_SECONDS = float(os.environ.get("JOB_STALE_SECONDS", "300"))
+    HEARTBEAT_INTERVAL = float(os.environ.get("JOB_HEARTBEAT_INTERVAL", str(STALE_SECONDS / 5)))
+    MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+    PROGRESS_INTERVAL = float(os.environ.get("JOB_PROGRESS_INTERVAL", "1"))
+    RETENTION_HOURS = float(os.environ.get("JOB_RETENTION_HOURS", "168"))
+    CHANNEL = os.environ.get("JOB_CHANNEL", "jobs")
+    SPOOL_DIR = os.environ.get(
+        "JOB_SPOOL_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "jobs")
+    )
+
+    # job type -> handler taking a JobContext and returning the result document
+    _handlers: Dict[str, Callable[[JobContext], Optional[Dict[str, Any]]]] = {}
+    _lock = threading.Lock()
+    _wakeup = threading.Event()
+    _threads: List[threading.Thread] = []
+    _threads_pid = None
+    _last_maintenance = 0.0
+
+    completed = 0
+    failed = 0
+    cancelled = 0
+
+    @classmethod
+    def register(cls, job_type: str, handler: Callable[[JobContext], Optional[Dict[str, Any]]]):
+        """
+        Register the handler of a job type.
+        """
+        cls._handlers[job_type] = handler
+
+    @classmethod
+    def spool_path(cls, job_id: str, suffix: str) -> str:
+        os.makedirs(cls.SPOOL_DIR, exist_ok=True)
+        return os.path.join(cls.SPOOL_DIR, f"{job_id}.{suffix}")
+
+    @classmethod
+    def submit(cls, job_type: str, slug: Optional[str] = None, params: Optional[Dict[str, Any]] = None,
+               job_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Queue a job.
+
+        Args:
+            job_type (str): A registered job type
+            slug (Optional[str]): The data object type the job works on
+            params (Optional[Dict[str, Any]]): Handler parameters
+            job_id (Optional[str]): Id reserved earlier with new_job_id (e.g. to name an upload)
+
+        Returns:
+            Dict[str, Any]: The job's status document
+        """
+        if job_type not in cls._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        table = Job.__table__
+        values = {
+            'id': job_id or generate_job_id(),
+            'job_type': job_type,
+            'slug': slug,
+            'status': 'queued',
+            'params': params or {},
+            'progress': {},
+            'cancel_requested': False,
+            'attempts': 0,
+            'created_at': datetime.utcnow()
+        }
+        with DatabaseManager.engine.begin() as connection:
+            connection.execute(insert(table).values(**values))
+            PgNotifier.notify(connection, cls.CHANNEL, {'job_id': values['id']})
+        cls._wakeup.set()
+        logger.info(f"Queued {job_type} job {values['id']} for {slug}")
+        return cls.get(values['id'])
+
+    @staticmethod
+    def new_job_id() -> str:
+        return generate_job_id()
+
+    @classmethod
+    def get(cls, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status document of a job, or None if it does not exist.
+        """
+        table = Job.__table__
+        with DatabaseManager.engine.connect() as connection:
+            row = connection.execute(select(table).where(table.c.id == job_id)).first()
+        return Job.row_to_dict(row) if row is not None else None
+
+    @classmethod
+    def cancel(cls, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a queued job at once, or ask a running job to stop at its next
+        progress update. Finished jobs are left as they are.
+        """
+        table = Job.__table__
+        with DatabaseManager.engine.begin() as connection:
+            cancelled = connection.execute(
+                update(table).where(table.c.id == job_id, table.c.status == 'queued')
+                .values(status='cancelled', cancel_requested=True, finished_at=datetime.utcnow())
+            ).rowcount
+            if not cancelled:
+                connection.execute(
+                    update(table).where(table.c.id == job_id, table.c.status == 'running')
+                    .values(cancel_requested=True)
+                )
+        if cancelled:
+            cls.cancelled += 1
+            cls._remove_files(job_id)
+        return cls.get(job_id)
+
+    @classmethod
+    def claim(cls) -> Optional[JobContext]:
+        """
+        Claim the oldest queued job for this worker.
+        """
+        table = Job.__table__
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        with DatabaseManager.engine.begin() as connection:
+            candidate = connection.execute(
+                select(table.c.id).where(table.c.status == 'queued')
+                .order_by(table.c.created_at).limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalar()
+            if candidate is None:
+                return None
+            now = datetime.utcnow()
+            # conditional update: a backend without SKIP LOCKED may hand the
+            # same candidate to several workers, only one of them wins
+            claimed = connection.execute(
+                update(table).where(table.c.id == candidate, table.c.status == 'queued')
+                .values(status='running', worker=worker, attempts=table.c.attempts + 1,
+                        started_at=now, heartbeat_at=now)
+            ).rowcount
+            if not claimed:
+                return None
+            row = connection.execute(select(table).where(table.c.id == candidate)).first()
+        return JobContext(row.id, row.job_type, row.slug, row.params,
+                          worker=worker, attempt=row.attempts, progress=row.progress)
+
+    @classmethod
+    def heartbeat(cls, context: JobContext) -> bool:
+        """
+        Refresh a running job's heartbeat while this run holds its claim.
+
+        Returns:
+            bool: False if the claim is gone
+        """
+        with DatabaseManager.engine.begin() as connection:
+            return bool(connection.execute(
+                update(Job.__table__).where(context.claimed()).values(heartbeat_at=datetime.utcnow())
+            ).rowcount)
+
+    @classmethod
+    def _heartbeat_loop(cls, context: JobContext, done: threading.Event):
+        # handlers may spend minutes in one statement (REINDEX, a large COPY)
+        while not done.wait(cls.HEARTBEAT_INTERVAL):
+            try:
+                if not cls.heartbeat(context):
+                    context.lost = True
+                    logger.warning(f"Job {context.job_id} attempt {context.attempt} lost its claim")
+                    return
+            except Exception as e:
+                logger.error(f"Heartbeat of job {context.job_id} failed: {str(e)}")
+
+    @classmethod
+    def run(cls, context: JobContext):
+        """
+        Run a claimed job and record its outcome, unless the job was
+        requeued meanwhile.
+        """
+        table = Job.__table__
+        handler = cls._handlers.get(context.job_type)
+        start = time.monotonic()
+        values = {'finished_at': None}
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=cls._heartbeat_loop, args=(context, done), name=f"job-heartbeat-{context.job_id}", daemon=True
+        )
+        heartbeat.start()
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job type: {context.job_type}")
+            result = handler(context)
+            values.update(status='succeeded', result=result or {})
+            logger.info(f"Job {context.job_id} ({context.job_type}) succeeded in {time.monotonic() - start:.2f}s")
+        except JobLost as e:
+            logger.warning(f"Job {context.job_id} ({context.job_type}): {str(e)}")
+            return
+        except JobCancelled:
+            values.update(status='cancelled')
+            logger.info(f"Job {context.job_id} ({context.job_type}) cancelled")
+        except Exception as e:
+            # database errors carry their statement parameters; keep only the driver message
+            values.update(status='failed', error=str(getattr(e, 'orig', None) or e))
+            logger.error(f"Job {context.job_id} ({context.job_type}) failed: {str(e)}", exc_info=True)
+        finally:
+            done.set()
+
+        values['finished_at'] = datetime.utcnow()
+        with DatabaseManager.engine.begin() as connection:
+            recorded = connection.execute(
+                update(table).where(context.claimed())
+                .values(progress=dict(context.progress), **values)
+            ).rowcount
+        if not recorded:
+            logger.warning(f"Job {context.job_id} was requeued; outcome of attempt {context.attempt} "
+                           f"({values['status']}) discarded")
+            return
+        if values['status'] == 'succeeded':
+            cls.completed += 1
+        elif values['status'] == 'cancelled':
+            cls.cancelled += 1
+            cls._remove_files(context.job_id)
+        else:
+            cls.failed += 1
+
+    @classmethod
+    def maintain(cls):
+        """
+        Requeue running jobs whose worker stopped heartbeating (or fail them
+        after JOB_MAX_ATTEMPTS), and delete finished jobs past retention.
+        """
+        table = Job.__table__
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=cls.STALE_SECONDS)
+        with DatabaseManager.engine.begin() as connection:
+            failed = connection.execute(
+                update(table).where(
+                    table.c.status == 'running', table.c.heartbeat_at < stale,
+                    table.c.attempts >= cls.MAX_ATTEMPTS
+                ).values(status='failed', error='Worker stopped responding', finished_at=now)
+            ).rowcount
+            requeued = connection.execute(
+                update(table).where(table.c.status == 'running', table.c.heartbeat_at < stale)
+                .values(status='queued', worker=None)
+            ).rowcount
+        if failed or requeued:
+            logger.warning(f"Stale jobs: {requeued} requeued, {failed} failed")
+
+        cutoff = now - timedelta(hours=cls.RETENTION_HOURS)
+        expired = and_(table.c.status.in_(Job.FINISHED_STATUSES), table.c.finished_at < cutoff)
+        with DatabaseManager.engine.begin() as connection:
+            expired_ids = connection.execute(select(table.c.id).where(expired)).scalars().all()
+            if expired_ids:
+                connection.execute(delete(table).where(table.c.id.in_(expired_ids)))
+        for job_id in expired_ids:
+            cls._remove_files(job_id)
+
+    @classmethod
+    def _remove_files(cls, job_id: str):
+        if not os.path.isdir(cls.SPOOL_DIR):
+            return
+        for name in os.listdir(cls.SPOOL_DIR):
+            if name.startswith(f"{job_id}."):
+                try:
+                    os.remove(os.path.join(cls.SPOOL_DIR, name))
+                except OSError as e:
+                    logger.warning(f"Could not remove job file {name}: {str(e)}")
+
+    @classmethod
+    def _worker_loop(cls):
+        while True:
+            try:
+                if time.monotonic() - cls._last_maintenance > cls.STALE_SECONDS / 2:
+                    cls._last_maintenance = time.monotonic()
+                    cls.maintain()
+                context = cls.claim()
+                if context is not None:
+                    cls.run(context)
+                    continue
+            except Exception as e:
+                logger.error(f"Job worker error: {str(e)}", exc_info=True)
+            cls._wakeup.wait(cls.POLL_INTERVAL)
+            cls._wakeup.clear()
+
+    @classmethod
+    def ensure_workers(cls):
+        """
+        Start this process's worker threads.
+        """
+        if cls.WORKERS <= 0 or (cls._threads and cls._threads_pid == os.getpid()):
+            return
+        with cls._lock:
+            if cls._threads and cls._threads_pid == os.getpid():
+                return
+            PgNotifier.subscribe(cls.CHANNEL, lambda message: cls._wakeup.set())
+            PgNotifier.ensure_listening()
+            cls._threads_pid = os.getpid()
+            cls._threads = [
+                threading.Thread(target=cls._worker_loop, name=f"job-worker-{i}", daemon=True)
+                for i in range(cls.WORKERS)
+            ]
+            for thread in cls._threads:
+                thread.start()
+            logger.info(f"Started {cls.WORKERS} job worker(s)")
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        table = Job.__table__
+        with DatabaseManager.engine.connect() as connection:
+            counts = dict(connection.execute(
+                select(table.c.status, func.count()).group_by(table.c.status)
+            ).all())
+        return {
+            'workers': len(cls._threads) if cls._threads_pid == os.getpid() else 0,
+            'jobs': counts,
+            'completed': cls.completed,
+            'failed': cls.failed,
+            'cancelled': cls.cancelled
+        }
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        cls._lock = threading.Lock()
+        cls._wakeup = threading.Event()
+        cls._threads = []
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=JobRunner._after_fork_in_child)
@@ -0,0 +1,396 @@
+# src/utils/model_registry.py
+
+import os
+import sys
+import time
+import threading
+import warnings
+import importlib.util
+from collections import deque, namedtuple
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy.exc import SAWarning
+import models
+from models.data_object import DataObject
+from database.db import DatabaseManager
+from utils.data_object import DataObjectManager
+from utils.facets import FacetEngine
+from utils.logger import logger
+from utils.partitions import PartitionManager
+from utils.query_guard import QueryGuard
+from utils.row_cache import RowCache
+from utils.serializer import RowSerializer
+from utils.validation import RecordValidator
+
+# Immutable view of the registered models. classes and descriptions are
+# keyed by slug; modules maps each model module name to the mtime it was
+# loaded from.
+RegistrySnapshot = namedtuple(
+    'RegistrySnapshot', 'version classes descriptions master schemas modules built_at'
+)
+
+
+class ReloadRefused(Exception):
+    """
+    A model change that cannot be applied to the running process.
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+class ModelRegistry:
+    """
+    Builds and publishes the registry snapshot (classes, object descriptions
+    and the master document) and, with MODEL_RELOAD enabled, hot-reloads
+    changed modules of models/ without a restart.
+
+    A watcher thread polls the model modules' mtimes every
+    MODEL_RELOAD_INTERVAL seconds. Changed modules are executed into fresh
+    module objects, their classes validated and described off to the side,
+    and the new snapshot is published with a single reference swap
+    (DataObject._registry), so in-flight requests finish against the classes
+    they started with. Then the caches derived from the replaced classes
+    (serializers, validators, row and facet caches, query plans) are dropped.
+
+    A reload is refused as a whole, keeping the current snapshot, when a
+    type's table schema changed (columns, types, nullability, keys, indexes,
+    partitioning or database): that needs a migration and a restart. New
+    types get their tables created. Changes to models/data_object.py always
+    need a restart. A reload whose classes fail to import or map (e.g. a
+    relationship to an unknown class) fails as a whole too, and its classes
+    are unmapped again.
+
+    Each process reloads on its own; reload timings are kept for
+    /api/stats/registry.
+    """
+
+    RELOAD_ENABLED = os.environ.get("MODEL_RELOAD", "false").lower() in ('1', 'true', 'yes')
+    RELOAD_INTERVAL = float(os.environ.get("MODEL_RELOAD_INTERVAL", "2"))
+    MODELS_DIR = os.path.dirname(os.path.abspath(models.__file__))
+    # modules that are not reloadable model definitions
+    BASE_MODULES = ('__init__', 'data_object')
+
+    _lock = threading.Lock()
+    _thread = None
+    _thread_pid = None
+    # mtimes of a reload that failed or was refused; not retried until the files change again
+    _rejected_mtimes = None
+    _reloads = deque(maxlen=20)
+
+    @classmethod
+    def current(cls) -> RegistrySnapshot:
+        """
+        Get the published snapshot, building it from the registered classes
+        on first use.
+        """
+        registry = DataObject._registry
+        if registry is None:
+            with cls._lock:
+                registry = DataObject._registry
+                if registry is None:
+                    registry = cls.build(DataObject._registered_classes, cls.scan(), 1)
+                    cls.publish(registry)
+        return registry
+
+    @classmethod
+    def build(cls, data_object_classes, modules: Dict[str, float], version: int) -> RegistrySnapshot:
+        """
+        Describe a set of classes into a new snapshot.
+        """
+        classes = {data_object_class.__name__.lower(): data_object_class for data_object_class in data_object_classes}
+        return RegistrySnapshot(
+            version=version,
+            classes=classes,
+            descriptions={
+                slug: DataObjectManager.build_object_description(data_object_class)
+                for slug, data_object_class in classes.items()
+            },
+            master=DataObjectManager.build_master_document(list(classes.values())),
+            schemas={slug: cls.schema(data_object_class) for slug, data_object_class in classes.items()},
+            modules=modules,
+            built_at=datetime.utcnow()
+        )
+
+    @staticmethod
+    def publish(registry: RegistrySnapshot):
+        DataObject._registry = registry
+        # copy-on-write: code iterating the old list keeps a consistent view
+        DataObject._registered_classes = list(registry.classes.values())
+
+    @staticmethod
+    def schema(data_object_class) -> Dict[str, Any]:
+        """
+        The parts of a class that are stored in the database schema.
+        """
+        table = data_object_class.__table__
+        return {
+            'table': table.name,
+            'database': getattr(data_object_class, '_database', None) or 'default',
+            'partitioning': PartitionManager.config(data_object_class),
+            'columns': {
+                column.name: {
+                    'type': repr(column.type),
+                    'nullable': column.nullable,
+                    'primary_key': column.primary_key,
+                    'unique': bool(column.unique),
+                    'server_default': str(column.server_default.arg) if column.server_default is not None else None
+                }
+                for column in table.columns
+            },
+            'indexes': sorted(
+                (index.name, tuple(str(expression) for expression in index.expressions), bool(index.unique))
+                for index in table.indexes
+            )
+        }
+
+    @staticmethod
+    def schema_changes(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+        """
+        Describe the differences between two schemas of a type.
+        """
+        changes = []
+        for key in ('table', 'database', 'partitioning', 'indexes'):
+            if old[key] != new[key]:
+                changes.append(f"{key} changed")
+        for name in new['columns'].keys() - old['columns'].keys():
+            changes.append(f"column {name} added")
+        for name in old['columns'].keys() - new['columns'].keys():
+            changes.append(f"column {name} removed")
+        for name in old['columns'].keys() & new['columns'].keys():
+            for attribute, value in new['columns'][name].items():
+                if old['columns'][name][attribute] != value:
+                    changes.append(f"column {name} {attribute} changed")
+        return sorted(changes)
+
+    @classmethod
+    def scan(cls) -> Dict[str, float]:
+        """
+        Get the mtime of every model module.
+        """
+        modules = {}
+        for file_name in os.listdir(cls.MODELS_DIR):
+            name, extension = os.path.splitext(file_name)
+            if extension == '.py':
+                modules[name] = os.path.getmtime(os.path.join(cls.MODELS_DIR, file_name))
+        return modules
+
+    @classmethod
+    def _execute(cls, name: str):
+        """
+        Execute a model module into a new module object, leaving sys.modules
+        untouched until the reload is published.
+        """
+        module_name = f"{models.__name__}.{name}"
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(cls.MODELS_DIR, f"{name}.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        classes = [
+            value for value in vars(module).values()
+            if isinstance(value, type) and issubclass(value, DataObject)
+            and value.__module__ == module_name and not value.__dict__.get('__abstract__', False)
+        ]
+        return module, classes
+
+    @staticmethod
+    def _dispose_mappers(mappers):
+        """
+        Unmap the classes of a rejected reload from DataObject's registry.
+        """
+        registry = DataObject.registry
+        for mapper in mappers:
+            manager = mapper.class_manager
+            registry._managers.pop(manager, None)
+            registry._dispose_manager_and_mapper(manager)
+        registry._new_mappers = any(not mapper.configured for mapper in registry.mappers)
+
+    @classmethod
+    def reload(cls) -> Optional[Dict[str, Any]]:
+        """
+        Reload the model modules changed since the published snapshot.
+
+        Returns:
+            Optional[Dict[str, Any]]: The reload record, or None if nothing changed
+        """
+        with cls._lock:
+            current = DataObject._registry or cls.current()
+            mtimes = cls.scan()
+            changed = sorted(name for name, mtime in mtimes.items() if current.modules.get(name) != mtime)
+            removed = sorted(name for name in current.modules if name not in mtimes)
+            if not changed and not removed or mtimes == cls._rejected_mtimes:
+                return None
+
+            started = time.perf_counter()
+            record = {
+                'at': datetime.utcnow().isoformat(),
+                'modules': changed + removed,
+                'version': current.version,
+                'status': 'ok'
+            }
+            metadata = DataObject.metadata
+            reloaded = [name for name in changed if name not in cls.BASE_MODULES]
+            replaced = [
+                data_object_class for data_object_class in current.classes.values()
+                if data_object_class.__module__.rpartition('.')[2] in reloaded + removed
+            ]
+            tables_before = dict(metadata.tables)
+            # class name -> class, for the string lookups of relationship() and friends
+            class_registry = DataObject.registry._class_registry
+            class_entries_before = dict(class_registry)
+            mappers_before = set(DataObject.registry.mappers)
+            try:
+                base_changed = [name for name in changed if name in cls.BASE_MODULES]
+                if base_changed:
+                    raise ReloadRefused(f"{', '.join(base_changed)} changed; restart the service to apply it")
+
+                # the new classes declare the same tables on the shared metadata
+                for data_object_class in replaced:
+                    metadata.remove(data_object_class.__table__)
+                loaded_modules = {}
+                new_classes = []
+                with warnings.catch_warnings():
+                    # replacing a class of the same name in the declarative registry is the point
+                    warnings.simplefilter('ignore', SAWarning)
+                    for name in reloaded:
+                        loaded_modules[name], module_classes = cls._execute(name)
+                        new_classes.extend(module_classes)
+                for data_object_class in new_classes:
+                    data_object_class.prepare_class()
+                # resolve relationships now, so a broken model fails the reload
+                # instead of the next flush of every session
+                DataObject.registry.configure()
+                import_seconds = time.perf_counter() - started
+
+                classes = [
+                    data_object_class for data_object_class in current.classes.values()
+                    if data_object_class not in replaced
+                ] + new_classes
+                slugs = [data_object_class.__name__.lower() for data_object_class in classes]
+                duplicates = sorted({slug for slug in slugs if slugs.count(slug) > 1})
+                if duplicates:
+                    raise ReloadRefused(f"duplicate types: {', '.join(duplicates)}")
+
+                added = []
+                problems = []
+                for data_object_class in new_classes:
+                    slug = data_object_class.__name__.lower()
+                    if slug not in current.schemas:
+                        added.append(data_object_class)
+                        continue
+                    changes = cls.schema_changes(current.schemas[slug], cls.schema(data_object_class))
+                    if changes:
+                        problems.append(f"{slug}: {', '.join(changes)}")
+                if problems:
+                    raise ReloadRefused(f"schema changes need a migration: {'; '.join(problems)}")
+
+                for data_object_class in added:
+                    data_object_class.create_table(DatabaseManager.get_engine(data_object_class))
+                registry = cls.build(classes, mtimes, current.version + 1)
+                build_seconds = time.perf_counter() - started - import_seconds
+            except Exception as e:
+                # put the metadata back the way the current classes declared it
+                metadata.clear()
+                for table in tables_before.values():
+                    metadata._add_table(table.name, table.schema, table)
+                # and the mapper registry the way the current classes registered in it:
+                # a rejected mapper left behind fails configure() for every write
+                cls._dispose_mappers(set(DataObject.registry.mappers) - mappers_before)
+                class_registry.clear()
+                class_registry.update(class_entries_before)
+                cls._rejected_mtimes = mtimes
+                record['status'] = 'refused' if isinstance(e, ReloadRefused) else 'failed'
+                record['error'] = e.message if isinstance(e, ReloadRefused) else f"{type(e).__name__}: {str(e)}"
+                record['total_ms'] = round((time.perf_counter() - started) * 1000, 2)
+                cls._reloads.append(record)
+                logger.error(f"Model reload {record['status']} ({', '.join(record['modules'])}): {record['error']}")
+                return record
+
+            swap_started = time.perf_counter()
+            # names resolve to the new classes only; the replaced ones stay mapped
+            # for the requests still using them
+            for data_object_class in replaced:
+                DataObject.registry._dispose_cls(data_object_class)
+            for data_object_class in new_classes:
+                class_registry[data_object_class.__name__] = data_object_class
+            cls.publish(registry)
+            for name, module in loaded_modules.items():
+                sys.modules[module.__name__] = module
+                setattr(models, name, module)
+            for name in removed:
+                sys.modules.pop(f"{models.__name__}.{name}", None)
+            swap_seconds = time.perf_counter() - swap_started
+
+            # caches derived from the replaced classes
+            for data_object_class in replaced:
+                slug = data_object_class.__name__.lower()
+                RowSerializer.forget(data_object_class)
+                RecordValidator.forget(data_object_class)
+                RowCache.forget(slug)
+                FacetEngine.forget(slug)
+            QueryGuard.clear()
+            cls._rejected_mtimes = None
+
+            record.update({
+                'version': registry.version,
+                'types': sorted(registry.classes),
+                'added': sorted(data_object_class.__name__.lower() for data_object_class in added),
+                'import_ms': round(import_seconds * 1000, 2),
+                'build_ms': round(build_seconds * 1000, 2),
+                'swap_ms': round(swap_seconds * 1000, 3),
+                'total_ms': round((time.perf_counter() - started) * 1000, 2)
+            })
+            cls._reloads.append(record)
+            logger.info(
+                f"Reloaded models {', '.join(record['modules'])} as registry version {registry.version} "
+                f"in {record['total_ms']} ms (swap {record['swap_ms']} ms)"
+            )
+            return record
+
+    @classmethod
+    def ensure_watcher(cls):
+        """
+        Start this process's model watcher thread when MODEL_RELOAD is enabled.
+        """
+        if not cls.RELOAD_ENABLED or cls._thread is not None and cls._thread_pid == os.getpid():
+            return
+
+        def run():
+            while True:
+                time.sleep(cls.RELOAD_INTERVAL)
+                try:
+                    cls.reload()
+                except Exception as e:
+                    logger.error(f"Model watcher failed: {str(e)}")
+
+        with cls._lock:
+            if cls._thread is not None and cls._thread_pid == os.getpid():
+                return
+            cls._thread_pid = os.getpid()
+            cls._thread = threading.Thread(target=run, name="model-watcher", daemon=True)
+            cls._thread.start()
+            logger.info(f"Watching {cls.MODELS_DIR} for model changes every {cls.RELOAD_INTERVAL}s")
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Get the published snapshot's version and the recent reloads.
+        """
+        registry = cls.current()
+        return {
+            'version': registry.version,
+            'built_at': registry.built_at.isoformat(),
+            'types': sorted(registry.classes),
+            'reload_enabled': cls.RELOAD_ENABLED,
+            'reload_interval': cls.RELOAD_INTERVAL,
+            'reloads': list(cls._reloads)
+        }
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        cls._lock = threading.Lock()
+        cls._thread = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=ModelRegistry._after_fork_in_child)
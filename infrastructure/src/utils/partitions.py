@@ -0,0 +1,346 @@
+# src/utils/partitions.py
+
+import os
+import re
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import MetaData, PrimaryKeyConstraint, UniqueConstraint, text
+from utils.logger import logger
+
+# FOR VALUES FROM ('2026-10-01 00:00:00') TO ('2026-11-01 00:00:00')
+_BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class PartitionManager:
+    """
+    Range partitioning of DataObject tables on created_at (Postgres only).
+
+    A class opts in with a `_partitioning` class attribute:
+
+        _partitioning = {
+            'interval': 'month',     # day, week, month or year
+            'premake': 3,            # future partitions kept ready
+            'retention': 12,         # partitions kept, counting the current one; None keeps all
+            'on_expire': 'detach',   # detach, archive (move to archive_schema) or drop
+            'archive_schema': 'archive'
+        }
+
+    The table is created PARTITION BY RANGE (created_at) with the primary key
+    (id, created_at), since Postgres requires the partition key in every
+    unique constraint; the ORM keeps mapping id alone as the identity. A
+    DEFAULT partition catches rows outside the premade ranges (e.g. imports
+    of old records). Partitions are created ahead and expired by a
+    maintenance thread every PARTITION_MAINTENANCE_INTERVAL seconds in each
+    process; an advisory lock lets only one process work on a table at a time.
+    Since the DEFAULT partition rules out DETACH ... CONCURRENTLY, expiring
+    takes the parent's lock briefly, waiting at most PARTITION_LOCK_TIMEOUT.
+    """
+
+    INTERVALS = ('day', 'week', 'month', 'year')
+    EXPIRE_ACTIONS = ('detach', 'archive', 'drop')
+    DEFAULTS = {'interval': 'month', 'premake': 3, 'retention': None, 'on_expire': 'detach', 'archive_schema': 'archive'}
+
+    MAINTENANCE_INTERVAL = float(os.environ.get("PARTITION_MAINTENANCE_INTERVAL", "3600"))
+    # longest wait for the parent's lock when a DETACH cannot run CONCURRENTLY
+    LOCK_TIMEOUT = os.environ.get("PARTITION_LOCK_TIMEOUT", "5s")
+
+    _lock = threading.Lock()
+    _thread = None
+    _thread_pid = None
+
+    @classmethod
+    def config(cls, data_object_class) -> Optional[Dict[str, Any]]:
+        """
+        Get a class's partitioning settings merged over DEFAULTS, or None.
+        """
+        settings = getattr(data_object_class, '_partitioning', None)
+        if not settings:
+            return None
+        return {**cls.DEFAULTS, **settings}
+
+    @classmethod
+    def validate(cls, data_object_class):
+        """
+        Check a class's partitioning settings at registration.
+
+        Raises:
+            ValueError: On unknown settings or unique constraints Postgres
+                cannot enforce on a partitioned table
+        """
+        config = cls.config(data_object_class)
+        if config is None:
+            return
+        name = data_object_class.__name__
+        if config['interval'] not in cls.INTERVALS:
+            raise ValueError(f"{name}: partition interval must be one of {', '.join(cls.INTERVALS)}")
+        if config['on_expire'] not in cls.EXPIRE_ACTIONS:
+            raise ValueError(f"{name}: on_expire must be one of {', '.join(cls.EXPIRE_ACTIONS)}")
+
+        table = data_object_class.__table__
+        unique_sets = [
+            [column.name for column in constraint.columns]
+            for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+        ]
+        unique_sets += [[column.name for column in index.columns] for index in table.indexes if index.unique]
+        unique_sets += [[column.name] for column in table.columns if column.unique]
+        for columns in unique_sets:
+            if 'created_at' not in columns:
+                raise ValueError(
+                    f"{name}: unique constraint on {', '.join(columns)} must include created_at on a partitioned table"
+                )
+
+    @staticmethod
+    def floor(moment: datetime, interval: str) -> datetime:
+        """
+        Start of the partition containing moment.
+        """
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        if interval == 'day':
+            return day
+        if interval == 'week':
+            return day - timedelta(days=day.weekday())
+        if interval == 'month':
+            return day.replace(day=1)
+        return day.replace(month=1, day=1)
+
+    @staticmethod
+    def advance(start: datetime, interval: str, count: int = 1) -> datetime:
+        """
+        Move a partition start by count intervals (negative goes back).
+        """
+        if interval == 'day':
+            return start + timedelta(days=count)
+        if interval == 'week':
+            return start + timedelta(weeks=count)
+        if interval == 'month':
+            months = start.year * 12 + start.month - 1 + count
+            return start.replace(year=months // 12, month=months % 12 + 1)
+        return start.replace(year=start.year + count)
+
+    @staticmethod
+    def partition_name(table_name: str, start: datetime, interval: str) -> str:
+        suffix = {'day': '%Y%m%d', 'week': '%Y%m%d', 'month': '%Y%m', 'year': '%Y'}[interval]
+        return f"{table_name}_p{start.strftime(suffix)}"
+
+    @classmethod
+    def create_table(cls, data_object_class, engine):
+        """
+        Create a class's table as a range-partitioned table with its DEFAULT
+        partition and the current and premade partitions.
+        """
+        table = data_object_class.__table__
+        # DDL-only copy: the ORM keeps its id-only primary key
+        partitioned = table.to_metadata(MetaData())
+        partitioned.c.created_at.primary_key = True
+        partitioned.append_constraint(PrimaryKeyConstraint(
+            partitioned.c.id, partitioned.c.created_at, name=f"{table.name}_pkey"
+        ))
+        partitioned.dialect_options['postgresql']['partition_by'] = 'RANGE (created_at)'
+        partitioned.create(engine, checkfirst=True)
+
+        quote = engine.dialect.identifier_preparer.quote
+        with engine.begin() as connection:
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {quote(table.name + '_default')} PARTITION OF {quote(table.name)} DEFAULT"
+            ))
+        cls.ensure_partitions(data_object_class, engine)
+
+    @classmethod
+    def list_partitions(cls, data_object_class, engine) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+        """
+        Get the attached partitions of a class's table as (name, start, end),
+        start and end None for the DEFAULT partition, ordered by start.
+        """
+        query = text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+        )
+        with engine.connect() as connection:
+            rows = connection.execute(query, {'table': data_object_class.__table__.name}).all()
+
+        partitions = []
+        for name, bound in rows:
+            match = _BOUND_PATTERN.search(bound or '')
+            if match:
+                partitions.append((name, datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2))))
+            else:
+                partitions.append((name, None, None))
+        return sorted(partitions, key=lambda partition: partition[1] or datetime.min)
+
+    @classmethod
+    def ensure_partitions(cls, data_object_class, engine, now: Optional[datetime] = None) -> List[str]:
+        """
+        Create the partitions from the current interval through `premake`
+        intervals ahead that do not exist yet.
+        """
+        config = cls.config(data_object_class)
+        table_name = data_object_class.__table__.name
+        quote = engine.dialect.identifier_preparer.quote
+        start = cls.floor(now or datetime.utcnow(), config['interval'])
+        existing = {partition[1] for partition in cls.list_partitions(data_object_class, engine)}
+
+        created = []
+        for _ in range(config['premake'] + 1):
+            end = cls.advance(start, config['interval'])
+            if start not in existing:
+                name = cls.partition_name(table_name, start, config['interval'])
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {quote(name)} PARTITION OF {quote(table_name)} "
+                        f"FOR VALUES FROM ('{start.isoformat(' ')}') TO ('{end.isoformat(' ')}')"
+                    ))
+                created.append(name)
+            start = end
+        if created:
+            logger.info(f"Created partitions of {table_name}: {', '.join(created)}")
+        return created
+
+    @classmethod
+    def expire_partitions(cls, data_object_class, engine, now: Optional[datetime] = None) -> List[str]:
+        """
+        Detach, archive or drop the partitions that fall entirely outside the
+        retention window.
+        """
+        config = cls.config(data_object_class)
+        if not config['retention']:
+            return []
+        table_name = data_object_class.__table__.name
+        quote = engine.dialect.identifier_preparer.quote
+        cutoff = cls.advance(cls.floor(now or datetime.utcnow(), config['interval']), config['interval'],
+                             1 - config['retention'])
+
+        partitions = cls.list_partitions(data_object_class, engine)
+        # CONCURRENTLY (Postgres 14+) avoids blocking queries on the parent, but
+        # Postgres refuses it while the table has a DEFAULT partition; the plain
+        # DETACH then waits at most LOCK_TIMEOUT for its lock and is retried on
+        # the next maintenance run
+        concurrently = (
+            engine.dialect.server_version_info >= (14,)
+            and all(start is not None for _, start, _ in partitions)
+        )
+
+        def expire(connection, name):
+            connection.execute(text(
+                f"ALTER TABLE {quote(table_name)} DETACH PARTITION {quote(name)}{' CONCURRENTLY' if concurrently else ''}"
+            ))
+            if config['on_expire'] == 'drop':
+                connection.execute(text(f"DROP TABLE {quote(name)}"))
+            elif config['on_expire'] == 'archive':
+                schema = quote(config['archive_schema'])
+                connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+                connection.execute(text(f"ALTER TABLE {quote(name)} SET SCHEMA {schema}"))
+
+        expired = []
+        for name, start, end in partitions:
+            if end is None or end > cutoff:
+                continue
+            if concurrently:
+                # DETACH ... CONCURRENTLY cannot run inside a transaction block
+                with engine.connect() as connection:
+                    expire(connection.execution_options(isolation_level="AUTOCOMMIT"), name)
+            else:
+                with engine.begin() as connection:
+                    connection.execute(text("SELECT set_config('lock_timeout', :timeout, true)"),
+                                       {'timeout': cls.LOCK_TIMEOUT})
+                    expire(connection, name)
+            expired.append(name)
+            logger.info(f"Expired partition {name} of {table_name} ({config['on_expire']})")
+        return expired
+
+    @classmethod
+    def maintain(cls, data_object_class, engine) -> Dict[str, List[str]]:
+        """
+        Create upcoming and expire old partitions of one table, unless another
+        process is doing it right now.
+        """
+        table_name = data_object_class.__table__.name
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            lock_key = {'name': f"partitions:{table_name}"}
+            if not connection.execute(text("SELECT pg_try_advisory_lock(hashtext(:name))"), lock_key).scalar():
+                return {'created': [], 'expired': []}
+            try:
+                return {
+                    'created': cls.ensure_partitions(data_object_class, engine),
+                    'expired': cls.expire_partitions(data_object_class, engine)
+                }
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), lock_key)
+
+    @classmethod
+    def partitioned_classes(cls):
+        """
+        Get the registered classes with partitioning enabled and their engines.
+        """
+        from models.data_object import DataObject
+        from database.db import DatabaseManager
+
+        classes = []
+        for data_object_class in DataObject._registered_classes:
+            if cls.config(data_object_class) is None:
+                continue
+            engine = DatabaseManager.get_engine(data_object_class)
+            if engine.dialect.name == 'postgresql':
+                classes.append((data_object_class, engine))
+        return classes
+
+    @classmethod
+    def maintain_all(cls):
+        for data_object_class, engine in cls.partitioned_classes():
+            try:
+                cls.maintain(data_object_class, engine)
+            except Exception as e:
+                logger.error(f"Partition maintenance of {data_object_class.__name__} failed: {str(e)}")
+
+    @classmethod
+    def ensure_maintenance(cls):
+        """
+        Start this process's partition maintenance thread, if any class is partitioned.
+        """
+        if cls._thread is not None and cls._thread_pid == os.getpid():
+            return
+
+        def run():
+            while True:
+                cls.maintain_all()
+                time.sleep(cls.MAINTENANCE_INTERVAL)
+
+        with cls._lock:
+            if cls._thread is not None and cls._thread_pid == os.getpid():
+                return
+            cls._thread_pid = os.getpid()
+            if not cls.partitioned_classes():
+                # nothing to maintain; remember the check for this process
+                cls._thread = False
+                return
+            cls._thread = threading.Thread(target=run, name="partition-maintenance", daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Get the attached partitions of every partitioned table.
+        """
+        return {
+            data_object_class.__name__.lower(): [
+                {
+                    'name': name,
+                    'from': start.isoformat() if start else None,
+                    'to': end.isoformat() if end else None
+                }
+                for name, start, end in cls.list_partitions(data_object_class, engine)
+            ]
+            for data_object_class, engine in cls.partitioned_classes()
+        }
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        cls._lock = threading.Lock()
+        cls._thread = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=PartitionManager._after_fork_in_child)
@@ -0,0 +1,191 @@
+# src/utils/pg_notify.py
+
+import os
+import json
+import time
+import select
+import threading
+from typing import Any, Callable, Dict, List
+from sqlalchemy import text
+from utils.logger import logger
+
+
+class PgNotifier:
+    """
+    Cross-process messaging over Postgres LISTEN/NOTIFY.
+
+    Every process keeps one dedicated listening connection per Postgres
+    database (the primary of each DatabaseCluster), opened lazily by a
+    background thread the first time a channel is subscribed, so a message
+    can be notified in the transaction of any database. Messages are JSON
+    payloads; NOTIFY issued inside a transaction is only delivered when that
+    transaction commits, so subscribers never see uncommitted changes.
+    """
+
+    # seconds to wait between reconnect attempts of the listener
+    RECONNECT_DELAY = float(os.environ.get("PG_NOTIFY_RECONNECT_DELAY", "2.0"))
+
+    # channel name -> list of callbacks taking the decoded payload
+    _subscribers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+    _lock = threading.Lock()
+    # cluster name -> listener thread of this process
+    _threads: Dict[str, threading.Thread] = {}
+    _thread_pid = None
+    _stop = threading.Event()
+
+    @classmethod
+    def notify(cls, connection, channel: str, payload: Dict[str, Any]) -> bool:
+        """
+        Queue a notification on the given connection's current transaction.
+
+        Args:
+            connection: A SQLAlchemy Connection (or Session) inside the writing transaction
+            channel (str): The channel name
+            payload (Dict[str, Any]): JSON-serialisable message, must stay under 8000 bytes
+
+        Returns:
+            bool: False if the database does not support LISTEN/NOTIFY
+        """
+        bind = connection.get_bind() if hasattr(connection, 'get_bind') else connection
+        if bind.dialect.name != 'postgresql':
+            return False
+
+        message = dict(payload)
+        message['pid'] = os.getpid()
+        connection.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {'channel': channel, 'payload': json.dumps(message, default=str)}
+        )
+        return True
+
+    @classmethod
+    def subscribe(cls, channel: str, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Register a callback for a channel and make sure the listener is running.
+        Callbacks run on the listener thread and must not block.
+        """
+        with cls._lock:
+            callbacks = cls._subscribers.setdefault(channel, [])
+            if callback not in callbacks:
+                callbacks.append(callback)
+        cls.ensure_listening()
+
+    @classmethod
+    def _listening(cls) -> bool:
+        return cls._thread_pid == os.getpid() and all(thread.is_alive() for thread in cls._threads.values())
+
+    @classmethod
+    def ensure_listening(cls):
+        """
+        Start the listener threads for this process if they are not running.
+        """
+        from database.db import DatabaseManager
+
+        if cls._listening():
+            return
+
+        with cls._lock:
+            if cls._listening():
+                return
+            if cls._thread_pid != os.getpid() or cls._stop.is_set():
+                cls._stop = threading.Event()
+                cls._threads = {}
+            cls._thread_pid = os.getpid()
+            for name, cluster in DatabaseManager.clusters.items():
+                if cluster.primary.dialect.name != 'postgresql':
+                    continue
+                thread = cls._threads.get(name)
+                if thread is not None and thread.is_alive():
+                    continue
+                thread = threading.Thread(
+                    target=cls._listen_loop, args=(name, cluster.primary, cls._stop),
+                    name=f"pg-notify-listener-{name}", daemon=True
+                )
+                cls._threads[name] = thread
+                thread.start()
+
+    @classmethod
+    def stop(cls):
+        """
+        Stop the listener threads.
+        """
+        cls._stop.set()
+
+    @classmethod
+    def _listen_loop(cls, name: str, engine, stop: threading.Event):
+        """
+        Keep a LISTEN connection to one database open and dispatch
+        notifications, reconnecting on failure.
+        """
+        while not stop.is_set():
+            raw = None
+            try:
+                raw = engine.raw_connection()
+                # keep the LISTEN connection out of the pool; close() really closes it
+                raw.detach()
+                dbapi_conn = raw.driver_connection if hasattr(raw, 'driver_connection') else raw.connection
+                dbapi_conn.autocommit = True
+                listening = set()
+                logger.info(f"LISTEN/NOTIFY listener on {name} started in process {os.getpid()}")
+
+                while not stop.is_set():
+                    with cls._lock:
+                        channels = set(cls._subscribers.keys())
+                    with dbapi_conn.cursor() as cursor:
+                        for channel in channels - listening:
+                            cursor.execute(f'LISTEN "{channel}"')
+                            listening.add(channel)
+
+                    if not hasattr(dbapi_conn, 'poll'):
+                        # psycopg 3
+                        for notification in dbapi_conn.notifies(timeout=1.0):
+                            cls._dispatch(notification.channel, notification.payload)
+                        continue
+
+                    if select.select([dbapi_conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        notification = dbapi_conn.notifies.pop(0)
+                        cls._dispatch(notification.channel, notification.payload)
+            except Exception as e:
+                logger.error(f"LISTEN/NOTIFY listener on {name} error: {str(e)}")
+                time.sleep(cls.RECONNECT_DELAY)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+
+    @classmethod
+    def _dispatch(cls, channel: str, payload: str):
+        """
+        Decode a notification and hand it to the channel's callbacks.
+        """
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed notification on {channel}: {payload}")
+            return
+
+        with cls._lock:
+            callbacks = list(cls._subscribers.get(channel, []))
+        for callback in callbacks:
+            try:
+                callback(message)
+            except Exception as e:
+                logger.error(f"Error in notification callback for {channel}: {str(e)}", exc_info=True)
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        """
+        The listener threads do not survive a fork; let the child start its own.
+        """
+        cls._lock = threading.Lock()
+        cls._threads = {}
+        cls._thread_pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=PgNotifier._after_fork_in_child)
@@ -0,0 +1,262 @@
+# src/utils/query_guard.py
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func, select, text
+from database.db import DatabaseManager
+from utils.logger import logger
+
+
+class QueryGuard:
+    """
+    Cost check of the dynamically built list/search queries.
+
+    Before a list or search query runs, its shape (the SQL text with bind
+    placeholders, so filter values and cursors do not matter) is looked up
+    in a cache of EXPLAIN results; unknown shapes are explained once on the
+    database the query will run on. A shape whose estimated cost exceeds the
+    type's ceiling is either rejected or downgraded to a bounded scan over
+    the newest `scan_limit` rows (found through the created_at index), and
+    the filter/sort columns lacking an index are logged as index candidates.
+
+    Cost units are the planner's total cost on Postgres. SQLite has no cost
+    estimates, so there the cost is the rows a full table scan would visit
+    (0 when EXPLAIN QUERY PLAN shows only index searches).
+
+    A class can override the defaults with a `_query_guard` class attribute:
+
+        _query_guard = {'max_cost': 50000, 'action': 'downgrade', 'scan_limit': 5000}
+
+    Environment variables: QUERY_GUARD_ENABLED, QUERY_GUARD_MAX_COST,
+    QUERY_GUARD_ACTION (reject or downgrade), QUERY_GUARD_SCAN_LIMIT,
+    QUERY_GUARD_TTL (seconds before a shape is explained again, as tables
+    grow) and QUERY_GUARD_MAX_SHAPES.
+    """
+
+    ENABLED = os.environ.get("QUERY_GUARD_ENABLED", "true").lower() in ('1', 'true', 'yes')
+    ACTIONS = ('reject', 'downgrade')
+    DEFAULTS = {
+        'max_cost': float(os.environ.get("QUERY_GUARD_MAX_COST", "100000")),
+        'action': os.environ.get("QUERY_GUARD_ACTION", "reject"),
+        'scan_limit': int(os.environ.get("QUERY_GUARD_SCAN_LIMIT", "10000"))
+    }
+    TTL = float(os.environ.get("QUERY_GUARD_TTL", "600"))
+    MAX_SHAPES = int(os.environ.get("QUERY_GUARD_MAX_SHAPES", "1000"))
+
+    # shape -> verdict, least recently used first
+    _verdicts: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+    _lock = threading.Lock()
+
+    explains = 0
+    rejected = 0
+    downgraded = 0
+
+    @classmethod
+    def config(cls, data_object_class) -> Dict[str, Any]:
+        return {**cls.DEFAULTS, **(getattr(data_object_class, '_query_guard', None) or {})}
+
+    @classmethod
+    def check(cls, data_object_class, statement, params: Dict[str, str]) -> Tuple[Any, bool]:
+        """
+        Check a list/search statement against the type's cost ceiling.
+
+        Args:
+            data_object_class: The DataObject subclass queried
+            statement: The select built by CrudEngine.build_list_query
+            params (Dict[str, str]): The request parameters the select was built from
+
+        Returns:
+            Tuple: (statement to run, True if it was downgraded to a bounded scan)
+
+        Raises:
+            CrudError: If the query is over budget and the type's action is reject
+        """
+        from utils.crud import CrudError
+
+        if not cls.ENABLED:
+            return statement, False
+
+        config = cls.config(data_object_class)
+        cluster = DatabaseManager.clusters[getattr(data_object_class, '_database', None) or 'default']
+        engine = cluster.reader()
+        compiled = statement.compile(dialect=engine.dialect)
+        slug = data_object_class.__name__.lower()
+        shape = (slug, compiled.string)
+
+        verdict = cls._lookup(shape)
+        if verdict is None:
+            verdict = cls._explain(data_object_class, engine, compiled, params)
+            verdict['over_budget'] = verdict['cost'] > config['max_cost']
+            cls._store(shape, verdict)
+            if verdict['over_budget']:
+                logger.warning(
+                    f"Query over budget for {slug} (cost {verdict['cost']:.0f} > {config['max_cost']:.0f}, "
+                    f"{config['action']}): {verdict['plan']}; index candidates: {verdict['candidates'] or 'none'}"
+                )
+        verdict['hits'] += 1
+
+        if not verdict['over_budget']:
+            return statement, False
+        if config['action'] == 'downgrade':
+            cls.downgraded += 1
+            return cls.bound_scan(data_object_class, statement, config['scan_limit']), True
+
+        cls.rejected += 1
+        hint = f"; filter or sort by an indexed field instead of {', '.join(verdict['candidates'])}" \
+            if verdict['candidates'] else "; narrow the query with more filters"
+        raise CrudError(f"Query too expensive for {slug}{hint}", 400)
+
+    @staticmethod
+    def bound_scan(data_object_class, statement, scan_limit: int):
+        """
+        Restrict a statement to the newest scan_limit rows. The bound comes from
+        an index-only probe of created_at, so at most scan_limit rows are read.
+        """
+        created_at = data_object_class.__table__.c.created_at
+        boundary = (
+            select(created_at).order_by(created_at.desc())
+            .offset(scan_limit - 1).limit(1).scalar_subquery()
+        )
+        # fewer rows than the limit: no bound
+        return statement.where(created_at >= func.coalesce(boundary, datetime(1970, 1, 1)))
+
+    @classmethod
+    def _lookup(cls, shape) -> Optional[Dict[str, Any]]:
+        with cls._lock:
+            verdict = cls._verdicts.get(shape)
+            if verdict is None:
+                return None
+            if time.monotonic() - verdict['checked_at'] > cls.TTL:
+                del cls._verdicts[shape]
+                return None
+            cls._verdicts.move_to_end(shape)
+            return verdict
+
+    @classmethod
+    def _store(cls, shape, verdict: Dict[str, Any]):
+        with cls._lock:
+            cls._verdicts[shape] = verdict
+            while len(cls._verdicts) > cls.MAX_SHAPES:
+                cls._verdicts.popitem(last=False)
+
+    @classmethod
+    def _explain(cls, data_object_class, engine, compiled, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Explain a compiled statement and summarize the plan.
+        """
+        cls.explains += 1
+        if compiled.positional:
+            parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+        else:
+            parameters = compiled.params
+
+        with engine.connect() as connection:
+            if engine.dialect.name == 'postgresql':
+                rows = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", parameters).scalar()
+                plan = rows[0]['Plan'] if isinstance(rows, list) else rows
+                cost = float(plan['Total Cost'])
+                scans = cls._pg_seq_scans(plan)
+                summary = f"{plan['Node Type']}, seq scans: {', '.join(scans) or 'none'}"
+            else:
+                details = [row[-1] for row in connection.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {compiled.string}", parameters
+                )]
+                table_name = data_object_class.__table__.name
+                # "SCAN TABLE users" before SQLite 3.36
+                full_scan = any(detail in (f"SCAN {table_name}", f"SCAN TABLE {table_name}") for detail in details)
+                if full_scan:
+                    # rowid is dense for tables without deletes; a cheap upper bound
+                    cost = float(connection.execute(text(
+                        f"SELECT COALESCE(MAX(rowid), 0) FROM {engine.dialect.identifier_preparer.quote(table_name)}"
+                    )).scalar())
+                else:
+                    cost = 0.0
+                summary = "; ".join(details)
+
+        return {
+            'cost': cost,
+            'plan': summary,
+            'candidates': cls.index_candidates(data_object_class, params, engine.dialect.name),
+            'checked_at': time.monotonic(),
+            'hits': 0
+        }
+
+    @staticmethod
+    def _pg_seq_scans(plan: Dict[str, Any]) -> List[str]:
+        scans = []
+        if plan.get('Node Type') == 'Seq Scan':
+            scans.append(plan.get('Relation Name', '?'))
+        for child in plan.get('Plans', []):
+            scans.extend(QueryGuard._pg_seq_scans(child))
+        return scans
+
+    @staticmethod
+    def index_candidates(data_object_class, params: Dict[str, str], dialect_name: str) -> List[str]:
+        """
+        Get the filter and sort columns of a request that no index leads with.
+        """
+        from utils.crud import CrudEngine
+
+        table = data_object_class.__table__
+        leading = {index.expressions[0].name for index in table.indexes if hasattr(index.expressions[0], 'name')}
+        leading.update(column.name for column in table.primary_key.columns)
+        leading.update(column.name for column in table.columns if column.unique or column.index)
+
+        used = []
+        sort_name = (params.get('sort') or CrudEngine.DEFAULT_SORT).lstrip('-')
+        used.append(sort_name)
+        used.extend(
+            key for key, value in params.items()
+            if key not in CrudEngine.RESERVED_LIST_PARAMS and value != '' and key in table.columns
+        )
+        if params.get('created_after') or params.get('created_before'):
+            used.append('created_at')
+        if params.get('q', '').strip():
+            text_fields = getattr(data_object_class, '_field_properties', {}).get('searchTextFields', [])
+            # Postgres has trigram indexes on the text fields (DataObject.create_search_indexes)
+            if dialect_name != 'postgresql':
+                used.extend(text_fields)
+
+        candidates = []
+        for name in used:
+            if name not in leading and name not in candidates:
+                candidates.append(name)
+        return candidates
+
+    @classmethod
+    def clear(cls):
+        """
+        Forget all explained shapes, e.g. after creating an index.
+        """
+        with cls._lock:
+            cls._verdicts.clear()
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Get counters and the over-budget shapes known to this process.
+        """
+        with cls._lock:
+            over_budget = [
+                {
+                    'type': slug,
+                    'cost': verdict['cost'],
+                    'plan': verdict['plan'],
+                    'index_candidates': verdict['candidates'],
+                    'hits': verdict['hits']
+                }
+                for (slug, _), verdict in cls._verdicts.items() if verdict['over_budget']
+            ]
+            shapes = len(cls._verdicts)
+        return {
+            'enabled': cls.ENABLED,
+            'shapes': shapes,
+            'explains': cls.explains,
+            'rejected': cls.rejected,
+            'downgraded': cls.downgraded,
+            'over_budget': over_budget
+        }
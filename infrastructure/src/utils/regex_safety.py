@@ -0,0 +1,594 @@
+# src/utils/regex_safety.py
+
+import os
+import re
+import json
+import threading
+from collections import namedtuple
+from typing import Any, Dict, List, Optional
+from utils.logger import logger
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+# optional engines: re2 runs in linear time, regex supports a timeout
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+# Characters used to compare what parts of a pattern can match: all of
+# ASCII plus a few non-ASCII letters, digits and spaces for \w, \d and \s.
+_ALPHABET = frozenset(chr(code) for code in range(128)) | frozenset('éßÅ中٣  ')
+_CATEGORIES = {
+    'DIGIT': re.compile(r'\d'),
+    'NOT_DIGIT': re.compile(r'\D'),
+    'SPACE': re.compile(r'\s'),
+    'NOT_SPACE': re.compile(r'\S'),
+    'WORD': re.compile(r'\w'),
+    'NOT_WORD': re.compile(r'\W'),
+    'LINEBREAK': re.compile(r'\n'),
+    'NOT_LINEBREAK': re.compile(r'[^\n]')
+}
+
+# one element of a flattened pattern sequence
+_Element = namedtuple('_Element', 'node chars first nullable unbounded ambiguous')
+
+
+class SafePattern:
+    """
+    A compiled pattern that refuses input longer than max_length before
+    matching and runs on the engine RegexSafety picked for it.
+    """
+
+    def __init__(self, pattern: str, max_length: Optional[int], engine: str, compiled):
+        self.pattern = pattern
+        self.max_length = max_length
+        self.engine = engine
+        self.compiled = compiled
+
+    def search(self, value: str) -> bool:
+        """
+        Check whether the pattern matches somewhere in value. Input over
+        max_length and matches over the time budget count as no match.
+        """
+        if self.max_length is not None and len(value) > self.max_length:
+            return False
+        if self.engine == 'regex':
+            try:
+                return self.compiled.search(value, timeout=RegexSafety.TIMEOUT) is not None
+            except TimeoutError:
+                RegexSafety.record_timeout(self.pattern, len(value))
+                return False
+        return self.compiled.search(value) is not None
+
+
+class RegexSafety:
+    """
+    Static ReDoS analysis and guarded evaluation of the validation patterns
+    (field_regex of DataObject columns and the validation_formats of
+    app/data/field-format.json).
+
+    Patterns are parsed with the standard library's regex parser and checked
+    for the two shapes that make a backtracking engine blow up:
+
+    - exponential: an unbounded repeat whose body can match the same text
+      in more than one way, e.g. (a+)+, (\\w+\\s?)+, (\\w+|\\d+)* or (a|aa)*;
+    - polynomial: unbounded repeats in sequence that can trade the same
+      characters, e.g. \\d+\\d+ or [a-z.]+\\.[a-z]+, O(n^k) for a chain of k
+      (an unanchored pattern counts the search loop as one more).
+
+    With the longest input a field accepts, the estimated backtracking
+    steps (n^k, or 2^n) are compared to REGEX_MAX_STEPS. Classes are checked
+    at registration; with REGEX_SAFETY_MODE=reject an unsafe field_regex
+    fails the registration, with warn (the default) it is logged.
+
+    At validation, input longer than the field's length (REGEX_MAX_INPUT_LENGTH
+    for unbounded columns) is refused before the pattern runs, and
+    REGEX_ENGINE picks the engine: re2 (linear time; patterns it cannot
+    compile, e.g. with lookarounds, fall back), regex (with a
+    REGEX_TIMEOUT budget in seconds), re, or auto for the first installed.
+    """
+
+    MODE = os.environ.get("REGEX_SAFETY_MODE", "warn")
+    ENGINE = os.environ.get("REGEX_ENGINE", "auto")
+    MAX_STEPS = float(os.environ.get("REGEX_MAX_STEPS", "1000000"))
+    MAX_INPUT_LENGTH = int(os.environ.get("REGEX_MAX_INPUT_LENGTH", "1024"))
+    TIMEOUT = float(os.environ.get("REGEX_TIMEOUT", "0.05"))
+    # repeats with a higher upper bound are treated as unbounded
+    UNBOUNDED_REPEAT = 64
+    FORMATS_PATH = os.environ.get(
+        "FIELD_FORMATS_PATH",
+        os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+            "app", "data", "field-format.json"
+        )
+    )
+
+    # "Class.column" or "format:<type>" -> assessment
+    _assessments: Dict[str, Dict[str, Any]] = {}
+    _formats_checked = False
+    _lock = threading.Lock()
+
+    timeouts = 0
+
+    @classmethod
+    def analyze(cls, pattern: str) -> Dict[str, Any]:
+        """
+        Statically analyze a pattern for catastrophic backtracking.
+
+        Returns:
+            Dict: risk ('linear', 'polynomial', 'exponential' or 'invalid'),
+            degree (k of O(n^k), None when exponential) and the findings
+        """
+        try:
+            parsed = sre_parse.parse(pattern)
+        except re.error as e:
+            return {'pattern': pattern, 'risk': 'invalid', 'degree': None, 'findings': [{'reason': str(e)}]}
+
+        flags = getattr(getattr(parsed, 'state', None), 'flags', None) or parsed.pattern.flags
+        findings = []
+        anchored = bool(parsed.data) and str(parsed.data[0][0]) == 'AT' \
+            and str(parsed.data[0][1]) in ('AT_BEGINNING', 'AT_BEGINNING_STRING')
+        cls._analyze(list(parsed), flags, findings, unanchored=not anchored)
+
+        if any(finding['risk'] == 'exponential' for finding in findings):
+            risk, degree = 'exponential', None
+        elif findings:
+            risk, degree = 'polynomial', max(finding['degree'] for finding in findings)
+        else:
+            risk, degree = 'linear', 1
+        return {'pattern': pattern, 'risk': risk, 'degree': degree, 'findings': findings}
+
+    @classmethod
+    def assess(cls, pattern: str, max_length: Optional[int]) -> Dict[str, Any]:
+        """
+        Analyze a pattern and estimate its worst case for the longest input
+        it will be run on.
+        """
+        assessment = cls.analyze(pattern)
+        length = max_length or cls.MAX_INPUT_LENGTH
+        if assessment['risk'] == 'invalid':
+            steps = None
+        elif assessment['risk'] == 'exponential':
+            steps = float('inf') if length > 1000 else float(2 ** length)
+        else:
+            steps = float(length ** assessment['degree'])
+        assessment.update({
+            'max_length': length,
+            'steps': steps,
+            'safe': steps is not None and steps <= cls.MAX_STEPS
+        })
+        return assessment
+
+    @classmethod
+    def _analyze(cls, subpattern, flags: int, findings: List[Dict[str, Any]], unanchored: bool = False):
+        elements = cls._elements(subpattern, flags)
+        sequence = list(elements)
+        if unanchored:
+            # search() retries the pattern at every position
+            sequence.insert(0, _Element(None, _ALPHABET, _ALPHABET, True, True, False))
+        cls._find_chains(sequence, findings)
+
+        for element in elements:
+            op, av = element.node
+            name = str(op)
+            if name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+                body = av[2]
+                if element.unbounded and name != 'POSSESSIVE_REPEAT':
+                    cls._check_repeat_body(cls._elements(body, flags), flags, findings)
+                cls._analyze(body, flags, findings)
+            elif name == 'BRANCH':
+                for alternative in av[1]:
+                    cls._analyze(alternative, flags, findings)
+            elif name in ('ASSERT', 'ASSERT_NOT'):
+                cls._analyze(av[1], flags, findings)
+            elif name == 'ATOMIC_GROUP':
+                cls._analyze(av, flags, findings)
+
+    @classmethod
+    def _check_repeat_body(cls, body: List[_Element], flags: int, findings: List[Dict[str, Any]]):
+        """
+        Exponential cases: the body of an unbounded repeat can split the same
+        text between iterations in several ways.
+        """
+        overlap = cls._optional_tail_overlap(body, cls._first_of(body), flags)
+        if overlap:
+            # e.g. (a|aa)*, which the parser factors into a(?:|a)
+            findings.append({
+                'risk': 'exponential',
+                'degree': None,
+                'reason': "repeat body that can end or go on with the same text inside an unbounded repeat",
+                'witness': cls._witness(overlap)
+            })
+            return
+        for index, element in enumerate(body):
+            if element.ambiguous:
+                findings.append({
+                    'risk': 'exponential',
+                    'degree': None,
+                    'reason': "alternatives that can match the same text inside an unbounded repeat",
+                    'witness': cls._witness(element.first)
+                })
+                return
+            if not element.unbounded:
+                continue
+            others = body[:index] + body[index + 1:]
+            if all(other.nullable or other.chars <= element.chars for other in others):
+                findings.append({
+                    'risk': 'exponential',
+                    'degree': None,
+                    'reason': "unbounded repeat nested in an unbounded repeat",
+                    'witness': cls._witness(element.chars)
+                })
+                return
+
+    @classmethod
+    def _optional_tail_overlap(cls, elements: List[_Element], follow, flags: int):
+        """
+        Characters a match of a sequence can go on with where it could also
+        end and leave them to what follows (follow), e.g. a then an optional
+        a: "aa" is one iteration of (a|aa)* or two.
+        """
+        for index in range(len(elements)):
+            tail = elements[index + 1:]
+            if not all(element.nullable for element in tail):
+                continue
+            overlap = cls._first_of(tail) & follow
+            if overlap:
+                return overlap
+            op, av = elements[index].node or (None, None)
+            if str(op) == 'BRANCH':
+                # the same inside any alternative the sequence can end with
+                for alternative in av[1]:
+                    overlap = cls._optional_tail_overlap(cls._elements(alternative, flags), follow, flags)
+                    if overlap:
+                        return overlap
+        return frozenset()
+
+    @classmethod
+    def _find_chains(cls, sequence: List[_Element], findings: List[Dict[str, Any]]):
+        """
+        Polynomial cases: chains of unbounded repeats in a sequence that share
+        characters, with everything between them matchable by the earlier one.
+        """
+        best = None
+
+        def extend(start: int, overlap, length: int):
+            nonlocal best
+            if length > 1 and (best is None or length > best[0]):
+                best = (length, overlap)
+            for index in range(start + 1, len(sequence)):
+                element = sequence[index]
+                if element.unbounded and overlap & element.chars:
+                    extend(index, overlap & element.chars, length + 1)
+                if not (element.nullable or element.chars & sequence[start].chars):
+                    # the earlier repeat cannot absorb this element
+                    return
+
+        for index, element in enumerate(sequence):
+            if element.unbounded:
+                extend(index, element.chars, 1)
+        if best is not None:
+            findings.append({
+                'risk': 'polynomial',
+                'degree': best[0],
+                'reason': f"{best[0]} unbounded repeats in sequence matching the same characters",
+                'witness': cls._witness(best[1])
+            })
+
+    @staticmethod
+    def _witness(chars) -> Optional[str]:
+        if not chars:
+            return None
+        for preferred in 'a0 ./-_':
+            if preferred in chars:
+                return preferred
+        return min(chars)
+
+    @classmethod
+    def _elements(cls, subpattern, flags: int) -> List[_Element]:
+        """
+        Flatten a sequence: groups and bounded repeats are inlined, other
+        nodes become one element each.
+        """
+        elements = []
+        for node in subpattern:
+            op, av = node
+            name = str(op)
+            if name == 'SUBPATTERN':
+                _, add_flags, del_flags, body = av
+                elements.extend(cls._elements(body, (flags | add_flags) & ~del_flags))
+            elif name in ('MAX_REPEAT', 'MIN_REPEAT') and not cls._is_unbounded(av[1]):
+                inner = cls._elements(av[2], flags)
+                if av[0] == 0:
+                    inner = [element._replace(nullable=True) for element in inner]
+                elements.extend(inner)
+            elif name in ('AT',):
+                continue
+            else:
+                chars = cls._chars([node], flags)
+                # possessive repeats never give characters back
+                unbounded = name in ('MAX_REPEAT', 'MIN_REPEAT') and cls._is_unbounded(av[1])
+                ambiguous = False
+                if name == 'BRANCH':
+                    alternatives = [cls._elements(alternative, flags) for alternative in av[1]]
+                    unbounded = any(element.unbounded for alternative in alternatives for element in alternative)
+                    firsts = [cls._first_of(alternative) for alternative in alternatives]
+                    # two alternatives starting alike, or two that can both match nothing
+                    ambiguous = any(
+                        firsts[i] & firsts[j] for i in range(len(firsts)) for j in range(i + 1, len(firsts))
+                    ) or sum(cls._nullable(alternative) for alternative in av[1]) > 1
+                elements.append(_Element(
+                    node, chars, cls._first([node], flags), cls._nullable([node]), unbounded, ambiguous
+                ))
+        return elements
+
+    @classmethod
+    def _is_unbounded(cls, high) -> bool:
+        return high == sre_constants.MAXREPEAT or high > cls.UNBOUNDED_REPEAT
+
+    @staticmethod
+    def _first_of(elements: List[_Element]):
+        first = frozenset()
+        for element in elements:
+            first |= element.first
+            if not element.nullable:
+                break
+        return first
+
+    @classmethod
+    def _chars(cls, subpattern, flags: int):
+        """
+        Characters any match of a sequence can consume.
+        """
+        chars = set()
+        for op, av in subpattern:
+            name = str(op)
+            if name == 'LITERAL':
+                chars |= cls._case(chr(av), flags)
+            elif name == 'NOT_LITERAL':
+                chars |= _ALPHABET - cls._case(chr(av), flags)
+            elif name == 'ANY':
+                chars |= _ALPHABET if flags & re.DOTALL else _ALPHABET - {'\n'}
+            elif name == 'IN':
+                chars |= cls._class(av, flags)
+            elif name == 'SUBPATTERN':
+                chars |= cls._chars(av[3], (flags | av[1]) & ~av[2])
+            elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+                chars |= cls._chars(av[2], flags)
+            elif name == 'ATOMIC_GROUP':
+                chars |= cls._chars(av, flags)
+            elif name == 'BRANCH':
+                for alternative in av[1]:
+                    chars |= cls._chars(alternative, flags)
+            elif name in ('ASSERT', 'ASSERT_NOT', 'AT'):
+                continue
+            else:
+                # back references and conditionals: anything
+                chars |= _ALPHABET
+        return frozenset(chars)
+
+    @classmethod
+    def _first(cls, subpattern, flags: int):
+        """
+        Characters a match of a sequence can start with.
+        """
+        first = set()
+        for node in subpattern:
+            op, av = node
+            name = str(op)
+            if name == 'SUBPATTERN':
+                first |= cls._first(av[3], (flags | av[1]) & ~av[2])
+            elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+                first |= cls._first(av[2], flags)
+            elif name == 'ATOMIC_GROUP':
+                first |= cls._first(av, flags)
+            elif name == 'BRANCH':
+                for alternative in av[1]:
+                    first |= cls._first(alternative, flags)
+            else:
+                first |= cls._chars([node], flags)
+            if not cls._nullable([node]):
+                break
+        return frozenset(first)
+
+    @classmethod
+    def _nullable(cls, subpattern) -> bool:
+        """
+        Whether a sequence can match the empty string.
+        """
+        for op, av in subpattern:
+            name = str(op)
+            if name in ('ASSERT', 'ASSERT_NOT', 'AT', 'GROUPREF', 'GROUPREF_EXISTS'):
+                continue
+            if name == 'SUBPATTERN':
+                nullable = cls._nullable(av[3])
+            elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+                nullable = av[0] == 0 or cls._nullable(av[2])
+            elif name == 'ATOMIC_GROUP':
+                nullable = cls._nullable(av)
+            elif name == 'BRANCH':
+                nullable = any(cls._nullable(alternative) for alternative in av[1])
+            else:
+                nullable = False
+            if not nullable:
+                return False
+        return True
+
+    @staticmethod
+    def _case(char: str, flags: int):
+        if flags & re.IGNORECASE:
+            return {char, char.lower(), char.upper()}
+        return {char}
+
+    @classmethod
+    def _class(cls, items, flags: int):
+        """
+        Characters of the alphabet a [...] class matches.
+        """
+        negate = False
+        chars = set()
+        for op, av in items:
+            name = str(op)
+            if name == 'NEGATE':
+                negate = True
+            elif name == 'LITERAL':
+                chars |= cls._case(chr(av), flags)
+            elif name == 'RANGE':
+                low, high = av
+                chars |= {char for char in _ALPHABET if low <= ord(char) <= high}
+                if flags & re.IGNORECASE:
+                    chars |= {char.swapcase() for char in _ALPHABET if low <= ord(char) <= high}
+            elif name == 'CATEGORY':
+                category = str(av).replace('CATEGORY_', '').replace('UNI_', '').replace('LOC_', '')
+                matcher = _CATEGORIES.get(category)
+                chars |= {char for char in _ALPHABET if matcher is None or matcher.match(char)}
+        chars &= _ALPHABET
+        return _ALPHABET - chars if negate else chars
+
+    @classmethod
+    def _engine(cls, pattern: str, flags: int = 0):
+        """
+        Compile a pattern with the configured engine, as (engine name, compiled).
+        """
+        engine = cls.ENGINE
+        if engine in ('auto', 're2') and re2 is not None:
+            try:
+                return 're2', re2.compile(pattern, flags)
+            except Exception:
+                # lookarounds and back references are not supported by re2
+                pass
+        if engine in ('auto', 're2', 'regex') and regex is not None:
+            return 'regex', regex.compile(pattern, flags)
+        if engine not in ('auto', 're'):
+            logger.warning(f"Regex engine {engine} is not available for {pattern!r}, using re")
+        return 're', re.compile(pattern, flags)
+
+    @classmethod
+    def compile(cls, pattern: str, max_length: Optional[int] = None, flags: int = 0) -> SafePattern:
+        """
+        Compile a validation pattern with its input length limit.
+
+        Args:
+            pattern (str): The regular expression
+            max_length (Optional[int]): Longest input to match; defaults to
+                REGEX_MAX_INPUT_LENGTH
+            flags (int): re flags
+
+        Returns:
+            SafePattern: The guarded pattern
+        """
+        engine, compiled = cls._engine(pattern, flags)
+        return SafePattern(pattern, max_length or cls.MAX_INPUT_LENGTH, engine, compiled)
+
+    @classmethod
+    def _report(cls, key: str, assessment: Dict[str, Any]) -> Optional[str]:
+        with cls._lock:
+            cls._assessments[key] = assessment
+        if assessment['safe']:
+            return None
+        if assessment['risk'] == 'invalid':
+            return f"{key}: invalid pattern {assessment['pattern']!r} ({assessment['findings'][0]['reason']})"
+        reasons = "; ".join(finding['reason'] for finding in assessment['findings'])
+        return (
+            f"{key}: pattern {assessment['pattern']!r} is {assessment['risk']} "
+            f"(~{assessment['steps']:.3g} steps at {assessment['max_length']} characters): {reasons}"
+        )
+
+    @classmethod
+    def check_class(cls, data_object_class):
+        """
+        Assess the field_regex patterns of a class at registration.
+
+        Raises:
+            ValueError: If a pattern is invalid or unsafe and the mode is reject
+        """
+        cls.check_formats()
+        problems = []
+        for column in data_object_class.__table__.columns:
+            pattern = getattr(column, 'field_regex', None)
+            if not pattern:
+                continue
+            max_length = getattr(column.type, 'length', None)
+            problem = cls._report(
+                f"{data_object_class.__name__}.{column.name}", cls.assess(pattern, max_length)
+            )
+            if problem:
+                problems.append(problem)
+
+        for problem in problems:
+            logger.warning(f"Unsafe field_regex {problem}")
+        if problems and cls.MODE == 'reject':
+            raise ValueError(f"Unsafe field_regex {problems[0]}")
+
+    @classmethod
+    def load_formats(cls, path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Read the validation_formats shared with the frontend; empty when the
+        file is not deployed next to the backend.
+        """
+        path = path or cls.FORMATS_PATH
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r') as file:
+            return json.load(file).get('validation_formats', [])
+
+    @classmethod
+    def check_formats(cls, path: Optional[str] = None):
+        """
+        Assess the validation_formats patterns once per process. These are
+        shared configuration, so problems are logged, never raised.
+        """
+        with cls._lock:
+            if cls._formats_checked and path is None:
+                return
+            cls._formats_checked = True
+        try:
+            formats = cls.load_formats(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read validation formats: {str(e)}")
+            return
+        for validation_format in formats:
+            problem = cls._report(
+                f"format:{validation_format['format_type']}",
+                cls.assess(validation_format['regex_pattern'], validation_format.get('max_length'))
+            )
+            if problem:
+                logger.warning(f"Unsafe validation format {problem}")
+
+    @classmethod
+    def record_timeout(cls, pattern: str, length: int):
+        cls.timeouts += 1
+        logger.warning(f"Regex {pattern!r} exceeded its {cls.TIMEOUT}s budget on {length} characters")
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Get the assessments of the checked patterns and the timeout counter.
+        """
+        with cls._lock:
+            assessments = {
+                key: {
+                    'risk': assessment['risk'],
+                    'degree': assessment['degree'],
+                    'max_length': assessment['max_length'],
+                    'safe': assessment['safe']
+                }
+                for key, assessment in cls._assessments.items()
+            }
+        return {
+            'mode': cls.MODE,
+            'engine': cls._engine('a')[0],
+            'max_steps': cls.MAX_STEPS,
+            'timeouts': cls.timeouts,
+            'patterns': assessments
+        }
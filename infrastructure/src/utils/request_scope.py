@@ -0,0 +1,241 @@
+# src/utils/request_scope.py
+
+import os
+import time
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+from database.db import DatabaseManager
+from utils.logger import logger
+
+# database counters of the request being handled in this context
+_counters: ContextVar[Optional[Dict[str, Any]]] = ContextVar('request_db_counters', default=None)
+
+
+class RequestScope:
+    """
+    Request-scoped unit of work and per-request database counters.
+
+    Inside a request, session() returns one session per request, created on
+    first use, so routes that never touch the database never check out a
+    connection. end() commits it (or rolls it back on an error response) and
+    closes it before the response is sent, and also removes the thread's
+    scoped session, so no connection stays checked out after a response.
+    Outside a request (jobs, background threads) session() falls back to
+    DatabaseManager.get_session and release() closes the session as before.
+
+    GET, HEAD and OPTIONS requests are read-only: their session reads on
+    autocommit, read-only connections (see RoutingSession).
+
+    Engine and pool events count, per request, the queries issued and their
+    time, and the connections checked out and how long they were held.
+    They are added up per route for /api/stats/requests and returned in a
+    Server-Timing and an X-DB-Queries header (REQUEST_DB_HEADERS).
+    """
+
+    HEADERS = os.environ.get("REQUEST_DB_HEADERS", "true").lower() in ('1', 'true', 'yes')
+    READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    # endpoint -> summed counters
+    _routes: Dict[str, Dict[str, Any]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def begin(cls, endpoint: Optional[str], method: str):
+        """
+        Start counting database use for a request.
+        """
+        g.db_counters = {
+            'endpoint': endpoint or 'unknown',
+            'read_only': method in cls.READ_ONLY_METHODS,
+            'queries': 0,
+            'query_seconds': 0.0,
+            'checkouts': 0,
+            'checkout_seconds': 0.0
+        }
+        g.db_counters_token = _counters.set(g.db_counters)
+
+    @classmethod
+    def session(cls, read_only: bool = False):
+        """
+        Get the request's session, creating it on first use.
+
+        Args:
+            read_only (bool): Reads may go to a replica (until the session writes)
+
+        Returns:
+            The session; give it back with release()
+        """
+        if not has_request_context():
+            return DatabaseManager.get_session(read_only=read_only)
+
+        session = g.get('db_session')
+        if session is None:
+            session = DatabaseManager.SessionLocal()
+            counters = g.get('db_counters')
+            if counters is not None and counters['read_only']:
+                session.info['read_only_request'] = True
+            g.db_session = session
+        if read_only and not session.info.get('wrote'):
+            session.info['prefer_replica'] = True
+        else:
+            session.info.pop('prefer_replica', None)
+        return session
+
+    @staticmethod
+    def release(session):
+        """
+        Give back a session from session(): the request's session stays open
+        until the request ends, any other session is closed.
+        """
+        if has_request_context() and g.get('db_session') is session:
+            return
+        session.close()
+
+    @classmethod
+    def finish(cls, exception: Optional[BaseException] = None):
+        """
+        Commit (or roll back) and close the request's session, if it has one.
+        """
+        session = g.pop('db_session', None)
+        try:
+            if session is not None:
+                if exception is None:
+                    session.commit()
+                else:
+                    session.rollback()
+        except Exception as e:
+            logger.error(f"Ending the request's unit of work failed: {str(e)}")
+            session.rollback()
+            raise
+        finally:
+            if session is not None:
+                session.close()
+            DatabaseManager.db_session.remove()
+
+    @classmethod
+    def end(cls, response):
+        """
+        Finish the unit of work and report the request's counters (after_request).
+        Error responses roll back whatever the request left uncommitted.
+        """
+        cls.finish(None if response.status_code < 400 else RuntimeError(response.status))
+        counters = g.get('db_counters')
+        if counters is None:
+            return response
+        cls._record(counters)
+        if cls.HEADERS:
+            query_ms = counters['query_seconds'] * 1000
+            checkout_ms = counters['checkout_seconds'] * 1000
+            response.headers['X-DB-Queries'] = str(counters['queries'])
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={query_ms:.2f};desc="{counters["queries"]} queries", '
+                f'db-checkout;dur={checkout_ms:.2f};desc="{counters["checkouts"]} connections"'
+            )
+        return response
+
+    @classmethod
+    def teardown(cls, exception: Optional[BaseException] = None):
+        """
+        Release whatever end() did not, e.g. after an unhandled error (teardown_request).
+        """
+        try:
+            cls.finish(exception)
+        finally:
+            token = g.pop('db_counters_token', None)
+            if token is not None:
+                _counters.reset(token)
+
+    @classmethod
+    def _record(cls, counters: Dict[str, Any]):
+        with cls._lock:
+            route = cls._routes.get(counters['endpoint'])
+            if route is None:
+                route = cls._routes[counters['endpoint']] = {
+                    'requests': 0,
+                    'db_requests': 0,
+                    'queries': 0,
+                    'query_seconds': 0.0,
+                    'checkouts': 0,
+                    'checkout_seconds': 0.0,
+                    'max_checkout_seconds': 0.0
+                }
+            route['requests'] += 1
+            if counters['queries'] or counters['checkouts']:
+                route['db_requests'] += 1
+            for key in ('queries', 'query_seconds', 'checkouts', 'checkout_seconds'):
+                route[key] += counters[key]
+            route['max_checkout_seconds'] = max(route['max_checkout_seconds'], counters['checkout_seconds'])
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Get the summed database counters of every route in this process.
+        """
+        with cls._lock:
+            routes = {endpoint: dict(route) for endpoint, route in cls._routes.items()}
+        result = {}
+        for endpoint, route in routes.items():
+            requests = route['requests']
+            result[endpoint] = {
+                'requests': requests,
+                'db_requests': route['db_requests'],
+                'queries': route['queries'],
+                'queries_per_request': round(route['queries'] / requests, 2),
+                'query_ms': round(route['query_seconds'] * 1000, 2),
+                'checkouts': route['checkouts'],
+                'checkout_ms': round(route['checkout_seconds'] * 1000, 2),
+                'avg_checkout_ms': round(route['checkout_seconds'] * 1000 / requests, 3),
+                'max_checkout_ms': round(route['max_checkout_seconds'] * 1000, 3)
+            }
+        return result
+
+    @staticmethod
+    def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        counters = _counters.get()
+        if counters is not None:
+            counters['queries'] += 1
+            connection.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @staticmethod
+    def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        started = connection.info.get('query_started')
+        counters = _counters.get()
+        if started and counters is not None:
+            counters['query_seconds'] += time.perf_counter() - started.pop()
+
+    @staticmethod
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        counters = _counters.get()
+        if counters is not None:
+            counters['checkouts'] += 1
+            # checkin may run in another context; keep the counters with the connection
+            connection_record.info['request_counters'] = (counters, time.perf_counter())
+
+    @staticmethod
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out = connection_record.info.pop('request_counters', None)
+        if checked_out is not None:
+            counters, started = checked_out
+            counters['checkout_seconds'] += time.perf_counter() - started
+
+    @classmethod
+    def install(cls):
+        """
+        Listen to every engine and pool for the per-request counters.
+        """
+        if getattr(cls, '_installed', False):
+            return
+        event.listen(Engine, 'before_cursor_execute', cls._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', cls._after_cursor_execute)
+        event.listen(Pool, 'checkout', cls._on_checkout)
+        event.listen(Pool, 'checkin', cls._on_checkin)
+        cls._installed = True
+
+
+RequestScope.install()
@@ -0,0 +1,278 @@
+# src/utils/row_cache.py
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from sqlalchemy import event
+from utils.logger import logger
+from utils.pg_notify import PgNotifier
+
+
+class RowCache:
+    """
+    Per-type read-through cache of serialized rows, keyed by (slug, id).
+
+    Entries are evicted least-recently-used once either the entry count or the
+    approximate memory bound is exceeded, and expire after a TTL. A DataObject
+    class opts in with a `_row_cache` class attribute, e.g.
+
+        _row_cache = {'ttl': 60, 'max_entries': 5000, 'max_bytes': 8 * 1024 * 1024}
+
+    Writes invalidate entries locally after commit and in every other worker
+    process through Postgres LISTEN/NOTIFY.
+    """
+
+    # LISTEN/NOTIFY channel used for cross-process invalidation
+    CHANNEL = os.environ.get("ROW_CACHE_CHANNEL", "row_cache_invalidate")
+
+    DEFAULT_TTL = float(os.environ.get("ROW_CACHE_TTL", "60"))
+    DEFAULT_MAX_ENTRIES = int(os.environ.get("ROW_CACHE_MAX_ENTRIES", "10000"))
+    DEFAULT_MAX_BYTES = int(os.environ.get("ROW_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+    # static registry of caches by slug
+    _caches: Dict[str, "RowCache"] = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, slug: str, ttl: float = None, max_entries: int = None, max_bytes: int = None):
+        self.slug = slug
+        self.ttl = self.DEFAULT_TTL if ttl is None else ttl
+        self.max_entries = self.DEFAULT_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = self.DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+
+        # id -> (expires_at, size, value)
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        # id -> epoch of its last invalidation, oldest first; guards against
+        # caching a row read before a write. Ids trimmed from the map count
+        # as invalidated at _floor, so trimming never lets a stale load in.
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._epoch = 0
+        self._floor = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def for_class(cls, data_object_class) -> Optional["RowCache"]:
+        """
+        Get the cache for a DataObject class, or None if the class has not opted in.
+        """
+        config = getattr(data_object_class, '_row_cache', None)
+        if not config:
+            return None
+
+        slug = data_object_class.__name__.lower()
+        cache = cls._caches.get(slug)
+        if cache is None:
+            with cls._caches_lock:
+                cache = cls._caches.get(slug)
+                if cache is None:
+                    cache = cls(
+                        slug,
+                        ttl=config.get('ttl'),
+                        max_entries=config.get('max_entries'),
+                        max_bytes=config.get('max_bytes')
+                    )
+                    cls._caches[slug] = cache
+                    logger.info(f"Row cache enabled for {slug}: ttl={cache.ttl}s, "
+                                f"max_entries={cache.max_entries}, max_bytes={cache.max_bytes}")
+                    PgNotifier.subscribe(cls.CHANNEL, cls._on_notification)
+        # restarts the listener in forked workers
+        PgNotifier.ensure_listening()
+        return cache
+
+    def get_or_load(self, object_id: str, loader: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached row for object_id, calling loader on a miss.
+        Missing rows (loader returns None) are not cached.
+        """
+        value, generation = self.lookup(object_id)
+        if value is not None:
+            return value
+        value = loader()
+        if value is not None:
+            self.store(object_id, value, generation)
+        return value
+
+    def lookup(self, object_id: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Look up object_id, counting a hit or miss.
+
+        Returns:
+            Tuple: (cached row or None, generation to pass to store after loading)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(object_id)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(object_id)
+                    self.hits += 1
+                    return entry[2], self._epoch
+                self._remove(object_id)
+                self.expirations += 1
+            self.misses += 1
+            return None, self._epoch
+
+    def store(self, object_id: str, value: Dict[str, Any], generation: int):
+        """
+        Cache a row loaded after a missed lookup, evicting LRU entries as needed.
+        """
+        size = len(json.dumps(value, default=str))
+        with self._lock:
+            # a write invalidated this id while it was loading; do not cache stale data
+            if self._generations.get(object_id, self._floor) > generation:
+                return
+            if size > self.max_bytes:
+                return
+            if object_id in self._entries:
+                self._remove(object_id)
+            self._entries[object_id] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self.evictions += 1
+
+    def invalidate_id(self, object_id: str):
+        """
+        Drop a single id from this cache.
+        """
+        with self._lock:
+            self._epoch += 1
+            self._generations[object_id] = self._epoch
+            self._generations.move_to_end(object_id)
+            if object_id in self._entries:
+                self._remove(object_id)
+                self.invalidations += 1
+            # only in-flight loads need the generation; keep the map bounded by
+            # dropping the oldest ones and raising the floor to their epoch
+            while len(self._generations) > self.max_entries * 2:
+                _, self._floor = self._generations.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop all entries.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            # loads started before the clear must not be stored
+            self._epoch += 1
+            self._floor = self._epoch
+            self._bytes = 0
+
+    def _remove(self, object_id: str):
+        _, size, _ = self._entries.pop(object_id)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the counters and current size of this cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+    @classmethod
+    def forget(cls, slug: str):
+        """
+        Drop the cache of a type whose class was replaced by a model reload;
+        the next for_class builds one with the new settings.
+        """
+        with cls._caches_lock:
+            cache = cls._caches.pop(slug, None)
+        if cache is not None:
+            cache.clear()
+
+    @classmethod
+    def invalidate(cls, slug: str, object_id: str):
+        """
+        Invalidate (slug, id) in this process.
+        """
+        cache = cls._caches.get(slug)
+        if cache is not None:
+            cache.invalidate_id(object_id)
+
+    @classmethod
+    def publish_invalidations(cls, connection, keys):
+        """
+        Notify other processes of invalidated (slug, id) keys. Must be called
+        inside the writing transaction so delivery happens on commit.
+        """
+        for slug, object_id in keys:
+            PgNotifier.notify(connection, cls.CHANNEL, {'slug': slug, 'id': object_id})
+
+    @classmethod
+    def install(cls, session_factory):
+        """
+        Hook a session factory so any ORM write to a DataObject, including
+        DataObject.update followed by commit, invalidates the affected rows.
+        """
+        from models.data_object import DataObject
+
+        if event.contains(session_factory, 'after_flush', cls._after_flush):
+            return
+
+        event.listen(session_factory, 'after_flush', cls._after_flush)
+        event.listen(session_factory, 'after_commit', cls._after_commit)
+        event.listen(session_factory, 'after_rollback', cls._after_rollback)
+        cls._data_object_class = DataObject
+
+    @classmethod
+    def _after_flush(cls, session, flush_context):
+        # database name -> (a mapper routed to it, keys written there)
+        by_database = {}
+        for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(instance, cls._data_object_class) and instance.id is not None:
+                database = getattr(instance.__class__, '_database', None) or 'default'
+                _, keys = by_database.setdefault(database, (instance.__mapper__, set()))
+                keys.add((instance.__class__.__name__.lower(), instance.id))
+        if not by_database:
+            return
+        for mapper, keys in by_database.values():
+            session.info.setdefault('row_cache_keys', set()).update(keys)
+            # notify in the write's own transaction, so a rollback sends nothing
+            cls.publish_invalidations(session.connection(bind_arguments={'mapper': mapper}), keys)
+
+    @classmethod
+    def _after_commit(cls, session):
+        for slug, object_id in session.info.pop('row_cache_keys', ()):
+            cls.invalidate(slug, object_id)
+
+    @classmethod
+    def _after_rollback(cls, session):
+        session.info.pop('row_cache_keys', None)
+
+    @classmethod
+    def _on_notification(cls, message: Dict[str, Any]):
+        if message.get('pid') == os.getpid():
+            # already invalidated locally after commit
+            return
+        cls.invalidate(message.get('slug'), message.get('id'))
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the statistics of every cache by slug.
+        """
+        return {slug: cache.stats() for slug, cache in cls._caches.items()}
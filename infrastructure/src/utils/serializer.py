@@ -0,0 +1,157 @@
+# src/utils/serializer.py
+
+import base64
+import threading
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy import (
+    ARRAY, JSON, Boolean, Date, DateTime, Enum, Float, Integer, Interval,
+    LargeBinary, Numeric, String, Time
+)
+from sqlalchemy.types import TypeDecorator
+
+
+def _encode_datetime(value):
+    return value.isoformat()
+
+
+def _encode_interval(value):
+    return value.total_seconds()
+
+
+def _encode_enum(value):
+    # Enum columns backed by a Python enum class load as enum members
+    return getattr(value, 'value', value)
+
+
+def _encode_numeric(value):
+    # keep full decimal precision; matches Flask's JSON encoding of Decimal
+    return str(value)
+
+
+def _encode_binary(value):
+    return base64.b64encode(value).decode('ascii')
+
+
+# Encoder per SQLAlchemy type class. None means the loaded value is already
+# JSON-compatible and is copied as is. Lookup walks the column type's MRO, so
+# subclasses (VARCHAR, BigInteger, ...) use their base type's entry and more
+# specific entries (Enum before String, Float before Numeric) win.
+TYPE_ENCODERS: Dict[type, Optional[Callable[[Any], Any]]] = {
+    String: None,
+    Enum: _encode_enum,
+    DateTime: _encode_datetime,
+    Date: _encode_datetime,
+    Time: _encode_datetime,
+    Interval: _encode_interval,
+    Integer: None,
+    Float: None,
+    Numeric: _encode_numeric,
+    Boolean: None,
+    JSON: None,
+    LargeBinary: _encode_binary,
+}
+
+
+class RowSerializer:
+    """
+    Serializer compiled once per DataObject class from __table__.columns.
+
+    Each column gets one encoding step chosen from TYPE_ENCODERS by its type
+    class; password-format columns are excluded. The steps are compiled into a
+    single function building the result dict in one pass, with separate entry
+    points for ORM instances (attribute access), Core rows of
+    select(cls.__table__) (positional access in __table__.columns order) and
+    Core rows of select(*serializer.columns), which leave the excluded
+    columns out of the query.
+    """
+
+    # static cache of serializers by class
+    _serializers: Dict[type, "RowSerializer"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, data_object_class):
+        self.data_object_class = data_object_class
+        self.columns = []
+        namespace = {}
+        object_lines = []
+        row_lines = []
+        record_lines = []
+
+        for position, column in enumerate(data_object_class.__table__.columns):
+            if getattr(column, 'field_format', None) == 'password':
+                continue
+            index = len(self.columns)
+            self.columns.append(column)
+            encoder = self.encoder_for(column.type)
+            attribute = data_object_class.__mapper__.get_property_by_column(column).key
+
+            if encoder is None:
+                object_lines.append(f"        {column.name!r}: obj.{attribute},")
+                row_lines.append(f"        {column.name!r}: row[{position}],")
+                record_lines.append(f"        {column.name!r}: row[{index}],")
+            else:
+                namespace[f"_e{index}"] = encoder
+                object_lines.append(
+                    f"        {column.name!r}: None if (v{index} := obj.{attribute}) is None else _e{index}(v{index}),"
+                )
+                row_lines.append(
+                    f"        {column.name!r}: None if (v{index} := row[{position}]) is None else _e{index}(v{index}),"
+                )
+                record_lines.append(
+                    f"        {column.name!r}: None if (v{index} := row[{index}]) is None else _e{index}(v{index}),"
+                )
+
+        source = (
+            "def serialize(obj):\n    return {\n" + "\n".join(object_lines) + "\n    }\n"
+            "def serialize_row(row):\n    return {\n" + "\n".join(row_lines) + "\n    }\n"
+            "def serialize_record(row):\n    return {\n" + "\n".join(record_lines) + "\n    }\n"
+        )
+        exec(compile(source, f"<serializer {data_object_class.__name__}>", "exec"), namespace)
+
+        # serialize(instance) -> dict, serialize_row(core_row) -> dict,
+        # serialize_record(row of select(*self.columns)) -> dict
+        self.serialize = namespace['serialize']
+        self.serialize_row = namespace['serialize_row']
+        self.serialize_record = namespace['serialize_record']
+
+    @staticmethod
+    def encoder_for(type_obj) -> Optional[Callable[[Any], Any]]:
+        """
+        Get the encoding step for a column type.
+        """
+        if isinstance(type_obj, TypeDecorator):
+            type_obj = type_obj.impl
+
+        if isinstance(type_obj, ARRAY):
+            item_encoder = RowSerializer.encoder_for(type_obj.item_type)
+            if item_encoder is None:
+                return list
+            return lambda values: [None if item is None else item_encoder(item) for item in values]
+
+        for type_class in type(type_obj).__mro__:
+            if type_class in TYPE_ENCODERS:
+                return TYPE_ENCODERS[type_class]
+        # unknown type: fall back to its string form
+        return str
+
+    @classmethod
+    def for_class(cls, data_object_class) -> "RowSerializer":
+        """
+        Get the compiled serializer for a DataObject class.
+        """
+        serializer = cls._serializers.get(data_object_class)
+        if serializer is None:
+            with cls._lock:
+                serializer = cls._serializers.get(data_object_class)
+                if serializer is None:
+                    serializer = cls(data_object_class)
+                    cls._serializers[data_object_class] = serializer
+        return serializer
+
+    @classmethod
+    def forget(cls, data_object_class):
+        """
+        Drop the serializer of a class that was replaced by a model reload.
+        """
+        with cls._lock:
+            cls._serializers.pop(data_object_class, None)
@@ -0,0 +1,162 @@
+# src/utils/validation.py
+
+import json
+import threading
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import JSON, Boolean, Date, DateTime, Enum, Float, Integer, Numeric, String
+from utils.regex_safety import RegexSafety
+
+
+class RecordValidator:
+    """
+    Validates and coerces incoming records against a DataObject class's
+    column definitions and field attributes: required columns, Enum values,
+    String lengths (field_min_length and the column length) and field_regex,
+    run through RegexSafety with the column length as the input limit.
+
+    String input (CSV cells, query parameters) is coerced to the column's
+    Python type; an empty string counts as a missing value for non-String
+    columns. Rules are prepared once per class.
+    """
+
+    TRUE_VALUES = ('true', 't', 'yes', 'y', '1')
+    FALSE_VALUES = ('false', 'f', 'no', 'n', '0')
+
+    # static cache of validators by class
+    _validators: Dict[type, "RecordValidator"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, data_object_class):
+        self.data_object_class = data_object_class
+        self.columns = data_object_class.__table__.columns
+        # column name -> compiled field_regex
+        self.patterns = {}
+        for column in self.columns:
+            pattern = getattr(column, 'field_regex', None)
+            if pattern:
+                self.patterns[column.name] = RegexSafety.compile(pattern, getattr(column.type, 'length', None))
+        # columns a new record must provide
+        self.required = [
+            column.name for column in self.columns
+            if not column.nullable and column.default is None and column.server_default is None
+        ]
+
+    @classmethod
+    def for_class(cls, data_object_class) -> "RecordValidator":
+        """
+        Get the validator for a DataObject class.
+        """
+        validator = cls._validators.get(data_object_class)
+        if validator is None:
+            with cls._lock:
+                validator = cls._validators.get(data_object_class)
+                if validator is None:
+                    validator = cls(data_object_class)
+                    cls._validators[data_object_class] = validator
+        return validator
+
+    @classmethod
+    def forget(cls, data_object_class):
+        """
+        Drop the validator of a class that was replaced by a model reload.
+        """
+        with cls._lock:
+            cls._validators.pop(data_object_class, None)
+
+    def coerce(self, column, value):
+        """
+        Convert a value to the column's Python type.
+
+        Raises:
+            ValueError: If the value cannot be converted
+        """
+        column_type = column.type
+        if value is None:
+            return None
+        if isinstance(column_type, (String, Enum)):
+            return value if isinstance(value, str) else str(value)
+        if isinstance(value, str):
+            value = value.strip()
+            if value == '':
+                return None
+
+        if isinstance(column_type, Boolean):
+            if isinstance(value, bool):
+                return value
+            lowered = str(value).lower()
+            if lowered in self.TRUE_VALUES:
+                return True
+            if lowered in self.FALSE_VALUES:
+                return False
+            raise ValueError("not a boolean")
+        if isinstance(column_type, Integer):
+            if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+                raise ValueError("not an integer")
+            return int(value)
+        if isinstance(column_type, Float):
+            return float(value)
+        if isinstance(column_type, Numeric):
+            try:
+                return Decimal(str(value))
+            except InvalidOperation:
+                raise ValueError("not a number")
+        if isinstance(column_type, DateTime):
+            return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+        if isinstance(column_type, Date):
+            return value if isinstance(value, date) else date.fromisoformat(str(value))
+        if isinstance(column_type, JSON):
+            return json.loads(value) if isinstance(value, str) else value
+        return value
+
+    def validate(self, record: Dict[str, Any], partial: bool = False) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Validate one record.
+
+        Args:
+            record (Dict[str, Any]): Field values by column name
+            partial (bool): Only check the fields present (updates)
+
+        Returns:
+            Tuple: (coerced values, error messages); the record is valid when
+            there are no errors
+        """
+        values = {}
+        errors = []
+        for key, raw in record.items():
+            if key not in self.columns:
+                errors.append(f"Unknown field: {key}")
+                continue
+            column = self.columns[key]
+            try:
+                value = self.coerce(column, raw)
+            except (ValueError, TypeError):
+                errors.append(f"{key}: invalid value {str(raw)[:50]!r}")
+                continue
+
+            if value is None:
+                # missing: the column default applies, if there is one
+                if key in self.required:
+                    errors.append(f"{key} is required")
+                elif column.default is None and column.server_default is None:
+                    values[key] = None
+                continue
+
+            if isinstance(column.type, Enum) and value not in column.type.enums:
+                errors.append(f"{key}: {value!r} is not one of {', '.join(column.type.enums)}")
+            elif isinstance(column.type, String):
+                min_length = getattr(column, 'field_min_length', None)
+                if min_length and len(value) < min_length:
+                    errors.append(f"{key} must be at least {min_length} characters")
+                elif column.type.length and len(value) > column.type.length:
+                    errors.append(f"{key} must be at most {column.type.length} characters")
+                elif key in self.patterns and not self.patterns[key].search(value):
+                    errors.append(f"{key} has an invalid format")
+            values[key] = value
+
+        if not partial:
+            for name in self.required:
+                if record.get(name) in (None, '') and f"{name} is required" not in errors:
+                    errors.append(f"{name} is required")
+        return values, errors
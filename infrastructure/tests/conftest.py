@@ -0,0 +1,33 @@
+# tests/conftest.py
+
+import os
+import sys
+import tempfile
+import pytest
+
+# the application imports its modules relative to src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+# a scratch SQLite database and no background job workers for the API tests;
+# the settings are read when database.db and main are first imported
+_scratch = tempfile.mkdtemp(prefix="infrastructure-tests-")
+os.environ.setdefault("LOG_FILE", os.path.join(_scratch, "infrastructure.log"))
+os.environ.setdefault("DB_BACKEND", "sqlite")
+os.environ.setdefault("DB_SQLITE_PATH", os.path.join(_scratch, "app.db"))
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", "http://localhost")
+os.environ.setdefault("JOB_WORKERS", "0")
+# a second database for types with `_database = 'audit'`
+os.environ.setdefault("DB_DATABASES", "audit")
+os.environ.setdefault("DB_AUDIT_URL", f"sqlite:///{os.path.join(_scratch, 'audit.db')}")
+
+
+@pytest.fixture(scope='session')
+def client():
+    """
+    Test client of the Flask app on the scratch database.
+    """
+    from database.db import DatabaseManager
+    import main
+
+    DatabaseManager.init_db()
+    return main.app.test_client()
@@ -0,0 +1,85 @@
+# tests/test_admission.py
+
+import asyncio
+import threading
+import pytest
+from utils.admission import AdmissionGate, AdmissionRejected
+
+
+def test_async_waiters_are_bounded_and_time_out():
+    gate = AdmissionGate('test', limit=1, queue_size=2, timeout=0.2)
+
+    async def scenario():
+        await gate.acquire_async()
+        threads = threading.active_count()
+        waiters = [asyncio.ensure_future(gate.acquire_async()) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert gate.waiting == 2
+        # the queue is full: rejected at once
+        with pytest.raises(AdmissionRejected, match="capacity exceeded"):
+            await gate.acquire_async()
+        assert threading.active_count() == threads
+
+        gate.release()
+        await waiters[0]
+        with pytest.raises(AdmissionRejected, match="queue wait exceeded"):
+            await waiters[1]
+        gate.release()
+
+    asyncio.run(scenario())
+    stats = gate.stats()
+    assert stats['active'] == 0
+    assert stats['waiting'] == 0
+    assert stats['shed_queue_full'] == 1
+    assert stats['shed_timeout'] == 1
+    assert stats['admitted'] == 2
+
+
+def test_threads_and_coroutines_share_the_queue_in_order():
+    gate = AdmissionGate('test', limit=1, queue_size=4, timeout=2.0)
+    order = []
+
+    def thread_request():
+        gate.acquire()
+        order.append('thread')
+        gate.release()
+
+    async def scenario():
+        await gate.acquire_async()
+        thread = threading.Thread(target=thread_request)
+        thread.start()
+        while gate.waiting == 0:
+            await asyncio.sleep(0.01)
+
+        async def async_request():
+            await gate.acquire_async()
+            order.append('async')
+            gate.release()
+
+        waiter = asyncio.ensure_future(async_request())
+        await asyncio.sleep(0.01)
+        assert gate.waiting == 2
+        gate.release()
+        await waiter
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(scenario())
+    assert order == ['thread', 'async']
+    assert gate.stats()['active'] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    gate = AdmissionGate('test', limit=1, queue_size=1, timeout=5.0)
+
+    async def scenario():
+        await gate.acquire_async()
+        waiter = asyncio.ensure_future(gate.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert gate.waiting == 0
+        gate.release()
+
+    asyncio.run(scenario())
+    assert gate.stats()['active'] == 0
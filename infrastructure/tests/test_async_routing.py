@@ -0,0 +1,47 @@
+# tests/test_async_routing.py
+
+import sqlite3
+import pytest
+from database.db import DatabaseManager
+from models.data_object import DataObject
+
+USER = {'first_name': 'Barbara', 'last_name': 'Liskov', 'email': 'barbara@example.com', 'password': 'Secret1!x'}
+
+
+@pytest.fixture
+def audit_user(client, monkeypatch):
+    """
+    A user written while User lives on the audit database.
+    """
+    user_class = DataObject.get_class('user')
+    monkeypatch.setattr(user_class, '_database', 'audit', raising=False)
+    user_class.create_table(DatabaseManager.clusters['audit'].primary)
+    response = client.post('/api/user', json=USER)
+    assert response.status_code == 201
+    yield response.get_json()
+    client.delete(f"/api/user/{response.get_json()['id']}")
+
+
+def count_users(path, user_id):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT count(*) FROM users WHERE id = ?", (user_id,)).fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_async_routes_read_the_types_database(client, audit_user):
+    audit_path = DatabaseManager.clusters['audit'].path
+    assert count_users(audit_path, audit_user['id']) == 1
+    assert count_users(DatabaseManager.DB_SQLITE_PATH, audit_user['id']) == 0
+
+    read = client.get(f"/api/async/user/{audit_user['id']}")
+    assert read.status_code == 200
+    assert read.get_json()['email'] == USER['email']
+
+    listed = client.get('/api/async/user')
+    assert listed.status_code == 200
+    assert [record['id'] for record in listed.get_json()['data']] == [audit_user['id']]
+
+    resolved = client.post('/api/async/resolve', json={'references': [{'slug': 'user', 'id': audit_user['id']}]})
+    assert resolved.get_json()['results'][0]['record']['id'] == audit_user['id']
@@ -0,0 +1,65 @@
+# tests/test_crud_validation.py
+
+import pytest
+
+VALID_USER = {
+    'first_name': 'Ada',
+    'last_name': 'Lovelace',
+    'email': 'ada@example.com',
+    'password': 'Secret1!x'
+}
+
+
+@pytest.fixture
+def user(client):
+    response = client.post('/api/user', json=VALID_USER)
+    assert response.status_code == 201
+    yield response.get_json()
+    client.delete(f"/api/user/{response.get_json()['id']}")
+
+
+@pytest.mark.parametrize('fields, message', [
+    ({'status': 'bogus'}, "status: 'bogus' is not one of"),
+    ({'first_name': 'A' * 51}, "first_name must be at most 50 characters"),
+    ({'first_name': 'Ada1'}, "first_name has an invalid format"),
+    # longer than the column, so the pattern never runs on it
+    ({'password': 'aA1!' + 'a' * 200}, "password must be at most 128 characters"),
+])
+def test_create_rejects_invalid_body(client, fields, message):
+    response = client.post('/api/user', json={**VALID_USER, **fields})
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
+    assert client.get('/api/user').status_code == 200
+
+
+def test_create_requires_fields(client):
+    response = client.post('/api/user', json={'first_name': 'Ada'})
+    assert response.status_code == 400
+    assert 'email is required' in response.get_json()['error']
+
+
+def test_update_rejects_invalid_body(client, user):
+    url = f"/api/user/{user['id']}"
+    assert client.put(url, json={'status': 'bogus'}).status_code == 400
+    assert client.put(url, json={'last_name': 'x' * 5000}).status_code == 400
+    assert client.put(url, json={'email': None}).status_code == 400
+    assert client.get(url).get_json()['last_name'] == 'Lovelace'
+
+
+def test_update_checks_only_given_fields(client, user):
+    response = client.put(f"/api/user/{user['id']}", json={'last_name': 'Byron'})
+    assert response.status_code == 200
+    assert response.get_json()['last_name'] == 'Byron'
+
+
+def test_password_is_hashed(client, user):
+    from models.data_object import DataObject
+    from database.db import DatabaseManager
+
+    session = DatabaseManager.get_session()
+    try:
+        stored = session.get(DataObject.get_class('user'), user['id'])
+        assert stored.password != VALID_USER['password']
+        assert stored.check_password('password', VALID_USER['password'])
+    finally:
+        session.close()
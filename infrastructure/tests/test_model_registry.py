@@ -0,0 +1,55 @@
+# tests/test_model_registry.py
+
+import os
+import shutil
+import pytest
+from sqlalchemy.orm import configure_mappers
+from models.data_object import DataObject
+from utils.model_registry import ModelRegistry
+
+BROKEN_MODEL = '''
+from sqlalchemy import Column, String
+from sqlalchemy.orm import relationship
+from .data_object import DataObject
+
+
+class Broken(DataObject):
+    __tablename__ = 'broken'
+
+    name = Column(String(50))
+    owner = relationship("Nonexistent")
+'''
+
+USER = {'first_name': 'Grace', 'last_name': 'Hopper', 'email': 'grace@example.com', 'password': 'Secret1!x'}
+
+
+@pytest.fixture
+def models_dir(client, tmp_path, monkeypatch):
+    """
+    A copy of models/ with the same mtimes, so nothing looks changed yet.
+    """
+    ModelRegistry.current()
+    for file_name in os.listdir(ModelRegistry.MODELS_DIR):
+        if file_name.endswith('.py'):
+            shutil.copy2(os.path.join(ModelRegistry.MODELS_DIR, file_name), tmp_path / file_name)
+    monkeypatch.setattr(ModelRegistry, 'MODELS_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_failed_reload_leaves_mappers_usable(client, models_dir):
+    version = ModelRegistry.current().version
+    (models_dir / 'broken.py').write_text(BROKEN_MODEL)
+
+    record = ModelRegistry.reload()
+
+    assert record['status'] == 'failed'
+    assert 'Nonexistent' in record['error']
+    assert ModelRegistry.current().version == version
+    assert 'Broken' not in DataObject.registry._class_registry
+    assert all(mapper.class_.__name__ != 'Broken' for mapper in DataObject.registry.mappers)
+    assert 'broken' not in DataObject.metadata.tables
+    configure_mappers()
+
+    response = client.post('/api/user', json=USER)
+    assert response.status_code == 201
+    client.delete(f"/api/user/{response.get_json()['id']}")
@@ -0,0 +1,52 @@
+# tests/test_regex_safety.py
+
+import pytest
+from utils.regex_safety import RegexSafety
+
+
+@pytest.mark.parametrize('pattern', [
+    r'^(a+)+$',
+    r'^(\w+\s?)+$',
+    r'(\w+|\d+)*',
+    # alternatives sharing a prefix, which the parser factors into a(?:|a)
+    r'^(a|aa)*$',
+    r'^(a|aa)+b',
+    r'^(?:b|(?:a|aa))*$',
+    # a nullable tail that can also start the next iteration
+    r'^(a[ab]?)*$',
+    # two alternatives that can both match nothing
+    r'^(?:a(?:b|bc?))*$',
+])
+def test_exponential(pattern):
+    assessment = RegexSafety.analyze(pattern)
+    assert assessment['risk'] == 'exponential'
+    assert not RegexSafety.assess(pattern, 64)['safe']
+
+
+@pytest.mark.parametrize('pattern, degree', [
+    (r'^\d+\d+$', 2),
+    (r'^[a-z.]+\.[a-z]+$', 2),
+    (r'\d+\d+', 3),
+])
+def test_polynomial(pattern, degree):
+    assessment = RegexSafety.analyze(pattern)
+    assert assessment['risk'] == 'polynomial'
+    assert assessment['degree'] == degree
+
+
+@pytest.mark.parametrize('pattern', [
+    r'^[a-z]+$',
+    r'^\d{3}-\d{4}$',
+    r'^(ab|a)*$',
+    r'^(ab?)*$',
+    r'^(\d{3}-?)*$',
+    r'^(x(?:a|aa))*$',
+    r'^(a|b|)*$',
+    r'^(?:\w+)++$',
+])
+def test_linear(pattern):
+    assert RegexSafety.analyze(pattern)['risk'] == 'linear'
+
+
+def test_invalid():
+    assert RegexSafety.analyze(r'(a')['risk'] == 'invalid'
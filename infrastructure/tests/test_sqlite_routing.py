@@ -0,0 +1,40 @@
+# tests/test_sqlite_routing.py
+
+import sqlite3
+import time
+import pytest
+from database.db import DatabaseManager
+
+USER = {'first_name': 'Edsger', 'last_name': 'Dijkstra', 'email': 'edsger@example.com', 'password': 'Secret1!x'}
+
+
+@pytest.fixture
+def user(client):
+    response = client.post('/api/user', json=USER)
+    assert response.status_code == 201
+    yield response.get_json()
+    client.delete(f"/api/user/{response.get_json()['id']}")
+
+
+@pytest.fixture
+def write_lock():
+    """
+    Another connection in the middle of a write transaction.
+    """
+    connection = sqlite3.connect(DatabaseManager.DB_SQLITE_PATH, isolation_level=None)
+    connection.execute("BEGIN IMMEDIATE")
+    connection.execute("UPDATE users SET last_name = last_name")
+    yield connection
+    connection.execute("ROLLBACK")
+    connection.close()
+
+
+@pytest.mark.skipif(DatabaseManager.DB_BACKEND != 'sqlite', reason="SQLite routing")
+def test_reads_do_not_wait_for_the_writer(client, user, write_lock):
+    started = time.perf_counter()
+    read = client.get(f"/api/user/{user['id']}")
+    listed = client.get('/api/user')
+    assert read.status_code == 200
+    assert read.get_json()['email'] == USER['email']
+    assert listed.status_code == 200
+    assert time.perf_counter() - started < 1
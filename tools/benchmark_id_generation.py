@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+benchmark_id_generation.py
+
+Compares primary key generators for DataObject tables against uuid4.
+For each generator a scratch table shaped like a DataObject table
+(varchar(50) primary key plus timestamps) is created, filled with --rows rows
+in batches of --batch-size, and the following are reported:
+
+    - generation rate (IDs per second, in-process only)
+    - insert throughput (rows per second)
+    - primary key index size and total table size
+    - WAL bytes written during the inserts
+
+Connection settings come from the same DB_* environment variables used by
+DatabaseManager. Scratch tables are dropped afterwards unless --keep is given.
+
+Usage:
+    python benchmark_id_generation.py --rows 200000 --batch-size 1000
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "infrastructure", "src"))
+
+from sqlalchemy import text  # noqa: E402
+from database.db import DatabaseManager  # noqa: E402
+from utils.id_generator import IdGenerator  # noqa: E402
+
+
+def measure_generation(generator: IdGenerator, count: int) -> float:
+    """
+    Measure how many IDs per second the generator produces in-process.
+    """
+    start = time.perf_counter()
+    for _ in range(count):
+        generator.generate()
+    return count / (time.perf_counter() - start)
+
+
+def measure_inserts(engine, name: str, rows: int, batch_size: int, keep: bool) -> dict:
+    """
+    Insert rows into a scratch table using the named generator and collect statistics.
+    """
+    generator = IdGenerator.get(name)
+    table = f"bench_ids_{name}"
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(text(
+            f"CREATE TABLE {table} ("
+            " id varchar(50) PRIMARY KEY,"
+            " created_at timestamp NOT NULL,"
+            " updated_at timestamp NOT NULL,"
+            " created_by varchar(50) NOT NULL,"
+            " updated_by varchar(50) NOT NULL)"
+        ))
+
+    insert = text(
+        f"INSERT INTO {table} (id, created_at, updated_at, created_by, updated_by)"
+        " VALUES (:id, :created_at, :updated_at, 'System', 'System')"
+    )
+
+    with engine.connect() as conn:
+        wal_start = conn.execute(text("SELECT pg_current_wal_lsn()")).scalar()
+
+    start = time.perf_counter()
+    inserted = 0
+    while inserted < rows:
+        now = datetime.utcnow()
+        batch = [
+            {'id': generator.generate(), 'created_at': now, 'updated_at': now}
+            for _ in range(min(batch_size, rows - inserted))
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert, batch)
+        inserted += len(batch)
+    elapsed = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        wal_bytes = conn.execute(
+            text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :start)"), {'start': wal_start}
+        ).scalar()
+        index_size = conn.execute(text(f"SELECT pg_relation_size('{table}_pkey')")).scalar()
+        total_size = conn.execute(text(f"SELECT pg_total_relation_size('{table}')")).scalar()
+
+    if not keep:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {table}"))
+
+    return {
+        'rows_per_sec': rows / elapsed,
+        'index_bytes': int(index_size),
+        'total_bytes': int(total_size),
+        'wal_bytes': int(wal_bytes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark DataObject ID generators against uuid4."
+    )
+    parser.add_argument("--rows", type=int, default=100000, help="Rows to insert per generator (default: 100000)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per insert transaction (default: 1000)")
+    parser.add_argument("--generators", default=",".join(IdGenerator.available()),
+                        help="Comma-separated generator names (default: all)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch tables for inspection")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.generators.split(",") if name.strip()]
+    if 'uuid4' not in names:
+        names.insert(0, 'uuid4')
+
+    results = {}
+    for name in names:
+        print(f"Running {name}...")
+        stats = measure_inserts(DatabaseManager.engine, name, args.rows, args.batch_size, args.keep)
+        stats['ids_per_sec'] = measure_generation(IdGenerator.get(name), args.rows)
+        results[name] = stats
+
+    baseline = results['uuid4']
+    print()
+    print(f"{'generator':<10} {'ids/s':>12} {'rows/s':>10} {'vs uuid4':>9} "
+          f"{'index MB':>9} {'vs uuid4':>9} {'WAL MB':>8}")
+    for name, stats in results.items():
+        print(
+            f"{name:<10} {stats['ids_per_sec']:>12,.0f} {stats['rows_per_sec']:>10,.0f} "
+            f"{stats['rows_per_sec'] / baseline['rows_per_sec']:>8.2f}x "
+            f"{stats['index_bytes'] / 1048576:>9.1f} "
+            f"{stats['index_bytes'] / baseline['index_bytes']:>8.2f}x "
+            f"{stats['wal_bytes'] / 1048576:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
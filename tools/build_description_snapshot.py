@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+build_description_snapshot.py
+
+Imports the data object models once and writes every object description plus
+the master document to a single versioned snapshot file. The snapshot is
+served by src/metadata_main.py, which memory-maps it and never imports
+SQLAlchemy, the models or the database engine.
+
+Usage:
+    python build_description_snapshot.py --output ../infrastructure/src/data/descriptions.snapshot
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "infrastructure", "src"))
+
+from models.data_object import DataObject  # noqa: E402
+from utils.data_object import DataObjectManager  # noqa: E402
+from utils.description_snapshot import DescriptionSnapshot  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the description snapshot used by metadata-only deployments."
+    )
+    parser.add_argument("--output", default="../infrastructure/src/data/descriptions.snapshot",
+                        help="Snapshot file to write (default: ../infrastructure/src/data/descriptions.snapshot)")
+    args = parser.parse_args()
+
+    descriptions = {}
+    for data_object_class in DataObject._registered_classes:
+        object_slug = data_object_class.__name__.lower()
+        descriptions[object_slug] = DataObjectManager.get_object_description(object_slug)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    header = DescriptionSnapshot.write(args.output, DataObjectManager.get_master_document(), descriptions)
+    print(f"Description snapshot {header['content_hash']} with {len(descriptions)} object types "
+          f"written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
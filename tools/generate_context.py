@@ -3,17 +3,29 @@
 generate_context.py
 
 Scans all .py files under the src/ directory (ignoring __init__.py and similar files)
-and outputs a summary of all top-level functions, classes, and class methods.
+and outputs a summary of all top-level functions, classes, and class methods
+(including async functions and nested classes).
 For each function/method, only the signature (parameter names and return type, if annotated)
 is shown—not the actual code body.
 
+Per-file summaries are cached by mtime, size and content hash, so unchanged
+files are not parsed again; changed files are parsed in a process pool. When
+neither the sources nor the prepended design documents changed, the output
+file is left untouched.
+
 Usage:
     python generate_context.py --src src --output project_context.txt
 """
 
 import os
 import ast
+import json
+import hashlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# Bump when the summary format changes so stale cache entries are discarded.
+CACHE_VERSION = 2
 
 def format_args(args: ast.arguments) -> str:
     """
@@ -87,11 +99,12 @@ def format_function_def(func: ast.FunctionDef) -> str:
     Format a function definition into a signature string.
     
     Parameters:
-        func (ast.FunctionDef): The function definition node.
+        func (ast.FunctionDef | ast.AsyncFunctionDef): The function definition node.
     
     Returns:
         str: A string showing the function's name, parameters, and return annotation (if any).
     """
+    prefix = "Async Function" if isinstance(func, ast.AsyncFunctionDef) else "Function"
     name = func.name
     params = format_args(func.args)
     ret = ""
@@ -101,7 +114,7 @@ def format_function_def(func: ast.FunctionDef) -> str:
         except AttributeError:
             ret = ""
     ret_str = f" -> {ret}" if ret else ""
-    return f"Function: {name}({params}){ret_str}"
+    return f"{prefix}: {name}({params}){ret_str}"
 
 def process_file(filepath: str) -> list:
     """
@@ -122,18 +135,68 @@ def process_file(filepath: str) -> list:
     
     items = []
     for node in tree.body:
-        if isinstance(node, ast.FunctionDef):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
             # Top-level function
             items.append(format_function_def(node))
         elif isinstance(node, ast.ClassDef):
-            class_header = f"Class: {node.name}"
-            items.append(class_header)
-            for item in node.body:
-                if isinstance(item, ast.FunctionDef):
-                    # Indent methods by four spaces
-                    items.append("    " + format_function_def(item))
+            items.extend(format_class_def(node, ""))
+    return items
+
+def format_class_def(node: ast.ClassDef, indent: str) -> list:
+    """
+    Format a class, its methods and any nested classes.
+    
+    Parameters:
+        node (ast.ClassDef): The class definition node.
+        indent (str): Indentation of the class header.
+    
+    Returns:
+        list: Summary lines; members are indented four spaces deeper than the class.
+    """
+    items = [f"{indent}Class: {node.name}"]
+    for item in node.body:
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            items.append(indent + "    " + format_function_def(item))
+        elif isinstance(item, ast.ClassDef):
+            items.extend(format_class_def(item, indent + "    "))
     return items
 
+def file_fingerprint(filepath: str) -> dict:
+    """
+    Get the mtime and size of a file, used to skip hashing unchanged files.
+    """
+    stat = os.stat(filepath)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def hash_file(filepath: str) -> str:
+    """
+    Get the sha256 of a file's contents.
+    """
+    with open(filepath, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_cache(cache_path: str) -> dict:
+    """
+    Load the per-file summary cache, or an empty cache if missing or stale.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {"version": CACHE_VERSION, "files": {}, "output_hash": None}
+    if cache.get("version") != CACHE_VERSION:
+        return {"version": CACHE_VERSION, "files": {}, "output_hash": None}
+    return cache
+
+def save_cache(cache_path: str, cache: dict):
+    """
+    Write the per-file summary cache.
+    """
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+
 # load a specified file with each line as an element in a list
 def load_file(filepath: str):
     """
@@ -148,16 +211,83 @@ def load_file(filepath: str):
     with open(filepath, "r", encoding="utf-8") as f:
         return f.readlines()
 
-def generate_context(src_dir: str) -> str:
+def find_source_files(src_dir: str) -> list:
+    """
+    List the .py files to summarise, in a stable order.
+    """
+    filepaths = []
+    for root, dirs, files in os.walk(src_dir):
+        dirs.sort()
+        for file in sorted(files):
+            if file.endswith(".py") and file not in ("__init__.py",):
+                filepaths.append(os.path.join(root, file))
+    return filepaths
+
+def summarize_files(filepaths: list, cache: dict, jobs: int) -> tuple:
+    """
+    Get the summary of every file, parsing only files whose content changed.
+    
+    Parameters:
+        filepaths (list): Files to summarise.
+        cache (dict): The per-file cache, updated in place.
+        jobs (int): Worker processes for parsing; 1 parses in this process.
+    
+    Returns:
+        tuple: (dict of filepath -> summary lines, number of files parsed,
+                whether the cache was modified)
+    """
+    cached_files = cache["files"]
+    summaries = {}
+    to_parse = []
+    cache_modified = False
+
+    for filepath in filepaths:
+        fingerprint = file_fingerprint(filepath)
+        entry = cached_files.get(filepath)
+        if entry and entry["mtime_ns"] == fingerprint["mtime_ns"] and entry["size"] == fingerprint["size"]:
+            summaries[filepath] = entry["items"]
+            continue
+        content_hash = hash_file(filepath)
+        if entry and entry["hash"] == content_hash:
+            # touched but not modified
+            entry.update(fingerprint)
+            cache_modified = True
+            summaries[filepath] = entry["items"]
+            continue
+        to_parse.append((filepath, fingerprint, content_hash))
+
+    if to_parse:
+        paths = [filepath for filepath, _, _ in to_parse]
+        if jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(process_file, paths, chunksize=8))
+        else:
+            results = [process_file(path) for path in paths]
+        for (filepath, fingerprint, content_hash), items in zip(to_parse, results):
+            cached_files[filepath] = {**fingerprint, "hash": content_hash, "items": items}
+            summaries[filepath] = items
+
+    # forget deleted files
+    for filepath in set(cached_files) - set(filepaths):
+        del cached_files[filepath]
+        cache_modified = True
+
+    return summaries, len(to_parse), cache_modified or bool(to_parse)
+
+def generate_context(src_dir: str, cache: dict = None, jobs: int = 1) -> str:
     """
     Walk the src directory and generate a summary context for all Python files.
     
     Parameters:
         src_dir (str): The source directory to scan.
+        cache (dict): Optional per-file summary cache (see load_cache), updated in place.
+        jobs (int): Worker processes used to parse changed files.
     
     Returns:
         str: A string containing the project context summary.
     """
+    if cache is None:
+        cache = {"version": CACHE_VERSION, "files": {}, "output_hash": None}
 
     output_lines = []
     prepend_lines = []
@@ -173,19 +303,19 @@ def generate_context(src_dir: str) -> str:
         prepend_lines.extend(load_file(file))
         prepend_lines.append("\n")
 
+    summaries, parsed, cache_modified = summarize_files(find_source_files(src_dir), cache, jobs)
+    cache["last_parsed"] = parsed
+    cache["modified"] = cache_modified
+
     output_lines.append("# Top-Level Functions and Classes")
-    for root, _, files in os.walk(src_dir):
-        for file in files:
-            if file.endswith(".py") and file not in ("__init__.py",):
-                filepath = os.path.join(root, file)
-                output_lines.append(f"File: {filepath}")
-                output_lines.append("-" * (len(filepath) + 6))
-                items = process_file(filepath)
-                if items:
-                    output_lines.extend(items)
-                else:
-                    output_lines.append("    No classes or functions found.")
-                output_lines.append("")  # Empty line between files
+    for filepath, items in summaries.items():
+        output_lines.append(f"File: {filepath}")
+        output_lines.append("-" * (len(filepath) + 6))
+        if items:
+            output_lines.extend(items)
+        else:
+            output_lines.append("    No classes or functions found.")
+        output_lines.append("")  # Empty line between files
     return "".join(prepend_lines) + "\n".join(output_lines)
 
 def main():
@@ -195,12 +325,36 @@ def main():
     parser.add_argument("--src", default="../app", help="Source directory to scan (default: src)")
     parser.add_argument("--output", default="../project-context.md",
                         help="Output file to write the context summary (default: project_context.txt)")
+    parser.add_argument("--cache", default=None,
+                        help="Summary cache file (default: <output>.cache.json)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not write the cache")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for parsing changed files (default: CPU count)")
     args = parser.parse_args()
-    
-    context = generate_context(args.src)
+
+    cache_path = args.cache or args.output + ".cache.json"
+    cache = None if args.no_cache else load_cache(cache_path)
+
+    context = generate_context(args.src, cache, args.jobs)
+    output_hash = hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+    parsed = ""
+    if cache is not None:
+        # results of this run only; never persisted in the cache file
+        last_parsed = cache.pop("last_parsed", 0)
+        modified = cache.pop("modified", False)
+        parsed = f" ({last_parsed} files parsed)"
+        unchanged = cache.get("output_hash") == output_hash and os.path.exists(args.output)
+        if modified or not unchanged:
+            cache["output_hash"] = output_hash
+            save_cache(cache_path, cache)
+        if unchanged:
+            print(f"Project context unchanged{parsed}; {args.output} not rewritten")
+            return
+
     with open(args.output, "w", encoding="utf-8") as f:
         f.write(context)
-    print(f"Project context summary written to {args.output}")
+    print(f"Project context summary written to {args.output}{parsed}")
 
 if __name__ == "__main__":
     main()
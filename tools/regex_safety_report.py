@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+regex_safety_report.py
+
+Reports the catastrophic-backtracking risk of every validation pattern:
+the field_regex of each registered data object column and the
+validation_formats of app/data/field-format.json. Each pattern is
+analyzed statically (RegexSafety.analyze) and its worst case estimated
+for the longest input the field accepts. No database is needed.
+
+Exits with status 1 when a pattern is unsafe, so it can run in CI.
+
+Usage:
+    python regex_safety_report.py
+    python regex_safety_report.py --max-steps 100000 --json
+"""
+
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "infrastructure", "src"))
+# report unsafe patterns instead of failing the model registration
+os.environ["REGEX_SAFETY_MODE"] = "warn"
+
+from models import DataObject  # noqa: E402
+from utils.regex_safety import RegexSafety  # noqa: E402
+
+
+def collect(formats_path):
+    """
+    Assess every pattern as (source, name, assessment).
+    """
+    results = []
+    for data_object_class in DataObject._registered_classes:
+        for column in data_object_class.__table__.columns:
+            pattern = getattr(column, 'field_regex', None)
+            if pattern:
+                results.append((
+                    'field_regex',
+                    f"{data_object_class.__name__}.{column.name}",
+                    RegexSafety.assess(pattern, getattr(column.type, 'length', None))
+                ))
+    for validation_format in RegexSafety.load_formats(formats_path):
+        results.append((
+            'format',
+            validation_format['format_type'],
+            RegexSafety.assess(validation_format['regex_pattern'], validation_format.get('max_length'))
+        ))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report ReDoS risks of the validation patterns.")
+    parser.add_argument("--formats", default=RegexSafety.FORMATS_PATH,
+                        help="Path of field-format.json (default: app/data/field-format.json)")
+    parser.add_argument("--max-steps", type=float, default=RegexSafety.MAX_STEPS,
+                        help=f"Backtracking steps budget (default: {RegexSafety.MAX_STEPS:.0f})")
+    parser.add_argument("--json", action="store_true", help="Print the assessments as JSON")
+    args = parser.parse_args()
+
+    RegexSafety.MAX_STEPS = args.max_steps
+    results = collect(args.formats)
+
+    if args.json:
+        print(json.dumps([
+            {'source': source, 'name': name, **assessment} for source, name, assessment in results
+        ], indent=2, default=str))
+    else:
+        print(f"{'source':<12} {'name':<24} {'risk':<12} {'max len':>8} {'steps':>10}  verdict")
+        for source, name, assessment in results:
+            steps = assessment['steps']
+            steps = "-" if steps is None else "inf" if steps == float('inf') else f"{steps:.3g}"
+            verdict = "ok" if assessment['safe'] else "UNSAFE"
+            risk = assessment['risk']
+            if risk == 'polynomial':
+                risk = f"O(n^{assessment['degree']})"
+            print(f"{source:<12} {name:<24} {risk:<12} {assessment['max_length']:>8} {steps:>10}  {verdict}")
+            if not assessment['safe']:
+                print(f"{'':<12} {assessment['pattern']}")
+                for finding in assessment['findings']:
+                    witness = f" (pumped with {finding['witness']!r})" if finding.get('witness') else ""
+                    print(f"{'':<12} - {finding['reason']}{witness}")
+
+    unsafe = [name for _, name, assessment in results if not assessment['safe']]
+    if unsafe:
+        print(f"\n{len(unsafe)} unsafe pattern(s): {', '.join(unsafe)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()